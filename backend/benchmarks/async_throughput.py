@@ -0,0 +1,123 @@
+"""동시 요청 처리량: 서비스 호출을 이벤트 루프에서 직접 실행(이전) vs run_db(이후)
+
+    python -m benchmarks.async_throughput [--requests 400] [--concurrency 50] [--latency-ms 2]
+
+기본은 임시 SQLite 파일에 쿼리마다 --latency-ms만큼 지연을 넣은 로컬 DB 대역을 쓴다
+(네트워크 왕복 대기를 흉내 냄). 실제 DB로 재려면 DATABASE_URL(과 DATABASE_ASYNC)을 지정하고
+--latency-ms 0으로 실행한다. DATABASE_ASYNC 모드는 aiosqlite가 파일 잠금에서 직렬화되므로
+MySQL(aiomysql)로 재야 의미가 있다. 요청은 httpx ASGITransport로 같은 프로세스의 앱에 보낸다.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp = tempfile.mkdtemp(prefix="bench-async-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("CACHE_BACKEND", "none")  # 캐시 없이 매 요청 DB 조회
+os.environ.setdefault("QUERY_BUDGET_MODE", "off")
+os.environ.setdefault("SEARCH_INDEX_PATH", f"{_tmp}/search_index.pkl")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from database import connection  # noqa: E402
+from database.connection import Base, SessionLocal, engine  # noqa: E402
+from schemas.product import ProductCreate  # noqa: E402
+from services.product_service import ProductService  # noqa: E402
+import services.async_services as async_services  # noqa: E402
+import main as app_module  # noqa: E402
+
+def seed(products: int):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        service = ProductService()
+        for index in range(products):
+            service.create_product(db, ProductCreate(
+                handle=f"bench-{index}",
+                title=f"Bench product {index}",
+                variants=[{"title": "Default", "price": "10.00", "sku": f"bench-{index}", "inventory_quantity": 100}]
+            ))
+    finally:
+        db.close()
+
+def add_latency(latency_ms: float):
+    """쿼리마다 지연 (동기 드라이버가 응답을 기다리는 동안 스레드를 막는 것과 같음)"""
+    if latency_ms <= 0:
+        return
+
+    def _wait(*args, **kwargs):
+        time.sleep(latency_ms / 1000)
+
+    event.listen(engine, "before_cursor_execute", _wait)
+    if connection.async_engine is not None:
+        # 비동기 드라이버는 자체 스레드에서 커서를 실행하므로 지연이 루프를 막지 않음
+        event.listen(connection.async_engine.sync_engine, "before_cursor_execute", _wait)
+
+async def blocking_run_db(db, fn, *args, **kwargs):
+    """이전 방식: 비동기 핸들러 안에서 동기 세션 호출 (이벤트 루프 스레드를 막음)"""
+    if isinstance(db, AsyncSession):
+        sync_db = SessionLocal()
+        try:
+            return fn(sync_db, *args, **kwargs)
+        finally:
+            sync_db.close()
+    return fn(db, *args, **kwargs)
+
+async def measure(total: int, concurrency: int, products: int) -> float:
+    transport = httpx.ASGITransport(app=app_module.app)
+    paths = [f"/api/v1/products/bench-{index % products}" for index in range(total)]
+    queue = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                response = await client.get(queue.get_nowait())
+                response.raise_for_status()
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return total / (time.perf_counter() - started_at)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--products", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("sql.slow").setLevel(logging.ERROR)
+    seed(args.products)
+    add_latency(args.latency_ms)
+
+    run_db = async_services.run_db
+    results = {}
+    for mode, runner in (("event loop (before)", blocking_run_db), ("run_db (after)", run_db)):
+        async_services.run_db = runner
+        asyncio.run(measure(args.concurrency, args.concurrency, args.products))  # 워밍업
+        results[mode] = asyncio.run(measure(args.requests, args.concurrency, args.products))
+    async_services.run_db = run_db
+    if connection.async_engine is not None:
+        asyncio.run(connection.async_engine.dispose())
+
+    print(f"GET /products/{{handle}} x {args.requests}, concurrency {args.concurrency}, "
+          f"query latency {args.latency_ms}ms, DATABASE_ASYNC={app_module.settings.DATABASE_ASYNC}")
+    for mode, throughput in results.items():
+        print(f"  {mode:<22} {throughput:8.1f} req/s")
+
+if __name__ == "__main__":
+    main()
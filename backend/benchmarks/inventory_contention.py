@@ -0,0 +1,122 @@
+"""핫 변형 상품 재고 차감 경합: 단일 행 vs 분할 재고(서브 카운터)
+
+    python -m benchmarks.inventory_contention [--shards 16] [--concurrency 1,4,16,32] [--hold-ms 5]
+
+동시 주문 수를 늘려 가며 한 변형 상품의 재고를 1개씩 차감하고 초당 차감 수를 비교한다.
+각 트랜잭션은 차감 후 --hold-ms만큼 행 잠금을 쥔 채 기다렸다 커밋한다 (주문 행/아이템 기록 등
+같은 트랜잭션의 나머지 작업을 흉내 냄). 행 잠금 경합을 보려면 DATABASE_URL로 MySQL을 지정한다.
+기본값인 임시 SQLite 파일은 데이터베이스 전체를 잠그므로 두 방식 모두 직렬화된다.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp = tempfile.mkdtemp(prefix="bench-inventory-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from database.connection import Base, SessionLocal, engine  # noqa: E402
+from models.product import Product, ProductVariant  # noqa: E402
+from services.inventory_service import inventory_service  # noqa: E402
+from services.inventory_shards import inventory_shards  # noqa: E402
+import models  # noqa: E402,F401
+
+STOCK = 10_000_000
+
+def seed(shards: int) -> dict:
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        product = Product(handle="bench-hot", title="Bench hot product")
+        db.add(product)
+        db.flush()
+        variant_ids = {}
+        for mode in ("single row", f"{shards} shards"):
+            variant = ProductVariant(
+                product_id=product.id,
+                title=mode,
+                price=10,
+                sku=f"bench-hot-{mode}",
+                inventory_quantity=STOCK
+            )
+            db.add(variant)
+            db.flush()
+            variant_ids[mode] = variant.id
+        inventory_shards.configure(db, variant_ids[f"{shards} shards"], shards)
+        db.commit()
+        return variant_ids
+    finally:
+        db.close()
+
+def decrement_once(variant_id: int, hold: float) -> int:
+    """재고 1개 차감 트랜잭션 하나 (잠금 충돌로 실패하면 다시 시도), 재시도 횟수 반환"""
+    retries = 0
+    while True:
+        db = SessionLocal()
+        try:
+            inventory_service.decrement(db, {variant_id: 1})
+            if hold:
+                time.sleep(hold)
+            db.commit()
+            return retries
+        except OperationalError:
+            db.rollback()
+            retries += 1
+        finally:
+            db.close()
+
+def measure(variant_id: int, concurrency: int, per_worker: int, hold: float):
+    retries = [0]
+    lock = threading.Lock()
+
+    def worker():
+        count = 0
+        for _ in range(per_worker):
+            count += decrement_once(variant_id, hold)
+        with lock:
+            retries[0] += count
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started_at
+    return concurrency * per_worker / elapsed, retries[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--concurrency", default="1,4,16,32")
+    parser.add_argument("--per-worker", type=int, default=25, help="decrements per concurrent worker")
+    parser.add_argument("--hold-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.getLogger("sql.slow").setLevel(logging.ERROR)
+    # 보류 없이 재고 차감만 측정
+    inventory_service.hold_ttl = 0
+    variant_ids = seed(args.shards)
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    print(f"decrement 1 unit of one hot variant, {args.per_worker} per worker, "
+          f"lock held {args.hold_ms}ms, {engine.dialect.name}")
+    print(f"  {'concurrency':>11}" + "".join(f"  {mode:>22}" for mode in variant_ids))
+    for concurrency in levels:
+        cells = []
+        for variant_id in variant_ids.values():
+            throughput, retries = measure(variant_id, concurrency, args.per_worker, args.hold_ms / 1000)
+            cells.append(f"{throughput:8.1f}/s ({retries:>4} retries)")
+        print(f"  {concurrency:>11}" + "".join(f"  {cell:>22}" for cell in cells))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""기본 키 삽입 성능: 무작위 UUIDv4 vs 시간 순서 UUIDv7 (VARCHAR(36) PK)
+
+    python -m benchmarks.uuid_pk_insert [--rows 10000000] [--batch-size 5000] [--report-every 1000000]
+
+같은 구조의 임시 테이블 두 개에 행을 배치로 넣으며 구간별 초당 삽입 수를 출력한다.
+테이블이 버퍼 풀보다 커지면 UUIDv4는 임의의 인덱스 페이지에 끼어들어 페이지 분할/디스크 읽기가
+늘고 구간 처리량이 떨어지지만, UUIDv7은 항상 인덱스 끝에 붙는다. 이 차이는 InnoDB 클러스터드
+인덱스에서 나타나므로 DATABASE_URL로 MySQL을 지정해 실행한다 (MySQL이면 마지막에 테이블 크기도 출력).
+기본값인 임시 SQLite 파일에서는 --rows를 줄여 실행한다 (B-트리 PK라 같은 경향이 작게 보인다).
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp = tempfile.mkdtemp(prefix="bench-uuid-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+os.environ.setdefault("DEBUG", "False")
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, text  # noqa: E402
+
+from core.ids import new_id  # noqa: E402
+from database.connection import engine  # noqa: E402
+
+metadata = MetaData()
+
+def _table(name: str) -> Table:
+    # orders와 비슷한 크기의 행 (PK + 보조 인덱스 없는 몇 개 컬럼)
+    return Table(
+        name,
+        metadata,
+        Column("id", String(36), primary_key=True),
+        Column("user_id", String(255)),
+        Column("email", String(255)),
+        Column("status", String(20)),
+        Column("total", Integer),
+        Column("created_at", DateTime),
+    )
+
+GENERATORS = {
+    "uuid4": lambda: str(uuid.uuid4()),
+    "uuid7": new_id,
+}
+TABLES = {name: _table(f"bench_pk_{name}") for name in GENERATORS}
+
+def insert_rows(table: Table, make_id, rows: int, batch_size: int, report_every: int):
+    """rows개를 batch_size씩 넣고 report_every마다 (누적 행 수, 구간 초당 삽입 수) 출력"""
+    inserted = 0
+    segment_rows = 0
+    segment_started = started_at = time.perf_counter()
+    while inserted < rows:
+        count = min(batch_size, rows - inserted)
+        batch = [
+            {
+                "id": make_id(),
+                "user_id": f"user-{(inserted + index) % 100000}",
+                "email": "buyer@example.com",
+                "status": "pending",
+                "total": 100,
+                "created_at": None,
+            }
+            for index in range(count)
+        ]
+        with engine.begin() as connection:
+            connection.execute(table.insert(), batch)
+        inserted += count
+        segment_rows += count
+
+        if segment_rows >= report_every or inserted == rows:
+            now = time.perf_counter()
+            print(f"  {table.name:<16} {inserted:>12,} rows  {segment_rows / (now - segment_started):>10,.0f} rows/s")
+            segment_rows = 0
+            segment_started = now
+    return rows / (time.perf_counter() - started_at)
+
+def table_size(table: Table):
+    """MySQL 테이블 데이터/인덱스 크기 (MB), 그 외 드라이버는 None"""
+    if engine.dialect.name != "mysql":
+        return None
+    with engine.connect() as connection:
+        connection.execute(text(f"ANALYZE TABLE {table.name}"))
+        row = connection.execute(text(
+            "SELECT data_length, index_length FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = :name"
+        ), {"name": table.name}).first()
+    return row[0] / 1024 / 1024, row[1] / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--report-every", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark tables afterwards")
+    args = parser.parse_args()
+
+    logging.getLogger("sql.slow").setLevel(logging.ERROR)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    print(f"insert {args.rows:,} rows in batches of {args.batch_size:,} ({engine.dialect.name})")
+    results = {}
+    try:
+        for name, make_id in GENERATORS.items():
+            results[name] = insert_rows(TABLES[name], make_id, args.rows, args.batch_size, args.report_every)
+
+        print("overall")
+        for name, throughput in results.items():
+            size = table_size(TABLES[name])
+            detail = f"  data {size[0]:,.0f} MB, index {size[1]:,.0f} MB" if size else ""
+            print(f"  {name:<6} {throughput:>10,.0f} rows/s{detail}")
+    finally:
+        if not args.keep:
+            metadata.drop_all(engine)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+import json
+import logging
+import os
+import threading
+import time
+
+from core.config import settings
+from core.concurrency import off_event_loop
+
+logger = logging.getLogger(__name__)
+
+# 2단계 읽기 캐시
+#
+# L1: 프로세스 내 LRU (짧은 TTL, 워커마다 독립)
+# L2: 워커 간 공유 저장소 (Redis, 테스트/단일 노드용 인메모리 구현)
+#
+# 무효화는 L2에 키별 세대(gen:<키>, "무효화 시각 ms-난수")를 기록하고, 값은 <키>@<세대>에 저장한다.
+# 다른 워커가 무효화 전에 읽기 시작한 값을 로드가 끝난 뒤 저장해도 이전 세대 키에 들어가므로
+# 아무도 읽지 않고 TTL로 사라진다. 세대 키는 만료 없이 유지한다 (무효화된 제품/컬렉션 수만큼만 생김).
+#
+# 캐시된 문서는 여러 요청이 같은 객체를 공유하므로 읽기 전용으로 다뤄야 한다.
+
+class CacheStats:
+    """계층별 캐시 통계"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'sets': self.sets,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'errors': self.errors,
+        }
+
+class LRUCache:
+    """크기 제한과 TTL이 있는 프로세스 내 LRU 캐시 (L1)"""
+
+    def __init__(self, max_entries: int = 10000, ttl: int = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def get(self, key: str):
+        """(적중 여부, 값) 반환"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return False, None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return True, value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self.stats.sets += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class MemoryStore:
+    """인메모리 공유 저장소 (L2 대체 구현 - 단일 프로세스/테스트용)"""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def set_many(self, mapping: Dict[str, bytes]):
+        """만료 없이 여러 키 저장"""
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (value, None)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+class RedisStore:
+    """Redis 공유 저장소 (L2)
+
+    동기 클라이언트를 쓰므로 비동기 세션 경로(이벤트 루프 스레드)에서 호출되면 스레드풀에서 실행한다.
+    """
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None,
+                 prefix: str = "commerce:"):
+        import redis
+
+        self.client = redis.Redis(
+            host=host,
+            port=port,
+            db=db,
+            password=password,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+        self.prefix = prefix
+
+    @off_event_loop
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    @off_event_loop
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    @off_event_loop
+    def set_many(self, mapping: Dict[str, bytes]):
+        if mapping:
+            self.client.mset({self.prefix + key: value for key, value in mapping.items()})
+
+    @off_event_loop
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+def _generation_time(generation: str) -> float:
+    """세대를 만든 무효화 시각 (Unix 초)"""
+    return int(generation.split("-", 1)[0]) / 1000
+
+class TwoTierCache:
+    """L1(LRU) + L2(공유 저장소) 읽기 캐시"""
+
+    def __init__(self, l1: Optional[LRUCache], l2=None, ttl: int = 3600, stale_window: float = 0):
+        self.l1 = l1
+        self.l2 = l2
+        self.ttl = ttl
+        # 로드 시작 전 이 시간(초) 안에 무효화된 키도 저장하지 않음
+        # (지연된 읽기 복제본에서 읽은 값이 다시 캐시되는 것을 방지)
+        self.stale_window = stale_window
+        self.l2_stats = CacheStats()
+        # 키별 마지막 무효화 시각 - 로드 중 무효화된 값을 다시 채우지 않기 위함
+        self._invalidated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.l1 is not None or self.l2 is not None
+
+    def _l2_generation(self, key: str) -> Optional[str]:
+        """L2에 기록된 키의 세대 (무효화된 적 없으면 "0", L2를 쓸 수 없으면 None)"""
+        if self.l2 is None:
+            return None
+        try:
+            raw = self.l2.get(f"gen:{key}")
+        except Exception as e:
+            self.l2_stats.errors += 1
+            logger.warning(f"Cache L2 get failed: {e}")
+            return None
+        return raw.decode() if raw is not None else "0"
+
+    def _l2_get(self, key: str, generation: Optional[str]):
+        if generation is None:
+            return False, None
+        try:
+            raw = self.l2.get(f"{key}@{generation}")
+        except Exception as e:
+            self.l2_stats.errors += 1
+            logger.warning(f"Cache L2 get failed: {e}")
+            return False, None
+        if raw is None:
+            self.l2_stats.misses += 1
+            return False, None
+        self.l2_stats.hits += 1
+        return True, json.loads(raw)
+
+    def _l2_set(self, key: str, generation: Optional[str], value: Any):
+        if generation is None:
+            return
+        try:
+            self.l2.set(
+                f"{key}@{generation}",
+                json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(),
+                self.ttl
+            )
+            self.l2_stats.sets += 1
+        except Exception as e:
+            self.l2_stats.errors += 1
+            logger.warning(f"Cache L2 set failed: {e}")
+
+    def get(self, key: str):
+        """(적중 여부, 값) 반환 - L1, L2 순으로 조회하고 L2 적중 시 L1 채움"""
+        if self.l1 is not None:
+            hit, value = self.l1.get(key)
+            if hit:
+                return True, value
+
+        hit, value = self._l2_get(key, self._l2_generation(key))
+        if hit and self.l1 is not None:
+            self.l1.set(key, value)
+        return hit, value
+
+    def set(self, key: str, value: Any):
+        if self.l1 is not None:
+            self.l1.set(key, value)
+        self._l2_set(key, self._l2_generation(key), value)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """캐시 조회 후 없으면 loader 결과를 캐시 (None은 캐시하지 않음)"""
+        if not self.enabled:
+            return loader()
+
+        if self.l1 is not None:
+            hit, value = self.l1.get(key)
+            if hit:
+                return value
+
+        # 로드 전에 읽은 세대에 저장해, 로드 중 다른 워커가 무효화하면 새 세대에서는 보이지 않게 함
+        generation = self._l2_generation(key)
+        hit, value = self._l2_get(key, generation)
+        if hit:
+            if self.l1 is not None:
+                self.l1.set(key, value)
+            return value
+
+        started_at = time.monotonic()
+        started_wall = time.time()
+        value = loader()
+        if value is None:
+            return None
+
+        # 로드 도중(또는 복제 지연 범위 내에) 무효화된 키는 오래된 값일 수 있으므로 저장하지 않음
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(key)
+        if invalidated_at is not None and invalidated_at >= started_at - self.stale_window:
+            return value
+        # 다른 워커의 무효화도 복제 지연 범위 내면 저장하지 않음
+        if self.stale_window and generation not in (None, "0") \
+                and _generation_time(generation) >= started_wall - self.stale_window:
+            return value
+
+        if self.l1 is not None:
+            self.l1.set(key, value)
+        self._l2_set(key, generation, value)
+        return value
+
+    def invalidate(self, keys: Iterable[str]):
+        """키 무효화 (L1, L2 모두)"""
+        keys = list(dict.fromkeys(keys))
+        if not keys or not self.enabled:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._invalidated_at[key] = now
+            # 오래된 무효화 기록 정리
+            if len(self._invalidated_at) > 10000:
+                cutoff = now - 60 - self.stale_window
+                self._invalidated_at = {
+                    key: at for key, at in self._invalidated_at.items() if at >= cutoff
+                }
+
+        if self.l1 is not None:
+            for key in keys:
+                self.l1.delete(key)
+
+        if self.l2 is not None:
+            # 새 세대로 바꾸면 이전 세대 값은 읽히지 않음 (TTL로 사라짐)
+            generation = f"{time.time_ns() // 1_000_000}-{os.urandom(4).hex()}".encode()
+            try:
+                self.l2.set_many({f"gen:{key}": generation for key in keys})
+                self.l2_stats.invalidations += len(keys)
+            except Exception as e:
+                self.l2_stats.errors += 1
+                logger.warning(f"Cache L2 invalidate failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'l1': dict(self.l1.stats.to_dict(), size=len(self.l1)) if self.l1 is not None else None,
+            'l2': self.l2_stats.to_dict() if self.l2 is not None else None,
+        }
+
+def create_cache() -> TwoTierCache:
+    """설정에 따라 캐시 생성 (CACHE_BACKEND: redis, memory, none)"""
+    backend = settings.CACHE_BACKEND
+    if backend == "none":
+        return TwoTierCache(None, None)
+
+    l1 = LRUCache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_TTL) if settings.CACHE_L1_MAX_ENTRIES > 0 else None
+
+    if backend == "redis":
+        try:
+            l2 = RedisStore(
+                settings.REDIS_HOST,
+                settings.REDIS_PORT,
+                settings.REDIS_DB,
+                settings.REDIS_PASSWORD
+            )
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-memory L2 cache")
+            l2 = MemoryStore()
+    else:
+        l2 = MemoryStore()
+
+    stale_window = settings.DATABASE_REPLICA_MAX_LAG if settings.DATABASE_REPLICA_URLS else 0
+    return TwoTierCache(l1, l2, settings.CACHE_TTL, stale_window)
+
+cache = create_cache()
+
+def product_cache_key(handle: str) -> str:
+    return f"product:{handle}"
+
+def collection_cache_key(handle: str) -> str:
+    return f"collection:{handle}"
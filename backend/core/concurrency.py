@@ -0,0 +1,29 @@
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable, TypeVar
+import functools
+
+# 이벤트 루프를 막는 동기 호출 처리
+#
+# 비동기 세션 설정(DATABASE_ASYNC)에서 run_db는 서비스 함수를 AsyncSession.run_sync로 실행한다.
+# 이때 서비스 코드는 이벤트 루프 스레드의 greenlet에서 돌고 DB I/O에서만 루프에 양보하므로,
+# 그 안의 동기 Redis 호출이나 검색 색인 동기화는 루프 전체를 멈춘다. 이런 호출은 blocking_call로 감싼다.
+
+T = TypeVar("T")
+
+def blocking_call(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """DB 외 블로킹 호출 실행
+
+    run_sync의 greenlet(이벤트 루프 스레드) 안이면 스레드풀로 넘기고 끝날 때까지 루프에 양보한다.
+    스레드풀/백그라운드 스레드에서는 바로 호출한다.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(fn, *args, **kwargs))
+    return fn(*args, **kwargs)
+
+def off_event_loop(fn: Callable[..., T]) -> Callable[..., T]:
+    """메서드를 항상 blocking_call로 실행 (동기 Redis 클라이언트를 쓰는 저장소 메서드용)"""
+    @functools.wraps(fn)
+    def call(*args: Any, **kwargs: Any) -> T:
+        return blocking_call(fn, *args, **kwargs)
+    return call
@@ -0,0 +1,65 @@
+import os
+import threading
+import time
+import uuid
+
+# 시간 순서 ID (UUIDv7, RFC 9562)
+#
+# 상위 48비트가 밀리초 타임스탬프라 새 행이 클러스터드 인덱스(InnoDB PK)의 끝에 붙고,
+# 무작위 uuid4처럼 임의의 페이지에 끼어들며 페이지 분할과 버퍼 풀 교체를 일으키지 않는다.
+#
+#  0                   48  52          64 66                                128
+# | unix_ts_ms (48)      |ver| counter(12)|var| random (62)                   |
+#
+# 같은 밀리초 안에서는 12비트 카운터를 올려 프로세스 안에서 단조 증가를 보장하고,
+# 카운터가 넘치면 타임스탬프를 1ms 앞당긴다. 하위 62비트는 매번 새 난수라 여러 프로세스가
+# 동시에 만들어도 충돌하지 않는다 (장바구니 ID처럼 URL에 노출되는 값도 추측할 수 없음).
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+# Crockford Base32 (I, L, O, U 제외 - 사람이 읽고 옮겨 적기 쉬움)
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+def uuid7() -> uuid.UUID:
+    """시간 순서 UUID (프로세스 안에서 단조 증가)"""
+    global _last_ms, _counter
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # 카운터 시작값을 무작위로 두되 상위 비트는 비워 같은 밀리초에 여유를 남김
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x3FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        timestamp, counter = _last_ms, _counter
+
+    random_bits = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (timestamp & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= random_bits
+    return uuid.UUID(int=value)
+
+def new_id() -> str:
+    """새 기본 키 문자열 (표준 36자 UUID 형식이라 기존 VARCHAR(36) 컬럼/API와 호환)"""
+    return str(uuid7())
+
+def base32(value: uuid.UUID) -> str:
+    """UUID를 26자 Crockford Base32로 변환 (ULID 표기, 시간 순서 유지)"""
+    number = value.int
+    chars = []
+    for _ in range(26):
+        chars.append(_CROCKFORD[number & 0x1F])
+        number >>= 5
+    return "".join(reversed(chars))
+
+def id_timestamp(value: str) -> float:
+    """UUIDv7 문자열에 담긴 생성 시각 (Unix 초)"""
+    return (uuid.UUID(value).int >> 80) / 1000
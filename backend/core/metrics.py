@@ -0,0 +1,462 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import bisect
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 경량 메트릭 레지스트리 (Prometheus 텍스트 형식 출력)
+#
+# 기록 경로는 잠금 한 번과 딕셔너리 갱신만 수행하고,
+# 문자열 생성은 /metrics 조회 시에만 한다.
+#
+# 워커가 여러 개면(uvicorn --workers) 각 워커가 자신의 상태를 공유 디렉터리에
+# 주기적으로 기록하고, /metrics를 받은 워커가 모든 워커의 상태를 합쳐 출력한다.
+# 종료된 워커의 누적 값(카운터/히스토그램)은 집계 파일에 합쳐 두어 재시작 후에도 줄지 않는다.
+
+LabelValues = Tuple[str, ...]
+# (이름 접미사, 레이블 이름, 레이블 값, 값)
+Sample = Tuple[str, Tuple[str, ...], LabelValues, float]
+# (pid, 메트릭 상태)
+ProcessState = Tuple[int, list]
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+def _render_family(name: str, documentation: str, type_name: str, samples: Iterable[Sample]) -> List[str]:
+    lines = [
+        f"# HELP {name} {documentation}",
+        f"# TYPE {name} {type_name}",
+    ]
+    for suffix, names, values, value in samples:
+        lines.append(f"{name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+    return lines
+
+class Metric:
+    """메트릭 공통 (이름, 설명, 레이블 이름)"""
+
+    type_name = "untyped"
+    # 종료된 워커의 값도 합산할지 (누적 값은 유지, 현재 값은 제외)
+    include_dead_processes = True
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def state(self) -> list:
+        """JSON으로 저장 가능한 현재 상태"""
+        return []
+
+    def merge(self, states: List[ProcessState], multiprocess: bool) -> List[Sample]:
+        """프로세스별 상태를 합쳐 출력할 샘플 생성"""
+        return []
+
+    def combine(self, states: List[ProcessState]) -> list:
+        """프로세스별 상태를 하나의 상태로 합침 (종료된 워커 집계용)"""
+        return []
+
+    def render(self, states: List[ProcessState], multiprocess: bool = False) -> List[str]:
+        return _render_family(self.name, self.documentation, self.type_name, self.merge(states, multiprocess))
+
+class Counter(Metric):
+    """단조 증가 카운터"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def state(self) -> list:
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, states, multiprocess):
+        totals: Dict[LabelValues, float] = {}
+        for _, state in states:
+            for key, value in state:
+                key = tuple(key)
+                totals[key] = totals.get(key, 0) + value
+        return [("_total", self.labelnames, key, value) for key, value in totals.items()]
+
+    def combine(self, states):
+        return [[list(key), value] for _, _, key, value in self.merge(states, True)]
+
+class Gauge(Metric):
+    """현재 값 게이지 (collect 함수를 주면 조회 시점에 값을 계산)
+
+    multiprocess_mode - 워커가 여러 개일 때 합치는 방법
+      sum: 워커 값 합계, all: 워커별로 pid 레이블을 붙여 출력
+    """
+
+    type_name = "gauge"
+    include_dead_processes = False
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Iterable[Tuple[Dict[str, str], float]]]] = None,
+                 multiprocess_mode: str = "sum"):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def state(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+        if self._collect is not None:
+            for labels, value in self._collect():
+                values[self._key(labels)] = value
+        return [[list(key), value] for key, value in values.items()]
+
+    def merge(self, states, multiprocess):
+        if multiprocess and self.multiprocess_mode == "all":
+            names = self.labelnames + ("pid",)
+            return [
+                ("", names, tuple(key) + (str(pid),), value)
+                for pid, state in states
+                for key, value in state
+            ]
+
+        totals: Dict[LabelValues, float] = {}
+        for _, state in states:
+            for key, value in state:
+                key = tuple(key)
+                totals[key] = totals.get(key, 0) + value
+        return [("", self.labelnames, key, value) for key, value in totals.items()]
+
+# 초 단위 지연 기본 버킷
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def bucket_quantile(q: float, bounds: Sequence[float], cumulative: Sequence[int]) -> float:
+    """누적 버킷에서 분위수 추정 (버킷 내 선형 보간 - PromQL histogram_quantile과 동일한 방식)"""
+    total = cumulative[-1]
+    if total == 0:
+        return math.nan
+    rank = q * total
+    index = bisect.bisect_left(cumulative, rank)
+    if index >= len(bounds):
+        # +Inf 버킷에 속하면 마지막 유한 상한을 반환
+        return bounds[-1]
+    upper = bounds[index]
+    lower = bounds[index - 1] if index > 0 else 0.0
+    below = cumulative[index - 1] if index > 0 else 0
+    in_bucket = cumulative[index] - below
+    if in_bucket == 0:
+        return upper
+    return lower + (upper - lower) * (rank - below) / in_bucket
+
+class Histogram(Metric):
+    """누적 버킷 히스토그램 (quantiles를 주면 버킷 기반 분위수 추정치도 함께 출력)"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, quantiles: Sequence[float] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.quantiles = tuple(quantiles)
+        # 레이블 값별 [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def state(self) -> list:
+        with self._lock:
+            return [[list(key), list(counts), self._sums[key]] for key, counts in self._counts.items()]
+
+    def _merged(self, states) -> Dict[LabelValues, Tuple[List[int], float]]:
+        merged: Dict[LabelValues, Tuple[List[int], float]] = {}
+        for _, state in states:
+            for key, counts, total in state:
+                key = tuple(key)
+                if len(counts) != len(self.buckets) + 1:
+                    # 버킷 구성이 다른 이전 버전 워커의 상태는 무시
+                    continue
+                if key in merged:
+                    previous_counts, previous_total = merged[key]
+                    merged[key] = ([a + b for a, b in zip(previous_counts, counts)], previous_total + total)
+                else:
+                    merged[key] = (list(counts), total)
+        return merged
+
+    def combine(self, states):
+        return [[list(key), counts, total] for key, (counts, total) in self._merged(states).items()]
+
+    def render(self, states, multiprocess=False):
+        merged = self._merged(states)
+        bounds = self.buckets + (math.inf,)
+        names = self.labelnames + ("le",)
+
+        samples = []
+        quantile_samples = []
+        for key, (counts, total) in merged.items():
+            cumulative = []
+            running = 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            for bound, value in zip(bounds, cumulative):
+                samples.append(("_bucket", names, key + (_format_value(bound),), value))
+            samples.append(("_sum", self.labelnames, key, total))
+            samples.append(("_count", self.labelnames, key, running))
+            for q in self.quantiles:
+                quantile_samples.append((
+                    "", self.labelnames + ("quantile",), key + (_format_value(q),),
+                    bucket_quantile(q, self.buckets, cumulative)
+                ))
+
+        lines = _render_family(self.name, self.documentation, self.type_name, samples)
+        if self.quantiles:
+            lines.extend(_render_family(
+                f"{self.name}_quantile",
+                f"Bucket-interpolated quantiles of {self.name}",
+                "gauge",
+                quantile_samples
+            ))
+        return lines
+
+AGGREGATE_FILENAME = "aggregate.json"
+AGGREGATE_LOCK_FILENAME = "aggregate.lock"
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class MetricsRegistry:
+    """메트릭 등록 및 텍스트 형식 출력"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self.multiprocess_dir: Optional[str] = None
+        self._writer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), collect=None,
+              multiprocess_mode: str = "sum") -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect, multiprocess_mode))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS, quantiles: Sequence[float] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets, quantiles))
+
+    def _metrics_list(self) -> List[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    # 멀티 프로세스
+
+    def enable_multiprocess(self, directory: str, interval: float = 5.0):
+        """워커별 상태를 directory에 interval초마다 기록 (종료된 워커 파일은 집계 파일에 합침)"""
+        os.makedirs(directory, exist_ok=True)
+        self.multiprocess_dir = directory
+        self._fold_dead_processes()
+
+        self.write_snapshot()
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._write_loop, args=(interval,), daemon=True, name="metrics-writer")
+        self._writer.start()
+
+    def disable_multiprocess(self):
+        """기록 중단 (마지막 상태는 남겨 누적 값이 유지되도록 함)"""
+        if self.multiprocess_dir is None:
+            return
+        self._stop.set()
+        self.write_snapshot()
+
+    def _write_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                logger.warning(f"Metrics snapshot failed: {e}")
+
+    def _locked(self, mode: int):
+        """여러 워커가 집계 파일을 함께 다루지 않도록 디렉터리 단위 파일 잠금"""
+        lock_file = open(os.path.join(self.multiprocess_dir, AGGREGATE_LOCK_FILENAME), "a")
+        fcntl.flock(lock_file, mode)
+        return lock_file
+
+    def _read_aggregate(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.multiprocess_dir, AGGREGATE_FILENAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _fold_dead_processes(self):
+        """종료된 워커 파일의 누적 값을 집계 파일에 합치고 파일 삭제 (현재 값은 버림)
+
+        같은 pid를 재사용한 워커가 이전 파일을 덮어쓰지 않도록 자기 pid 파일도 처리한다.
+        """
+        with self._locked(fcntl.LOCK_EX):
+            dead = [
+                (pid, filename, data)
+                for pid, filename, data in self._snapshot_files()
+                if pid == os.getpid() or not _pid_alive(pid)
+            ]
+            if not dead:
+                return
+
+            aggregate = self._read_aggregate()
+            for metric in self._metrics_list():
+                if not metric.include_dead_processes:
+                    continue
+                states = [(pid, data[metric.name]) for pid, _, data in dead if metric.name in data]
+                if not states:
+                    continue
+                if metric.name in aggregate:
+                    states.append((0, aggregate[metric.name]))
+                aggregate[metric.name] = metric.combine(states)
+
+            path = os.path.join(self.multiprocess_dir, AGGREGATE_FILENAME)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(aggregate, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+
+            for _, filename, _ in dead:
+                try:
+                    os.remove(os.path.join(self.multiprocess_dir, filename))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _pid_from_filename(filename: str) -> Optional[int]:
+        if not filename.startswith("metrics_") or not filename.endswith(".json"):
+            return None
+        try:
+            return int(filename[len("metrics_"):-len(".json")])
+        except ValueError:
+            return None
+
+    def write_snapshot(self):
+        if self.multiprocess_dir is None:
+            return
+        pid = os.getpid()
+        data = {metric.name: metric.state() for metric in self._metrics_list()}
+        path = os.path.join(self.multiprocess_dir, f"metrics_{pid}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def _snapshot_files(self) -> List[Tuple[int, str, Dict[str, Any]]]:
+        snapshots = []
+        for filename in os.listdir(self.multiprocess_dir):
+            pid = self._pid_from_filename(filename)
+            if pid is None:
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, filename)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.append((pid, filename, data))
+        return snapshots
+
+    def _read_snapshots(self) -> List[Tuple[int, bool, Dict[str, Any]]]:
+        with self._locked(fcntl.LOCK_SH):
+            snapshots = [
+                (pid, pid == os.getpid() or _pid_alive(pid), data)
+                for pid, _, data in self._snapshot_files()
+            ]
+            # 종료된 워커들의 누적 값
+            snapshots.append((0, False, self._read_aggregate()))
+        return snapshots
+
+    def render(self) -> str:
+        metrics = self._metrics_list()
+        lines = []
+
+        if self.multiprocess_dir is None:
+            pid = os.getpid()
+            for metric in metrics:
+                lines.extend(metric.render([(pid, metric.state())]))
+            return "\n".join(lines) + "\n"
+
+        self.write_snapshot()
+        snapshots = self._read_snapshots()
+        for metric in metrics:
+            states = [
+                (pid, data[metric.name])
+                for pid, alive, data in snapshots
+                if metric.name in data and (alive or metric.include_dead_processes)
+            ]
+            lines.extend(metric.render(states, multiprocess=True))
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# Prometheus 텍스트 형식 Content-Type
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4"
@@ -0,0 +1,95 @@
+from sqlalchemy import and_, or_
+from typing import Any, Optional, Tuple
+from decimal import Decimal
+import base64
+import datetime
+import json
+
+# 키셋(커서) 페이지네이션 유틸리티
+#
+# 커서는 마지막으로 반환된 행의 (정렬 키 값, id)를 담은 불투명 토큰이다.
+# 다음 페이지는 OFFSET 대신 "(정렬 컬럼, id) 가 커서보다 뒤"인 조건으로
+# 조회하므로 (정렬 컬럼, PK) 인덱스에서 바로 탐색을 시작한다.
+
+def encode_cursor(sort_key: str, value: Any, last_id: Any) -> str:
+    """정렬 키 값과 id를 커서 토큰으로 인코딩"""
+    if isinstance(value, datetime.datetime):
+        encoded = {"t": "dt", "v": value.isoformat()}
+    elif isinstance(value, Decimal):
+        encoded = {"t": "dec", "v": str(value)}
+    else:
+        encoded = {"t": "raw", "v": value}
+
+    payload = json.dumps({"k": sort_key, "v": encoded, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_key: str) -> Tuple[Any, Any]:
+    """커서 토큰을 (정렬 키 값, id)로 디코딩"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        encoded = payload["v"]
+        if encoded["t"] == "dt":
+            value = datetime.datetime.fromisoformat(encoded["v"])
+        elif encoded["t"] == "dec":
+            value = Decimal(encoded["v"])
+        else:
+            value = encoded["v"]
+        cursor_sort_key = payload["k"]
+        last_id = payload["id"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if cursor_sort_key != sort_key:
+        raise ValueError("Cursor does not match sort key")
+
+    return value, last_id
+
+def keyset_order_by(column, id_column, reverse: bool = False) -> list:
+    """키셋 페이지네이션용 정렬 (정렬 컬럼 + id 타이브레이커)"""
+    if reverse:
+        return [column.desc(), id_column.desc()]
+    return [column.asc(), id_column.asc()]
+
+def keyset_filter(column, id_column, value: Any, last_id: Any, reverse: bool = False):
+    """커서 이후의 행만 선택하는 조건
+
+    MySQL은 오름차순에서 NULL을 먼저 정렬하므로 NULL 값도 같은 순서로 이어서 탐색한다.
+    """
+    if not reverse:
+        if value is None:
+            return or_(
+                and_(column.is_(None), id_column > last_id),
+                column.isnot(None)
+            )
+        return or_(
+            column > value,
+            and_(column == value, id_column > last_id)
+        )
+
+    if value is None:
+        return and_(column.is_(None), id_column < last_id)
+    return or_(
+        column < value,
+        and_(column == value, id_column < last_id),
+        column.is_(None)
+    )
+
+def paginate(query, column, id_column, sort_key: str, reverse: bool = False,
+             page: int = 1, per_page: int = 20, after: Optional[str] = None):
+    """키셋 또는 OFFSET 방식으로 한 페이지를 조회
+
+    after가 주어지면 커서 이후부터 조회하고, 없으면 기존 page 기반 OFFSET을 사용한다.
+    (행 목록, 다음 페이지 존재 여부)를 반환한다.
+    """
+    query = query.order_by(*keyset_order_by(column, id_column, reverse))
+
+    if after:
+        value, last_id = decode_cursor(after, sort_key)
+        query = query.filter(keyset_filter(column, id_column, value, last_id, reverse))
+    else:
+        query = query.offset((page - 1) * per_page)
+
+    # 다음 페이지 존재 여부 확인을 위해 한 건 더 조회
+    rows = query.limit(per_page + 1).all()
+    return rows[:per_page], len(rows) > per_page
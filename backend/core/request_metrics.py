@@ -0,0 +1,131 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+import time
+
+from core.config import settings
+from core.metrics import registry
+from core.serialization import dumps
+from database.query_stats import start_query_stats, stop_query_stats, exceeded_budget
+
+logger = logging.getLogger(__name__)
+
+# HTTP 요청 메트릭 미들웨어
+#
+# - 라우트 템플릿(/api/v1/products/{handle})/메서드/상태 코드별 지연 히스토그램과 p50/p95/p99 추정치
+# - 처리 중인 요청 수, 요청/응답 본문 바이트 수
+# - 응답 헤더: X-Process-Time, X-DB-Query-Count, X-DB-Time (엔드포인트 쿼리 예산 검사 포함)
+#
+# BaseHTTPMiddleware를 거치지 않는 순수 ASGI 미들웨어라 요청마다 태스크/스트림을 새로 만들지 않는다.
+# 라우트가 없는 요청은 경로 대신 "unmatched"로 묶어 레이블 수가 늘어나지 않게 한다.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"],
+    LATENCY_BUCKETS,
+    LATENCY_QUANTILES
+)
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed",
+    ["method"]
+)
+request_size = registry.counter(
+    "http_request_size_bytes",
+    "HTTP request body bytes received",
+    ["method", "route"]
+)
+response_size = registry.counter(
+    "http_response_size_bytes",
+    "HTTP response body bytes sent",
+    ["method", "route", "status"]
+)
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class RequestMetricsMiddleware:
+    """요청 지연/크기/동시 처리 수 기록과 처리 시간 헤더 추가"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started_at = time.perf_counter()
+        status_code = 500
+        received = 0
+        sent = 0
+        replaced = False
+        stats, token = start_query_stats()
+        requests_in_flight.inc(method=method)
+
+        async def receive_wrapper() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, sent, replaced
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = [
+                    (b"x-process-time", str(time.perf_counter() - started_at).encode()),
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time", str(stats.duration).encode()),
+                ]
+
+                budget = exceeded_budget(scope.get("endpoint"), stats)
+                if budget is not None and settings.QUERY_BUDGET_MODE != "off":
+                    text = (
+                        f"Query budget exceeded: {method} {route_template(scope)} "
+                        f"ran {stats.count} queries (budget {budget})"
+                    )
+                    logger.warning(text)
+                    if settings.QUERY_BUDGET_MODE == "strict":
+                        # 원래 응답 대신 500 응답을 보내고, 이후 원래 본문은 버린다
+                        replaced = True
+                        status_code = 500
+                        body = dumps({"detail": text})
+                        sent += len(body)
+                        await send({
+                            "type": "http.response.start",
+                            "status": 500,
+                            "headers": [
+                                (b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode()),
+                            ] + timing,
+                        })
+                        await send({"type": "http.response.body", "body": body})
+                        return
+
+                headers = MutableHeaders(scope=message)
+                for name, value in timing:
+                    headers.append(name.decode(), value.decode())
+            elif message["type"] == "http.response.body":
+                if replaced:
+                    return
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            stop_query_stats(token)
+            requests_in_flight.dec(method=method)
+            route = route_template(scope)
+            status = str(status_code)
+            request_duration.observe(time.perf_counter() - started_at, method=method, route=route, status=status)
+            request_size.inc(received, method=method, route=route)
+            response_size.inc(sent, method=method, route=route, status=status)
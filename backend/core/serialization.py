@@ -0,0 +1,125 @@
+from pydantic import BaseModel
+from starlette.responses import Response
+from typing import Any, Callable, Optional, Union, get_args, get_origin
+from datetime import datetime
+from decimal import Decimal
+import functools
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 미설치 시 표준 json 사용
+    orjson = None
+
+# 응답 직렬화 고속 경로
+#
+# 서비스가 돌려주는 to_dict() 결과는 이미 응답 스키마를 만족하는 신뢰된 데이터이므로
+# pydantic 모델로 다시 검증하지 않고, 스키마 필드 순서/타입 규칙만 적용해 바로 JSON 바이트로 만든다.
+# 출력은 FastAPI 기본 경로(response_model 검증 후 JSONResponse)와 같은 바이트를 목표로 한다.
+#   - 스키마에 없는 키 제거, 필드 선언 순서로 정렬, 누락된 필드는 기본값
+#   - Decimal 필드: 문자열 ("10.5", "0")
+#   - datetime 필드: ISO 8601 (UTC 오프셋은 "Z")
+#   - Dict[str, Any] 등 그 밖의 값: 그대로
+
+Shaper = Callable[[Any], Any]
+
+def _shape_decimal(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, float):
+        # pydantic은 float를 repr 기준으로 Decimal 변환
+        return str(Decimal(repr(value)))
+    if isinstance(value, Decimal):
+        return str(value)
+    return str(Decimal(value))
+
+def _shape_datetime(value: Any) -> Any:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    if isinstance(value, str) and value.endswith("+00:00"):
+        return value[:-6] + "Z"
+    return value
+
+@functools.lru_cache(maxsize=None)
+def _compile_type(annotation: Any) -> Optional[Shaper]:
+    """타입 주석에 맞는 변환 함수 (변환이 필요 없으면 None)"""
+    origin = get_origin(annotation)
+
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None
+        inner = _compile_type(args[0])
+        if inner is None:
+            return None
+        return lambda value: None if value is None else inner(value)
+
+    if origin is list:
+        (item_type,) = get_args(annotation) or (Any,)
+        inner = _compile_type(item_type)
+        if inner is None:
+            return None
+        return lambda value: [inner(item) for item in value]
+
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return compile_shaper(annotation)
+        if issubclass(annotation, Decimal):
+            return _shape_decimal
+        if issubclass(annotation, datetime):
+            return _shape_datetime
+
+    return None
+
+@functools.lru_cache(maxsize=None)
+def compile_shaper(model: type) -> Shaper:
+    """응답 모델의 필드 순서/타입 규칙을 적용하는 변환 함수 생성 (모델별 1회)"""
+    fields = []
+    for name, field in model.model_fields.items():
+        default = None if field.is_required() else field.get_default(call_default_factory=False)
+        fields.append((name, _compile_type(field.annotation), field.default_factory, default))
+
+    def shape(data: dict) -> dict:
+        result = {}
+        for name, shaper, default_factory, default in fields:
+            if name in data:
+                value = data[name]
+                result[name] = value if shaper is None else shaper(value)
+            else:
+                value = default_factory() if default_factory is not None else default
+                result[name] = value if shaper is None or value is None else shaper(value)
+        return result
+
+    return shape
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """JSON 바이트로 직렬화 (JSONResponse와 같은 compact/UTF-8 형식)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default
+    ).encode("utf-8")
+
+def fast_response(content: Any, model: Any = None, status_code: int = 200) -> Response:
+    """신뢰된 서비스 결과를 재검증 없이 JSON 응답으로 변환
+
+    model은 라우트의 response_model과 같은 타입(모델 또는 List[모델])을 넘긴다.
+    Response를 직접 반환하므로 FastAPI의 response_model 검증/인코딩 단계를 건너뛴다.
+    """
+    if model is not None:
+        shaper = _compile_type(model)
+        if shaper is not None:
+            content = shaper(content)
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json")
@@ -1,25 +1,76 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+import itertools
 import logging
+import threading
+import time
 
 from core.config import settings
+from database.pool_metrics import (
+    InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool, instrument_engine
+)
+from database.query_stats import track_queries
+
+def _connect_args(url: str) -> Dict[str, Any]:
+    """드라이버별 연결 인자 (MySQL 문자셋 / SQLite 스레드 공유)"""
+    if url.startswith("mysql"):
+        return {
+            "charset": "utf8mb4",
+            "use_unicode": True,
+        }
+    if url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    return {}
+
+def _async_url(url: str) -> str:
+    return url.replace("+pymysql", "+aiomysql", 1)
+
+def _create_engine(url: str, name: str):
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=settings.DATABASE_ECHO,
+        connect_args=_connect_args(url)
+    )
+    instrument_engine(engine, name)
+    track_queries(engine)
+    return engine
+
+def _create_async_engine(url: str, name: str):
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=settings.DATABASE_ECHO,
+        connect_args=_connect_args(url)
+    )
+    instrument_engine(engine.sync_engine, name)
+    track_queries(engine.sync_engine)
+    return engine
+
+def _async_session_factory(bind):
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=True
+    )
 
 # 데이터베이스 엔진 생성
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=settings.DEBUG,
-    connect_args={
-        "charset": "utf8mb4",
-        "use_unicode": True,
-    }
-)
+engine = _create_engine(settings.DATABASE_URL, "primary")
 
 # 세션 팩토리 생성
 SessionLocal = sessionmaker(
@@ -28,6 +79,135 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# 비동기 엔진 (DATABASE_ASYNC=true일 때만 생성)
+# 요청 처리 경로는 비동기 드라이버(aiomysql)를 사용하고,
+# 시작 작업/백그라운드 작업은 위의 동기 엔진을 그대로 사용한다.
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DATABASE_ASYNC:
+    async_engine = _create_async_engine(settings.async_database_url, "primary_async")
+    AsyncSessionLocal = _async_session_factory(async_engine)
+
+class Replica:
+    """읽기 전용 복제본 연결과 마지막으로 측정한 복제 지연"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = _create_engine(url, name)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_engine = _create_async_engine(_async_url(url), f"{name}_async") if settings.DATABASE_ASYNC else None
+        self.async_session_factory = _async_session_factory(self.async_engine) if self.async_engine else None
+        # 복제 지연(초), 측정 실패/복제 중단 시 None
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+
+    def measure_lag(self) -> Optional[float]:
+        """복제 지연 측정 (MySQL/MariaDB는 복제 상태, 그 외 드라이버는 연결 확인만)"""
+        with self.engine.connect() as connection:
+            if self.engine.dialect.name != "mysql":
+                connection.execute(text("SELECT 1"))
+                return 0.0
+
+            try:
+                status = connection.execute(text("SHOW REPLICA STATUS")).mappings().first()
+            except Exception:
+                # MySQL 8.0.22 / MariaDB 10.5.1 이전 버전
+                status = connection.execute(text("SHOW SLAVE STATUS")).mappings().first()
+
+        if status is None:
+            # 복제 설정이 없는 서버 (로컬 대역 등)
+            return 0.0
+        lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+        return float(lag) if lag is not None else None
+
+    def refresh(self):
+        try:
+            self.lag = self.measure_lag()
+        except Exception as e:
+            self.lag = None
+            logging.warning(f"Replica {self.name} lag check failed: {e}")
+        self.checked_at = time.monotonic()
+
+    @property
+    def healthy(self) -> bool:
+        return self.lag is not None and self.lag <= settings.DATABASE_REPLICA_MAX_LAG
+
+class ReplicaRouter:
+    """읽기 요청을 복제본에 분산하고, 지연이 허용치를 넘으면 주 DB로 되돌린다"""
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(f"replica_{index}", url) for index, url in enumerate(urls)]
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+
+    def _refresh_stale(self):
+        # 지연 측정은 주기마다 한 스레드만 수행하고, 나머지는 직전 측정값을 사용
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            for replica in self.replicas:
+                if now - replica.checked_at >= settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL:
+                    replica.refresh()
+        finally:
+            self._lock.release()
+
+    def choose(self) -> Optional[Replica]:
+        """정상 복제본을 라운드로빈으로 선택 (없으면 None - 주 DB 사용)"""
+        if not self.replicas:
+            return None
+
+        self._refresh_stale()
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": replica.name, "lag": replica.lag, "healthy": replica.healthy}
+            for replica in self.replicas
+        ]
+
+    async def dispose(self):
+        for replica in self.replicas:
+            replica.engine.dispose()
+            if replica.async_engine is not None:
+                await replica.async_engine.dispose()
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+
+# 쓰기 직후 읽기 일관성 (read-your-writes)
+# 변경 요청이 성공하면 쿠키에 만료 시각을 기록하고, 그 전까지의 읽기는 주 DB에서 처리한다.
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+
+def stick_to_primary(response: Response):
+    """이후 READ_YOUR_WRITES_WINDOW초 동안 읽기를 주 DB로 고정"""
+    window = settings.READ_YOUR_WRITES_WINDOW
+    response.set_cookie(
+        PRIMARY_STICKY_COOKIE,
+        str(int(time.time() + window)),
+        max_age=window,
+        httponly=True,
+        samesite="lax"
+    )
+
+def prefers_primary(request: Request) -> bool:
+    value = request.cookies.get(PRIMARY_STICKY_COOKIE)
+    if not value:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+# 라우터에서 받는 세션 타입 (설정에 따라 둘 중 하나)
+DbSession = Union[Session, AsyncSession]
+
+T = TypeVar("T")
+
 # 베이스 클래스 생성
 Base = declarative_base()
 
@@ -45,8 +225,8 @@ metadata = MetaData(
 Base.metadata = metadata
 
 # 데이터베이스 세션 의존성
-def get_db():
-    db = SessionLocal()
+def _sync_session(factory):
+    db = factory()
     try:
         yield db
     except Exception as e:
@@ -56,10 +236,52 @@ def get_db():
     finally:
         db.close()
 
+async def _async_session(factory):
+    async with factory() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            logging.error(f"Database error: {e}")
+            raise
+
+def get_sync_db():
+    yield from _sync_session(SessionLocal)
+
+async def get_async_db():
+    async for db in _async_session(AsyncSessionLocal):
+        yield db
+
+get_db = get_async_db if settings.DATABASE_ASYNC else get_sync_db
+
+# 읽기 전용 세션 의존성 (복제본 우선, 쓰기 직후/복제 지연 시 주 DB)
+def get_sync_read_db(request: Request):
+    replica = None if prefers_primary(request) else replica_router.choose()
+    yield from _sync_session(replica.session_factory if replica else SessionLocal)
+
+async def get_async_read_db(request: Request):
+    replica = None
+    if replica_router.replicas and not prefers_primary(request):
+        # 지연 측정이 동기 드라이버를 쓰므로 스레드풀에서 선택
+        replica = await run_in_threadpool(replica_router.choose)
+    async for db in _async_session(replica.async_session_factory if replica else AsyncSessionLocal):
+        yield db
+
+get_read_db = get_async_read_db if settings.DATABASE_ASYNC else get_sync_read_db
+
+async def run_db(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """세션을 첫 인자로 받는 동기 서비스 함수를 이벤트 루프를 막지 않고 실행
+
+    - AsyncSession: run_sync로 비동기 드라이버 위에서 실행 (I/O 대기 중 루프 양보)
+    - Session: 스레드풀에서 실행
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
 # 데이터베이스 연결 테스트
 def test_db_connection():
     try:
-        from sqlalchemy import text
         with engine.connect() as connection:
             connection.execute(text("SELECT 1"))
         logging.info("Database connection successful")
@@ -0,0 +1,148 @@
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from typing import Dict
+import time
+
+from core.metrics import registry
+
+# 커넥션 풀 계측
+#
+# - 체크아웃 대기 시간: 풀에서 연결을 얻을 때까지 걸린 시간 (새 연결 생성, pre-ping 포함)
+# - 사용 중/유휴/오버플로 연결 수: /metrics 조회 시점의 풀 상태
+# - 타임아웃, 무효화, pre-ping 실패 횟수와 pre-ping 소요 시간
+
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PING_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+# 풀 이름별 엔진 (엔진 dispose 후에도 현재 풀을 조회하기 위해 엔진을 보관)
+_engines: Dict[str, Engine] = {}
+
+def _collect_connections():
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        yield {"pool": name, "state": "in_use"}, pool.checkedout()
+        yield {"pool": name, "state": "idle"}, pool.checkedin()
+        # overflow()는 아직 열지 않은 기본 연결 수만큼 음수로 시작
+        yield {"pool": name, "state": "overflow"}, max(pool.overflow(), 0)
+
+def _collect_limits():
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        yield {"pool": name, "limit": "pool_size"}, pool.size()
+        yield {"pool": name, "limit": "max_overflow"}, pool._max_overflow
+
+checkout_seconds = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    CHECKOUT_BUCKETS
+)
+checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that gave up after the pool timeout",
+    ["pool"]
+)
+connections = registry.gauge(
+    "db_pool_connections",
+    "Pooled connections by state",
+    ["pool", "state"],
+    collect=_collect_connections,
+    multiprocess_mode="all"
+)
+limits = registry.gauge(
+    "db_pool_limit",
+    "Configured pool limits",
+    ["pool", "limit"],
+    collect=_collect_limits,
+    multiprocess_mode="all"
+)
+connects = registry.counter(
+    "db_pool_connects",
+    "New DBAPI connections opened",
+    ["pool"]
+)
+invalidations = registry.counter(
+    "db_pool_invalidations",
+    "Connections invalidated (soft: recycled on next checkout)",
+    ["pool", "soft"]
+)
+pre_ping_seconds = registry.histogram(
+    "db_pool_pre_ping_seconds",
+    "Pre-ping round trip time",
+    ["pool"],
+    PING_BUCKETS
+)
+pre_ping_failures = registry.counter(
+    "db_pool_pre_ping_failures",
+    "Pre-pings that found a dead connection",
+    ["pool"]
+)
+
+class _InstrumentedPoolMixin:
+    """체크아웃 시간과 타임아웃을 기록하는 풀"""
+
+    metrics_name = "default"
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            checkout_timeouts.inc(pool=self.metrics_name)
+            raise
+        finally:
+            checkout_seconds.observe(time.perf_counter() - started_at, pool=self.metrics_name)
+
+    def recreate(self):
+        # engine.dispose() 시 새 풀에도 이름 유지
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def instrument_engine(engine: Engine, name: str):
+    """엔진의 커넥션 풀 계측 등록 (비동기 엔진은 sync_engine을 전달)"""
+    if isinstance(engine.pool, _InstrumentedPoolMixin):
+        engine.pool.metrics_name = name
+    _engines[name] = engine
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        connects.inc(pool=name)
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        invalidations.inc(pool=name, soft="false")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        invalidations.inc(pool=name, soft="true")
+
+    # pre-ping은 방언의 do_ping으로 수행되므로 엔진별 방언 인스턴스에서 감싼다
+    dialect = engine.dialect
+    do_ping = dialect.do_ping
+
+    def timed_do_ping(dbapi_connection):
+        started_at = time.perf_counter()
+        try:
+            alive = do_ping(dbapi_connection)
+        except Exception:
+            pre_ping_failures.inc(pool=name)
+            raise
+        finally:
+            pre_ping_seconds.observe(time.perf_counter() - started_at, pool=name)
+        if not alive:
+            pre_ping_failures.inc(pool=name)
+        return alive
+
+    dialect.do_ping = timed_do_ping
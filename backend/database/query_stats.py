@@ -0,0 +1,103 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextvars import ContextVar
+from typing import Callable, Optional, TypeVar
+import logging
+import re
+import time
+
+from core.config import settings
+
+logger = logging.getLogger("sql.slow")
+
+# 요청 단위 SQL 통계
+#
+# 요청 시작 시 QueryStats를 컨텍스트 변수에 넣으면, 같은 요청에서 실행되는 쿼리
+# (스레드풀/run_sync 포함 - 컨텍스트가 복사되어도 같은 객체를 가리킴)의 수와 시간이 누적된다.
+
+class QueryStats:
+    """요청 하나에서 실행된 쿼리 수와 DB 시간"""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def start_query_stats():
+    """현재 컨텍스트에서 통계 수집 시작 - (통계, 복원 토큰) 반환"""
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+def stop_query_stats(token):
+    _current_stats.reset(token)
+
+# 느린 쿼리 로그용 정규화 (리터럴/플레이스홀더 목록을 ?로 치환)
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """같은 형태의 쿼리가 같은 문자열이 되도록 정규화"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?, ...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+def track_queries(engine: Engine):
+    """엔진에 쿼리 수/시간 집계와 느린 쿼리 로그 등록 (비동기 엔진은 sync_engine을 전달)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started_at")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold > 0 and elapsed * 1000 >= threshold:
+            logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {normalize_sql(statement)}")
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # 실패한 쿼리는 after_cursor_execute가 호출되지 않으므로 시작 시각만 정리
+        connection = exception_context.connection
+        if connection is not None:
+            started = connection.info.get("query_started_at")
+            if started:
+                started.pop()
+
+# 엔드포인트별 쿼리 예산
+#
+# @query_budget(n)을 붙인 엔드포인트가 요청 하나에서 n개를 넘는 쿼리를 실행하면
+# QUERY_BUDGET_MODE에 따라 경고 로그(warn)를 남기거나 500 응답으로 바꾼다(strict - 테스트용).
+
+F = TypeVar("F", bound=Callable)
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """엔드포인트의 요청당 최대 쿼리 수 지정 (N+1 회귀 감지용)"""
+    def decorator(endpoint: F) -> F:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+def exceeded_budget(endpoint: Optional[Callable], stats: QueryStats) -> Optional[int]:
+    """예산을 넘었으면 예산 값을, 아니면 None 반환"""
+    budget = getattr(endpoint, "__query_budget__", None)
+    if budget is not None and stats.count > budget:
+        return budget
+    return None
@@ -0,0 +1,41 @@
+from sqlalchemy import String
+from sqlalchemy.types import BINARY, TypeDecorator
+from typing import Optional
+import uuid
+
+from core.config import settings
+
+class UUIDString(TypeDecorator):
+    """UUID 문자열 컬럼
+
+    애플리케이션에서는 항상 36자 문자열로 다루고, DATABASE_ID_BINARY 설정 시 MySQL에서는
+    BINARY(16)으로 저장한다 (키 길이가 절반 이하라 PK와 이를 포함하는 보조 인덱스가 작아짐).
+    """
+    impl = String(36)
+    cache_ok = True
+
+    def __init__(self, binary: Optional[bool] = None):
+        super().__init__()
+        self.binary = settings.DATABASE_ID_BINARY if binary is None else binary
+
+    def _use_binary(self, dialect) -> bool:
+        return self.binary and dialect.name in ("mysql", "mariadb")
+
+    def load_dialect_impl(self, dialect):
+        if self._use_binary(dialect):
+            return dialect.type_descriptor(BINARY(16))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not self._use_binary(dialect):
+            return value
+        try:
+            return uuid.UUID(str(value)).bytes
+        except ValueError:
+            # UUID 형식이 아닌 값은 16바이트 키와 일치할 수 없으므로 그대로 비교 (조회 결과 없음)
+            return str(value).encode()
+
+    def process_result_value(self, value, dialect):
+        if value is None or not self._use_binary(dialect):
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
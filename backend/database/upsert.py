@@ -0,0 +1,41 @@
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Sequence
+
+# 방언별 일괄 upsert (INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE)
+#
+# 여러 행을 한 번의 다중 VALUES INSERT로 보내고, 유니크 키가 겹치는 행은 update에 정의한 값으로 갱신한다.
+# update는 "새로 넣으려던 값" 컬럼 집합(MySQL inserted / SQLite·PostgreSQL excluded)을 받아
+# {컬럼 이름: 식}을 돌려준다.
+
+UpdateBuilder = Callable[[Any], Dict[str, Any]]
+
+def upsert(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    conflict_columns: Sequence[str],
+    update: UpdateBuilder
+):
+    """rows를 한 번에 삽입하고 conflict_columns 유니크 키 충돌 시 update 적용"""
+    if not rows:
+        return None
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        # MySQL은 충돌한 유니크 키를 자동으로 판단하므로 conflict_columns는 사용하지 않음
+        stmt = stmt.on_duplicate_key_update(update(stmt.inserted))
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=update(stmt.excluded))
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=update(stmt.excluded))
+    else:
+        raise NotImplementedError(f"Upsert is not supported for dialect {dialect}")
+
+    return db.execute(stmt)
@@ -1,16 +1,29 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 import time
 import logging
 import os
 from fastapi.responses import RedirectResponse
+from fastapi.concurrency import run_in_threadpool
 
 from core.config import settings
-from database.connection import engine, test_db_connection
+from database.connection import (
+    engine, async_engine, test_db_connection, SessionLocal,
+    replica_router, stick_to_primary
+)
 from models import *  # 모든 모델 import
-from routers import products, cart, collections, orders
+from routers import products, cart, collections, orders, reports, fulfillment
+from services.search_service import product_search_index
+from services.cart_store import hot_carts
+from services.cart_reaper import cart_reaper
+from services.order_archive import order_archiver
+from services.inventory_shards import inventory_shards
+from services.outbox import outbox_worker
+from core.cache import cache
+from core.metrics import registry as metrics_registry, CONTENT_TYPE_LATEST
+from core.request_metrics import RequestMetricsMiddleware
 
 
 # 로깅 설정
@@ -38,18 +51,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 요청 시간 측정 미들웨어
+# 쓰기 직후 읽기 일관성 미들웨어
 @app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
+async def read_your_writes(request: Request, call_next):
+    """변경 요청이 성공하면 잠시 동안 해당 클라이언트의 읽기를 주 DB로 고정"""
     response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    docs_url="/docs" if settings.DEBUG else None,
-    redoc_url="/redoc" if settings.DEBUG else None,    
+    if (
+        replica_router.replicas
+        and request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+    ):
+        stick_to_primary(response)
     return response
 
-
+# 요청 메트릭 미들웨어 (가장 바깥에서 전체 처리 시간 측정, X-Process-Time/X-DB-* 헤더 추가)
+app.add_middleware(RequestMetricsMiddleware)
 
 # 전역 예외 핸들러
 @app.exception_handler(Exception)
@@ -72,19 +88,38 @@ app.include_router(products.router, prefix="/api/v1")
 app.include_router(cart.router, prefix="/api/v1")
 app.include_router(collections.router, prefix="/api/v1")
 app.include_router(orders.router, prefix="/api/v1")
+app.include_router(reports.router, prefix="/api/v1")
+app.include_router(fulfillment.router, prefix="/api/v1")
 
 # 헬스체크 엔드포인트
 @app.get("/health")
 async def health_check():
     """서버 상태 확인"""
-    db_status = test_db_connection()
+    db_status = await run_in_threadpool(test_db_connection)
     return {
         "status": "healthy" if db_status else "unhealthy",
         "timestamp": time.time(),
         "database": "connected" if db_status else "disconnected",
+        "replicas": replica_router.status(),
         "version": "1.0.0"
     }
 
+# 메트릭 엔드포인트 (Prometheus 텍스트 형식)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """HTTP 요청/커넥션 풀 등 런타임 메트릭 (METRICS_MULTIPROC_DIR 지정 시 전체 워커 합산)"""
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+# 캐시 통계 엔드포인트
+@app.get("/cache/stats")
+async def cache_stats():
+    """캐시 적중/미스/축출 통계 (워커별)"""
+    return {
+        "backend": settings.CACHE_BACKEND,
+        "pid": os.getpid(),
+        **cache.stats()
+    }
+
 # 루트 엔드포인트
 @app.get("/")
 async def root():
@@ -109,10 +144,66 @@ async def startup_event():
             
     except Exception as e:
         logger.error(f"Startup error: {e}")
+    
+    # 검색 색인 로드 (저장본이 없으면 재구축)
+    try:
+        db = SessionLocal()
+        try:
+            product_search_index.warm_up(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Search index warm-up failed: {e}")
+
+    # 다른 워커의 제품 변경분을 검색 색인에 주기적으로 반영
+    if settings.SEARCH_INDEX_SYNC_INTERVAL > 0:
+        product_search_index.start(SessionLocal, settings.SEARCH_INDEX_SYNC_INTERVAL)
+
+    # 장바구니 핫 스토어 플러셔 시작
+    if hot_carts is not None:
+        try:
+            hot_carts.start(SessionLocal)
+        except Exception as e:
+            logger.error(f"Cart store start failed: {e}")
+
+    # 방치된 장바구니 정리 시작
+    if settings.CART_REAPER_ENABLED:
+        cart_reaper.start(SessionLocal, settings.CART_REAPER_INTERVAL)
+
+    # 오래된 종료 주문 보관 시작
+    if settings.ORDER_ARCHIVE_ENABLED:
+        order_archiver.start(SessionLocal, settings.ORDER_ARCHIVE_INTERVAL)
+
+    # 분할 재고 서브 카운터 재분배 시작
+    if settings.INVENTORY_REBALANCE_ENABLED:
+        inventory_shards.start(SessionLocal, settings.INVENTORY_REBALANCE_INTERVAL)
+
+    # 아웃박스 워커 시작 (별도 프로세스로 실행하지 않는 경우)
+    if settings.OUTBOX_WORKER_ENABLED:
+        outbox_worker.start(SessionLocal, settings.OUTBOX_POLL_INTERVAL)
+
+    # 워커 간 메트릭 공유
+    if settings.METRICS_MULTIPROC_DIR:
+        metrics_registry.enable_multiprocess(settings.METRICS_MULTIPROC_DIR, settings.METRICS_SNAPSHOT_INTERVAL)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """애플리케이션 종료 시 실행"""
+    product_search_index.stop()
+    try:
+        product_search_index.save()
+    except Exception as e:
+        logger.error(f"Search index save failed: {e}")
+    cart_reaper.stop()
+    order_archiver.stop()
+    inventory_shards.stop()
+    outbox_worker.stop()
+    if hot_carts is not None:
+        await run_in_threadpool(hot_carts.stop, SessionLocal)
+    if async_engine is not None:
+        await async_engine.dispose()
+    await replica_router.dispose()
+    metrics_registry.disable_multiprocess()
     logger.info("Application shutting down")
 
 if __name__ == "__main__":
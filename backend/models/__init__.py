@@ -2,6 +2,12 @@ from models.product import Product, ProductVariant, ProductImage, Collection
 from models.cart import Cart, CartItem
 from models.order import Order, OrderItem, OrderStatus, PaymentStatus
 from models.user import User
+from models.inventory import InventoryReservation, InventoryShard
+from models.outbox import OutboxEvent, OutboxStatus
+from models.idempotency import IdempotencyKey, IdempotencyStatus
+from models.reporting import DailySales, DailyVariantSales
+from models.order_archive import ArchivedOrder, ArchivedOrderItem, OrderArchiveIndex
+from models.fulfillment import FulfillmentLease
 
 __all__ = [
     "Product",
@@ -14,5 +20,17 @@ __all__ = [
     "OrderItem",
     "OrderStatus",
     "PaymentStatus",
-    "User"
+    "User",
+    "InventoryReservation",
+    "InventoryShard",
+    "OutboxEvent",
+    "OutboxStatus",
+    "IdempotencyKey",
+    "IdempotencyStatus",
+    "DailySales",
+    "DailyVariantSales",
+    "ArchivedOrder",
+    "ArchivedOrderItem",
+    "OrderArchiveIndex",
+    "FulfillmentLease"
 ]
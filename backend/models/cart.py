@@ -1,13 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, DECIMAL, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.connection import Base
-import uuid
+from database.types import UUIDString
+from core.ids import new_id
 
 class Cart(Base):
     __tablename__ = "carts"
+    __table_args__ = (
+        # 방치된 장바구니 정리 대상 탐색
+        Index('idx_carts_updated_at', 'updated_at'),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString(), primary_key=True, default=new_id)
     user_id = Column(String(36), nullable=True)  # 게스트 카트 지원
     session_id = Column(String(255), index=True)
     currency_code = Column(String(3), default="USD")
@@ -58,9 +63,13 @@ class Cart(Base):
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # 장바구니당 변형 상품 하나 (일괄 upsert의 충돌 키)
+        UniqueConstraint('cart_id', 'variant_id', name='unique_cart_variant'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    cart_id = Column(String(36), ForeignKey("carts.id"), nullable=False)
+    cart_id = Column(UUIDString(), ForeignKey("carts.id"), nullable=False)
     variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
     created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, Index
+from database.connection import Base
+from database.types import UUIDString
+
+class FulfillmentLease(Base):
+    """피킹 작업 임대 (services/fulfillment_queue.py)
+
+    확정된 주문을 가져간 피커가 expires_at까지 독점한다 (주문에는 fulfillment_claimed 표시).
+    확인(ack)/반납하면 지우고, 만료된 임대는 다음 가져가기에서 지우며 주문을 큐로 되돌린다.
+    """
+    __tablename__ = "fulfillment_leases"
+    __table_args__ = (
+        Index('idx_fulfillment_lease_token', 'lease_token'),
+        Index('idx_fulfillment_lease_expires', 'expires_at'),
+    )
+
+    order_id = Column(UUIDString(), primary_key=True)
+    lease_token = Column(String(36), nullable=False)  # 한 번에 가져간 주문 묶음
+    picker_id = Column(String(100), nullable=False)
+    claimed_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from database.connection import Base
+import enum
+
+class IdempotencyStatus(enum.Enum):
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+class IdempotencyKey(Base):
+    """Idempotency-Key 요청 기록 (첫 응답을 저장해 같은 키의 재시도에 그대로 돌려줌)"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # 재시도는 이 유니크 인덱스 조회 한 번으로 처리
+        UniqueConstraint('scope', 'idempotency_key', name='unique_idempotency_scope_key'),
+        # 만료된 키 정리
+        Index('idx_idempotency_expires', 'expires_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(50), nullable=False)  # 엔드포인트 (orders.create 등)
+    idempotency_key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # 요청 내용 해시 (같은 키로 다른 요청을 보내면 거부)
+    status = Column(
+        Enum(IdempotencyStatus, values_callable=lambda statuses: [status.value for status in statuses]),
+        nullable=False,
+        default=IdempotencyStatus.IN_PROGRESS
+    )
+    response_status = Column(Integer)
+    response_body = Column(Text)
+    response_media_type = Column(String(100))
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+    # 진행 중(in_progress)인 키의 임대 만료 시각 (요청을 처리하는 워커가 주기적으로 연장,
+    # 워커가 죽어 만료되면 같은 키의 재시도가 이어받음)
+    locked_until = Column(DateTime)
+    # 키를 선점/이어받은 시도의 토큰 (연장/응답 저장/해제는 토큰이 일치할 때만)
+    lease_token = Column(String(36))
+    # 요청이 만든/변경한 리소스 ID (주문 ID) - 업무 트랜잭션 안에서 기록해 커밋 후 실패해도 재실행 대신 재생
+    resource_id = Column(String(36))
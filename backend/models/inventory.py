@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from database.connection import Base
+from database.types import UUIDString
+
+class InventoryReservation(Base):
+    """장바구니별 재고 보류 (만료 시각까지 판매 가능 수량에서 제외)
+
+    변형 상품별 보류 합계는 ProductVariant.reserved_quantity에 함께 유지한다.
+    """
+    __tablename__ = "inventory_reservations"
+    __table_args__ = (
+        UniqueConstraint('cart_id', 'variant_id', name='unique_reservation_cart_variant'),
+        Index('idx_reservations_variant_expires', 'variant_id', 'expires_at'),
+        Index('idx_reservations_expires', 'expires_at'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    # 핫 스토어의 장바구니는 아직 DB에 없을 수 있으므로 외래 키를 두지 않음
+    cart_id = Column(UUIDString(), nullable=False)
+    variant_id = Column(Integer, ForeignKey("product_variants.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+class InventoryShard(Base):
+    """분할 재고의 서브 카운터 (ProductVariant.inventory_shard_count > 0인 변형 상품만)
+
+    주문이 한 변형 상품 행에 몰려 잠금이 직렬화되지 않도록 재고를 여러 행에 나눠 둔다.
+    """
+    __tablename__ = "inventory_shards"
+    
+    variant_id = Column(Integer, ForeignKey("product_variants.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, DECIMAL, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, DECIMAL, Text, Enum, Index, Boolean, false
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.connection import Base
-import uuid
+from database.types import UUIDString
+from core.ids import new_id
 import enum
 
 class OrderStatus(enum.Enum):
@@ -20,11 +21,9 @@ class PaymentStatus(enum.Enum):
     FAILED = "failed"
     REFUNDED = "refunded"
 
-class Order(Base):
-    __tablename__ = "orders"
+class OrderFields:
+    """주문 컬럼과 직렬화 (orders와 보관 테이블 orders_archive가 공유)"""
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    order_number = Column(String(50), unique=True, index=True)
     user_id = Column(String(36), nullable=True)
     email = Column(String(255), nullable=False)
     
@@ -56,10 +55,7 @@ class Order(Base):
     shipped_at = Column(DateTime)
     delivered_at = Column(DateTime)
     
-    # 관계
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
-    
-    def to_dict(self):
+    def to_dict(self, include_variants: bool = False):
         return {
             'id': self.id,
             'order_number': self.order_number,
@@ -81,15 +77,31 @@ class Order(Base):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'shipped_at': self.shipped_at.isoformat() if self.shipped_at else None,
             'delivered_at': self.delivered_at.isoformat() if self.delivered_at else None,
-            'items': [item.to_dict() for item in self.items]
+            'items': [item.to_dict(include_variants) for item in self.items]
         }
 
-class OrderItem(Base):
-    __tablename__ = "order_items"
+class Order(OrderFields, Base):
+    __tablename__ = "orders"
+    __table_args__ = (
+        Index('idx_orders_user_created', 'user_id', 'created_at'),
+        # 주문일 범위 조회 (매출 집계 다시 만들기, 보관 대상 탐색)
+        Index('idx_created_at', 'created_at'),
+        # 피킹 작업 큐 (가져가지 않은 확정 주문을 오래된 순으로 탐색)
+        Index('idx_orders_fulfillment_queue', 'status', 'fulfillment_claimed', 'created_at'),
+    )
+    
+    id = Column(UUIDString(), primary_key=True, default=new_id)
+    order_number = Column(String(50), unique=True, index=True)
+    
+    # 피커가 임대 중인 주문 (큐 탐색 인덱스에 포함, 보관 테이블에는 복사하지 않음)
+    fulfillment_claimed = Column(Boolean, nullable=False, default=False, server_default=false())
+    
+    # 관계
+    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+
+class OrderItemFields:
+    """주문 아이템 컬럼과 직렬화 (order_items와 보관 테이블 order_items_archive가 공유)"""
     
-    id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(String(36), ForeignKey("orders.id"), nullable=False)
-    variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     price = Column(DECIMAL(10, 2), nullable=False)  # 주문 시점의 가격 저장
     total_amount = Column(DECIMAL(10, 2), nullable=False)
@@ -101,12 +113,9 @@ class OrderItem(Base):
     
     created_at = Column(DateTime, server_default=func.now())
     
-    # 관계
-    order = relationship("Order", back_populates="items")
-    variant = relationship("ProductVariant")
-    
-    def to_dict(self):
-        return {
+    def to_dict(self, include_variant: bool = False):
+        """주문 시점 스냅샷으로 직렬화 (include_variant면 현재 변형 정보까지 로드)"""
+        data = {
             'id': self.id,
             'order_id': self.order_id,
             'variant_id': self.variant_id,
@@ -116,6 +125,19 @@ class OrderItem(Base):
             'product_title': self.product_title,
             'variant_title': self.variant_title,
             'product_handle': self.product_handle,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'variant': self.variant.to_dict() if self.variant else None
+            'created_at': self.created_at.isoformat() if self.created_at else None
         }
+        if include_variant:
+            data['variant'] = self.variant.to_dict() if self.variant else None
+        return data
+
+class OrderItem(OrderItemFields, Base):
+    __tablename__ = "order_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(UUIDString(), ForeignKey("orders.id"), nullable=False)
+    variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=False)
+    
+    # 관계
+    order = relationship("Order", back_populates="items")
+    variant = relationship("ProductVariant")
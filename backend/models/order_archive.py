@@ -0,0 +1,61 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from database.connection import Base
+from database.types import UUIDString
+from models.order import OrderFields, OrderItemFields
+
+# 보관된 주문 (services/order_archive.py)
+#
+# 오래된 종료 주문(배송 완료/취소/환불)을 orders/order_items에서 옮겨 두는 테이블.
+# MySQL에서는 created_at 기준 월별 RANGE 파티션으로 만든다 (sql/migrations/010). 파티션 테이블은
+# 모든 유니크 키에 파티션 키가 들어가야 하고 외래 키를 쓸 수 없으므로 PK는 (id, created_at)이고
+# 주문 번호 유니크/외래 키는 없다. id만으로 찾으면 모든 파티션을 뒤지므로 order_archive_index로
+# 주문의 created_at(=파티션)을 먼저 찾아 한 파티션만 읽는다.
+
+class ArchivedOrder(OrderFields, Base):
+    __tablename__ = "orders_archive"
+
+    id = Column(UUIDString(), primary_key=True)
+    order_number = Column(String(50), nullable=False)
+    archived_at = Column(DateTime, server_default=func.now())
+
+    items = relationship(
+        "ArchivedOrderItem",
+        # created_at도 조건에 넣어 아이템 파티션 하나만 읽음
+        primaryjoin="and_(ArchivedOrder.id == foreign(ArchivedOrderItem.order_id), "
+                    "ArchivedOrder.created_at == foreign(ArchivedOrderItem.order_created_at))",
+        order_by="ArchivedOrderItem.id",
+        viewonly=True
+    )
+
+class ArchivedOrderItem(OrderItemFields, Base):
+    __tablename__ = "order_items_archive"
+    __table_args__ = (
+        Index('idx_order_items_archive_order', 'order_id', 'order_created_at'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(UUIDString(), nullable=False)
+    variant_id = Column(Integer, nullable=False)
+    order_created_at = Column(DateTime, nullable=False)  # 파티션 키 (주문의 created_at)
+
+    variant = relationship(
+        "ProductVariant",
+        primaryjoin="foreign(ArchivedOrderItem.variant_id) == ProductVariant.id",
+        viewonly=True
+    )
+
+class OrderArchiveIndex(Base):
+    """보관된 주문의 라우팅 색인 (주문 ID/번호/사용자 → 파티션 키)"""
+    __tablename__ = "order_archive_index"
+    __table_args__ = (
+        # 사용자 주문 목록 (보관분)
+        Index('idx_order_archive_user_created', 'user_id', 'created_at'),
+    )
+
+    order_id = Column(UUIDString(), primary_key=True)
+    order_number = Column(String(50), nullable=False, unique=True)
+    user_id = Column(String(36), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Index
+from sqlalchemy.sql import func
+from database.connection import Base
+import enum
+import json
+
+class OutboxStatus(enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+class OutboxEvent(Base):
+    """트랜잭션 아웃박스 (주문 변경과 같은 트랜잭션에 기록하고 워커가 나중에 처리)
+
+    이벤트 하나를 처리할 핸들러마다 한 행을 기록해, 부수 효과(메일, 결제, 웹훅)가 각각 재시도된다.
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # 워커가 처리할 행 탐색 (상태별 다음 시도 시각 순)
+        Index('idx_outbox_status_available', 'status', 'available_at'),
+        Index('idx_outbox_aggregate', 'aggregate_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(100), nullable=False)
+    handler = Column(String(100), nullable=False)
+    aggregate_id = Column(String(36))
+    payload = Column(Text, nullable=False)
+    status = Column(
+        Enum(OutboxStatus, values_callable=lambda statuses: [status.value for status in statuses]),
+        nullable=False,
+        default=OutboxStatus.PENDING
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, server_default=func.now())  # 다음 시도 시각 (처리 중이면 임대 만료 시각)
+    last_error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    processed_at = Column(DateTime)
+
+    def data(self):
+        return json.loads(self.payload)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_type': self.event_type,
+            'handler': self.handler,
+            'aggregate_id': self.aggregate_id,
+            'payload': self.data(),
+            'status': self.status.value if self.status else None,
+            'attempts': self.attempts,
+            'available_at': self.available_at.isoformat() if self.available_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None
+        }
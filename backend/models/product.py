@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, DECIMAL, ForeignKey, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, DECIMAL, ForeignKey, Table, Index, event, select, inspect
+from sqlalchemy.orm import relationship, Session
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.sql import func
 from database.connection import Base
 
@@ -8,11 +9,17 @@ product_collections = Table(
     'product_collections',
     Base.metadata,
     Column('product_id', Integer, ForeignKey('products.id'), primary_key=True),
-    Column('collection_id', Integer, ForeignKey('collections.id'), primary_key=True)
+    Column('collection_id', Integer, ForeignKey('collections.id'), primary_key=True),
+    Index('idx_product_collections_collection', 'collection_id', 'product_id')
 )
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index('idx_products_updated_at', 'updated_at'),
+        Index('idx_products_min_price', 'min_price'),
+        Index('idx_products_max_price', 'max_price'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     handle = Column(String(255), unique=True, index=True, nullable=False)
@@ -22,6 +29,11 @@ class Product(Base):
     vendor = Column(String(255))
     product_type = Column(String(255))
     available_for_sale = Column(Boolean, default=True)
+    
+    # 변형 상품 가격 범위 (변형 상품 변경 시 자동 갱신되는 비정규화 컬럼)
+    min_price = Column(DECIMAL(10, 2))
+    max_price = Column(DECIMAL(10, 2))
+    
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
@@ -30,7 +42,16 @@ class Product(Base):
     images = relationship("ProductImage", back_populates="product", cascade="all, delete-orphan")
     collections = relationship("Collection", secondary=product_collections, back_populates="products")
     
-    def to_dict(self):
+    def to_dict(self, collection_counts=None):
+        # collection_counts: 미리 집계된 {컬렉션 ID: 제품 수} (없으면 컬렉션별로 지연 로딩)
+        if collection_counts is not None:
+            collections = [
+                collection.to_dict(product_count=collection_counts.get(collection.id, 0))
+                for collection in self.collections
+            ]
+        else:
+            collections = [collection.to_dict() for collection in self.collections]
+        
         return {
             'id': self.id,
             'handle': self.handle,
@@ -44,22 +65,18 @@ class Product(Base):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'variants': [variant.to_dict() for variant in self.variants],
             'images': [image.to_dict() for image in self.images],
-            'collections': [collection.to_dict() for collection in self.collections],
+            'collections': collections,
             'price_range': self.get_price_range(),
             'featured_image': self.images[0].to_dict() if self.images else None
         }
     
     def get_price_range(self):
-        if not self.variants:
-            return {'min_price': 0, 'max_price': 0}
-        
-        prices = [float(variant.price) for variant in self.variants if variant.price]
-        if not prices:
+        if self.min_price is None or self.max_price is None:
             return {'min_price': 0, 'max_price': 0}
         
         return {
-            'min_price': min(prices),
-            'max_price': max(prices)
+            'min_price': float(self.min_price),
+            'max_price': float(self.max_price)
         }
 
 class ProductVariant(Base):
@@ -73,6 +90,8 @@ class ProductVariant(Base):
     sku = Column(String(255), unique=True, index=True)
     barcode = Column(String(255))
     inventory_quantity = Column(Integer, default=0)
+    reserved_quantity = Column(Integer, nullable=False, default=0, server_default="0")  # 활성 재고 보류 합계
+    inventory_shard_count = Column(Integer, nullable=False, default=0, server_default="0")  # 분할 재고 서브 카운터 수 (0이면 분할 안 함)
     weight = Column(DECIMAL(8, 2))
     weight_unit = Column(String(10), default="kg")
     available_for_sale = Column(Boolean, default=True)
@@ -81,6 +100,14 @@ class ProductVariant(Base):
     
     # 관계
     product = relationship("Product", back_populates="variants")
+    shards = relationship("InventoryShard", order_by="InventoryShard.shard", cascade="all, delete-orphan", passive_deletes=True)
+    
+    @property
+    def total_inventory(self):
+        """재고 합계 (분할 재고면 서브 카운터의 합)"""
+        if self.inventory_shard_count:
+            return sum(shard.quantity for shard in self.shards)
+        return self.inventory_quantity
     
     def to_dict(self):
         return {
@@ -91,7 +118,7 @@ class ProductVariant(Base):
             'compare_at_price': float(self.compare_at_price) if self.compare_at_price else None,
             'sku': self.sku,
             'barcode': self.barcode,
-            'inventory_quantity': self.inventory_quantity,
+            'inventory_quantity': self.total_inventory,
             'weight': float(self.weight) if self.weight else None,
             'weight_unit': self.weight_unit,
             'available_for_sale': self.available_for_sale,
@@ -141,7 +168,10 @@ class Collection(Base):
     # 관계
     products = relationship("Product", secondary=product_collections, back_populates="collections")
     
-    def to_dict(self):
+    def to_dict(self, product_count=None):
+        if product_count is None:
+            product_count = len(self.products)
+        
         return {
             'id': self.id,
             'handle': self.handle,
@@ -152,5 +182,70 @@ class Collection(Base):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'path': f'/search/{self.handle}',
-            'product_count': len(self.products)
+            'product_count': product_count
         }
+
+# 제품 가격 범위 동기화
+#
+# 플러시에서 가격/소속 제품이 바뀌거나 추가·삭제된 변형 상품을 모아두었다가,
+# 플러시가 끝나면 해당 제품들의 min_price/max_price를 한 번의 UPDATE로 다시 계산한다.
+
+_PRICE_RANGE_KEY = "price_range_product_ids"
+
+def _changed_variant_product_ids(session):
+    product_ids = set()
+    for variant in session.new:
+        if isinstance(variant, ProductVariant) and variant.product_id is not None:
+            product_ids.add(variant.product_id)
+    for variant in session.deleted:
+        if isinstance(variant, ProductVariant) and variant.product_id is not None:
+            product_ids.add(variant.product_id)
+    for variant in session.dirty:
+        if not isinstance(variant, ProductVariant):
+            continue
+        state = inspect(variant)
+        product_history = state.attrs.product_id.history
+        if state.attrs.price.history.has_changes() or product_history.has_changes():
+            product_ids.add(variant.product_id)
+            product_ids.update(pid for pid in product_history.deleted if pid is not None)
+    return product_ids
+
+@event.listens_for(Session, "after_flush")
+def _collect_price_range_changes(session, flush_context):
+    product_ids = _changed_variant_product_ids(session)
+    if product_ids:
+        session.info.setdefault(_PRICE_RANGE_KEY, set()).update(product_ids)
+
+@event.listens_for(Session, "after_flush_postexec")
+def _refresh_price_ranges(session, flush_context):
+    product_ids = session.info.pop(_PRICE_RANGE_KEY, None)
+    if not product_ids:
+        return
+    
+    sync_product_price_ranges(session.connection(), product_ids)
+    
+    # 세션에 로드된 제품의 가격 범위는 다음 접근 시 다시 읽음
+    for product_id in product_ids:
+        product = session.identity_map.get(identity_key(Product, product_id))
+        if product is not None:
+            session.expire(product, ['min_price', 'max_price'])
+
+def sync_product_price_ranges(connection, product_ids=None):
+    """제품 가격 범위를 변형 상품 가격으로부터 다시 계산 (product_ids가 없으면 전체)"""
+    products = Product.__table__
+    variants = ProductVariant.__table__
+    
+    statement = products.update().values(
+        min_price=select(func.min(variants.c.price))
+            .where(variants.c.product_id == products.c.id)
+            .scalar_subquery(),
+        max_price=select(func.max(variants.c.price))
+            .where(variants.c.product_id == products.c.id)
+            .scalar_subquery(),
+        # 가격 범위 동기화는 제품 수정 시각을 바꾸지 않음
+        updated_at=products.c.updated_at
+    )
+    if product_ids is not None:
+        statement = statement.where(products.c.id.in_(list(product_ids)))
+    
+    return connection.execute(statement)
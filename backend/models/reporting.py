@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, DECIMAL, Index
+from sqlalchemy.sql import func
+from database.connection import Base
+
+class DailySales(Base):
+    """일별 주문 집계 (주문일/주문 상태/결제 상태/통화별)
+
+    주문 생성/상태 변경 때 같은 트랜잭션에서 증감한다. 같은 키의 행이 결제마다 잠기지 않도록
+    bucket(0..REPORTING_ROLLUP_BUCKETS-1)으로 나눠 쓰고, 조회할 때 합친다.
+    """
+    __tablename__ = "daily_sales"
+
+    day = Column(Date, primary_key=True)
+    status = Column(String(20), primary_key=True)
+    payment_status = Column(String(20), primary_key=True)
+    currency_code = Column(String(3), primary_key=True)
+    bucket = Column(Integer, primary_key=True, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+    subtotal_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    total_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class DailyVariantSales(Base):
+    """일별 변형 상품 판매 집계 (취소/환불되지 않은 주문의 수량/매출)"""
+    __tablename__ = "daily_variant_sales"
+    __table_args__ = (
+        # 제품별 집계 (기간 내 제품의 변형 상품 행을 합침)
+        Index('idx_daily_variant_sales_product', 'product_id', 'day'),
+    )
+
+    day = Column(Date, primary_key=True)
+    variant_id = Column(Integer, primary_key=True)
+    currency_code = Column(String(3), primary_key=True)
+    bucket = Column(Integer, primary_key=True, default=0)
+    product_id = Column(Integer, nullable=True)
+    units = Column(Integer, nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database.connection import get_db
-from services.cart_service import CartService
+from database.connection import get_db, DbSession
+from core.serialization import fast_response
+from database.query_stats import query_budget
+from services.async_services import AsyncCartService
 from schemas.cart import (
     CartCreate,
     CartResponse,
@@ -11,35 +12,36 @@ from schemas.cart import (
 )
 
 router = APIRouter(prefix="/cart", tags=["cart"])
-cart_service = CartService()
+cart_service = AsyncCartService()
 
 @router.post("/", response_model=CartResponse, status_code=201)
 async def create_cart(
     cart_data: CartCreate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """새 장바구니 생성"""
     try:
-        cart = cart_service.create_cart(db=db, cart_data=cart_data)
-        return cart
+        cart = await cart_service.create_cart(db=db, cart_data=cart_data)
+        return fast_response(cart, CartResponse, status_code=201)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{cart_id}", response_model=CartResponse)
-async def get_cart(cart_id: str, db: Session = Depends(get_db)):
+@query_budget(5)
+async def get_cart(cart_id: str, db: DbSession = Depends(get_db)):
     """장바구니 조회"""
     import logging
     logger = logging.getLogger(__name__)
     
     try:
         logger.info(f"Getting cart with ID: {cart_id}")
-        cart = cart_service.get_cart(db=db, cart_id=cart_id)
+        cart = await cart_service.get_cart(db=db, cart_id=cart_id)
         logger.info(f"Cart service returned: {cart}")
         
         if not cart:
             logger.warning(f"Cart not found: {cart_id}")
             raise HTTPException(status_code=404, detail="Cart not found")
-        return cart
+        return fast_response(cart, CartResponse)
     except HTTPException:
         raise
     except Exception as e:
@@ -53,18 +55,18 @@ async def get_cart(cart_id: str, db: Session = Depends(get_db)):
 async def add_to_cart(
     cart_id: str,
     request: AddToCartRequest,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """장바구니에 상품 추가"""
     try:
-        cart = cart_service.add_items_to_cart(
+        cart = await cart_service.add_items_to_cart(
             db=db, 
             cart_id=cart_id, 
             items=request.items
         )
         if not cart:
             raise HTTPException(status_code=404, detail="Cart not found")
-        return cart
+        return fast_response(cart, CartResponse)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -76,18 +78,18 @@ async def add_to_cart(
 async def update_cart_items(
     cart_id: str,
     request: UpdateCartRequest,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """장바구니 상품 수량 업데이트"""
     try:
-        cart = cart_service.update_cart_items(
+        cart = await cart_service.update_cart_items(
             db=db, 
             cart_id=cart_id, 
             items=request.items
         )
         if not cart:
             raise HTTPException(status_code=404, detail="Cart not found")
-        return cart
+        return fast_response(cart, CartResponse)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -99,11 +101,11 @@ async def update_cart_items(
 async def remove_from_cart(
     cart_id: str,
     request: RemoveFromCartRequest,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """장바구니에서 상품 제거"""
     try:
-        success = cart_service.remove_items_from_cart(
+        success = await cart_service.remove_items_from_cart(
             db=db, 
             cart_id=cart_id, 
             item_ids=request.item_ids
@@ -117,10 +119,10 @@ async def remove_from_cart(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{cart_id}/clear")
-async def clear_cart(cart_id: str, db: Session = Depends(get_db)):
+async def clear_cart(cart_id: str, db: DbSession = Depends(get_db)):
     """장바구니 비우기"""
     try:
-        success = cart_service.clear_cart(db=db, cart_id=cart_id)
+        success = await cart_service.clear_cart(db=db, cart_id=cart_id)
         if not success:
             raise HTTPException(status_code=404, detail="Cart not found")
         return {"message": "Cart cleared successfully"}
@@ -130,10 +132,10 @@ async def clear_cart(cart_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{cart_id}")
-async def delete_cart(cart_id: str, db: Session = Depends(get_db)):
+async def delete_cart(cart_id: str, db: DbSession = Depends(get_db)):
     """장바구니 삭제"""
     try:
-        success = cart_service.delete_cart(db=db, cart_id=cart_id)
+        success = await cart_service.delete_cart(db=db, cart_id=cart_id)
         if not success:
             raise HTTPException(status_code=404, detail="Cart not found")
         return {"message": "Cart deleted successfully"}
@@ -143,13 +145,14 @@ async def delete_cart(cart_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/session/{session_id}", response_model=CartResponse)
-async def get_cart_by_session(session_id: str, db: Session = Depends(get_db)):
+@query_budget(5)
+async def get_cart_by_session(session_id: str, db: DbSession = Depends(get_db)):
     """세션 ID로 장바구니 조회"""
     try:
-        cart = cart_service.get_cart_by_session(db=db, session_id=session_id)
+        cart = await cart_service.get_cart_by_session(db=db, session_id=session_id)
         if not cart:
             raise HTTPException(status_code=404, detail="Cart not found")
-        return cart
+        return fast_response(cart, CartResponse)
     except Exception as e:
         if "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail=str(e))
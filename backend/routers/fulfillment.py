@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException
+from database.connection import get_db, DbSession
+from core.serialization import fast_response
+from services.async_services import AsyncFulfillmentQueue
+from services.fulfillment_queue import fulfillment_queue
+from schemas.fulfillment import (
+    FulfillmentClaimRequest,
+    FulfillmentClaimResponse,
+    FulfillmentLeaseResponse,
+    FulfillmentAck,
+    FulfillmentRelease,
+    FulfillmentReleaseResponse
+)
+from schemas.order import BulkOrderStatusResponse
+from typing import Optional
+
+router = APIRouter(prefix="/fulfillment", tags=["fulfillment"])
+queue = AsyncFulfillmentQueue(fulfillment_queue)
+
+@router.post("/claim", response_model=FulfillmentClaimResponse)
+async def claim_orders(claim: FulfillmentClaimRequest, db: DbSession = Depends(get_db)):
+    """다음 확정 주문 가져오기 (다른 피커가 가져간 주문은 건너뜀)"""
+    try:
+        result = await queue.claim(db=db, picker_id=claim.picker_id, limit=claim.limit)
+        return fast_response(result, FulfillmentClaimResponse)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/leases/{lease_id}/extend", response_model=FulfillmentLeaseResponse)
+async def extend_lease(lease_id: str, db: DbSession = Depends(get_db)):
+    """임대 연장"""
+    try:
+        lease = await queue.extend(db=db, lease_id=lease_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not lease:
+        raise HTTPException(status_code=404, detail="Lease not found or expired")
+    return fast_response(lease, FulfillmentLeaseResponse)
+
+@router.post("/leases/{lease_id}/ack", response_model=BulkOrderStatusResponse)
+async def ack_orders(lease_id: str, ack: FulfillmentAck, db: DbSession = Depends(get_db)):
+    """임대한 주문 처리 확인 (processing/shipped로 변경하고 임대 해제)"""
+    try:
+        result = await queue.ack(db=db, lease_id=lease_id, status=ack.status, order_ids=ack.order_ids)
+        return fast_response(result, BulkOrderStatusResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/leases/{lease_id}/release", response_model=FulfillmentReleaseResponse)
+async def release_orders(
+    lease_id: str,
+    release: Optional[FulfillmentRelease] = None,
+    db: DbSession = Depends(get_db)
+):
+    """임대 반납 (주문을 바로 다시 큐에 넣음)"""
+    try:
+        released = await queue.release(db=db, lease_id=lease_id, order_ids=release.order_ids if release else None)
+        return fast_response({'released': released}, FulfillmentReleaseResponse)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,83 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from database.connection import get_db
-from services.order_service import OrderService
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from database.connection import get_db, get_read_db, DbSession
+from core.serialization import fast_response
+from services.async_services import AsyncOrderService
+from services.idempotency import idempotency_store, request_fingerprint
 from schemas.order import (
     OrderCreate,
     OrderResponse,
     OrderListResponse,
+    OrderDetailResponse,
+    OrderDetailListResponse,
+    OrderSummaryListResponse,
     OrderStatusUpdate,
+    BulkOrderStatusUpdate,
+    BulkOrderStatusResponse,
     PaymentStatusUpdate
 )
 from models.order import OrderStatus, PaymentStatus
-from typing import Optional
+from typing import Optional, Union
 
 router = APIRouter(prefix="/orders", tags=["orders"])
-order_service = OrderService()
+order_service = AsyncOrderService()
 
 @router.post("/", response_model=OrderResponse, status_code=201)
 async def create_order(
     order_data: OrderCreate,
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: DbSession = Depends(get_db)
 ):
-    """장바구니에서 주문 생성"""
-    try:
-        order = order_service.create_order_from_cart(
-            db=db,
-            cart_id=order_data.cart_id,
-            email=order_data.email,
-            shipping_address=order_data.shipping_address,
-            billing_address=order_data.billing_address,
-            notes=order_data.notes
-        )
-        return order
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """장바구니에서 주문 생성 (Idempotency-Key가 같은 재시도는 첫 응답을 그대로 반환)"""
+    async def create():
+        try:
+            order = await order_service.create_order_from_cart(
+                db=db,
+                cart_id=order_data.cart_id,
+                email=order_data.email,
+                shipping_address=order_data.shipping_address,
+                billing_address=order_data.billing_address,
+                notes=order_data.notes
+            )
+            return fast_response(order, OrderResponse, status_code=201)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def replay(order_id: str):
+        # 이전 시도가 주문을 커밋한 뒤 응답을 저장하지 못함 - 그 주문으로 응답
+        order = await order_service.get_order(db=db, order_id=order_id)
+        return fast_response(order, OrderResponse, status_code=201)
+
+    return await idempotency_store.run(
+        "orders.create", idempotency_key, request_fingerprint(order_data), create, replay
+    )
 
-@router.get("/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: str, db: Session = Depends(get_db)):
+@router.get("/{order_id}", response_model=Union[OrderResponse, OrderDetailResponse])
+async def get_order(
+    order_id: str,
+    include_variants: bool = Query(False, description="아이템에 현재 변형 상품 정보 포함 (기본은 주문 시점 스냅샷만)"),
+    db: DbSession = Depends(get_read_db)
+):
     """주문 조회"""
     try:
-        order = order_service.get_order(db=db, order_id=order_id)
+        order = await order_service.get_order(db=db, order_id=order_id, include_variants=include_variants)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
-        return order
+        return fast_response(order, OrderDetailResponse if include_variants else OrderResponse)
     except Exception as e:
         if "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/number/{order_number}", response_model=OrderResponse)
-async def get_order_by_number(order_number: str, db: Session = Depends(get_db)):
+async def get_order_by_number(order_number: str, db: DbSession = Depends(get_read_db)):
     """주문 번호로 주문 조회"""
     try:
-        order = order_service.get_order_by_number(db=db, order_number=order_number)
+        order = await order_service.get_order_by_number(db=db, order_number=order_number)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
-        return order
+        return fast_response(order, OrderResponse)
     except Exception as e:
         if "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/user/{user_id}", response_model=OrderListResponse)
+@router.get(
+    "/user/{user_id}",
+    response_model=Union[OrderListResponse, OrderSummaryListResponse, OrderDetailListResponse]
+)
 async def get_user_orders(
     user_id: str,
     page: int = Query(1, ge=1, description="페이지 번호"),
     per_page: int = Query(20, ge=1, le=100, description="페이지당 항목 수"),
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="다음 페이지 커서 (지정 시 page 무시)"),
+    include_total: bool = Query(True, description="전체 개수 포함 여부"),
+    summary: bool = Query(False, description="아이템 대신 아이템 수와 첫 아이템만 반환"),
+    include_variants: bool = Query(False, description="아이템에 현재 변형 상품 정보 포함 (summary와 함께 쓰면 무시)"),
+    db: DbSession = Depends(get_read_db)
 ):
     """사용자 주문 목록 조회"""
     try:
-        result = order_service.get_user_orders(
+        result = await order_service.get_user_orders(
             db=db,
             user_id=user_id,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            after=after,
+            include_total=include_total,
+            summary=summary,
+            include_variants=include_variants
         )
-        return result
+        if summary:
+            response_model = OrderSummaryListResponse
+        elif include_variants:
+            response_model = OrderDetailListResponse
+        else:
+            response_model = OrderListResponse
+        return fast_response(result, response_model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -85,54 +125,84 @@ async def get_user_orders(
 async def update_order_status(
     order_id: str,
     status_update: OrderStatusUpdate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """주문 상태 업데이트"""
     try:
-        order = order_service.update_order_status(
+        order = await order_service.update_order_status(
             db=db,
             order_id=order_id,
             status=status_update.status
         )
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
-        return order
+        return fast_response(order, OrderResponse)
     except Exception as e:
         if "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.put("/{order_id}/payment", response_model=OrderResponse)
-async def update_payment_status(
-    order_id: str,
-    payment_update: PaymentStatusUpdate,
-    db: Session = Depends(get_db)
+@router.post("/status/bulk", response_model=BulkOrderStatusResponse)
+async def bulk_update_order_status(
+    bulk_update: BulkOrderStatusUpdate,
+    db: DbSession = Depends(get_db)
 ):
-    """결제 상태 업데이트"""
+    """주문 상태 일괄 변경 (목표 상태별 UPDATE 한 번, 주문별 결과만 반환)"""
     try:
-        order = order_service.update_payment_status(
+        result = await order_service.bulk_update_status(
             db=db,
-            order_id=order_id,
-            payment_status=payment_update.payment_status,
-            payment_id=payment_update.payment_id,
-            payment_method=payment_update.payment_method
+            updates=[
+                (update.status, update.order_ids, update.order_numbers)
+                for update in bulk_update.updates
+            ]
         )
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
-        return order
+        return fast_response(result, BulkOrderStatusResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        if "not found" in str(e).lower():
-            raise HTTPException(status_code=404, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.put("/{order_id}/payment", response_model=OrderResponse)
+async def update_payment_status(
+    order_id: str,
+    payment_update: PaymentStatusUpdate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: DbSession = Depends(get_db)
+):
+    """결제 상태 업데이트 (Idempotency-Key가 같은 재시도는 첫 응답을 그대로 반환)"""
+    async def update():
+        try:
+            order = await order_service.update_payment_status(
+                db=db,
+                order_id=order_id,
+                payment_status=payment_update.payment_status,
+                payment_id=payment_update.payment_id,
+                payment_method=payment_update.payment_method
+            )
+            if not order:
+                raise HTTPException(status_code=404, detail="Order not found")
+            return fast_response(order, OrderResponse)
+        except Exception as e:
+            if "not found" in str(e).lower():
+                raise HTTPException(status_code=404, detail=str(e))
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def replay(order_id: str):
+        order = await order_service.get_order(db=db, order_id=order_id)
+        return fast_response(order, OrderResponse)
+
+    return await idempotency_store.run(
+        "orders.payment", idempotency_key, request_fingerprint(order_id, payment_update), update, replay
+    )
+
 @router.post("/{order_id}/cancel", response_model=OrderResponse)
-async def cancel_order(order_id: str, db: Session = Depends(get_db)):
+async def cancel_order(order_id: str, db: DbSession = Depends(get_db)):
     """주문 취소"""
     try:
-        order = order_service.cancel_order(db=db, order_id=order_id)
+        order = await order_service.cancel_order(db=db, order_id=order_id)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
-        return order
+        return fast_response(order, OrderResponse)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
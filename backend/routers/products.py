@@ -1,20 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from database.connection import get_db
-from services.product_service import ProductService
+from database.connection import get_db, get_read_db, DbSession
+from core.serialization import fast_response
+from database.query_stats import query_budget
+from services.async_services import AsyncProductService
 from schemas.product import (
     ProductCreate, 
     ProductUpdate, 
     ProductResponse, 
     ProductListResponse,
-    ProductSearchRequest
+    ProductSearchRequest,
+    InventoryShardsUpdate
 )
 from typing import List, Optional
 
 router = APIRouter(prefix="/products", tags=["products"])
-product_service = ProductService()
+product_service = AsyncProductService()
 
 @router.get("/", response_model=ProductListResponse)
+@query_budget(8)
 async def get_products(
     query: Optional[str] = Query(None, description="검색어"),
     sort_key: str = Query("created_at", description="정렬 기준"),
@@ -23,11 +26,15 @@ async def get_products(
     per_page: int = Query(20, ge=1, le=100, description="페이지당 항목 수"),
     collection_id: Optional[int] = Query(None, description="컬렉션 ID"),
     available_only: bool = Query(True, description="판매 가능한 상품만"),
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="다음 페이지 커서 (지정 시 page 무시)"),
+    include_total: bool = Query(True, description="전체 개수 포함 여부"),
+    min_price: Optional[float] = Query(None, ge=0, description="최저 가격 (가격대가 겹치는 제품)"),
+    max_price: Optional[float] = Query(None, ge=0, description="최고 가격 (가격대가 겹치는 제품)"),
+    db: DbSession = Depends(get_read_db)
 ):
     """제품 목록 조회"""
     try:
-        result = product_service.get_products(
+        result = await product_service.get_products(
             db=db,
             query=query,
             sort_key=sort_key,
@@ -35,20 +42,27 @@ async def get_products(
             page=page,
             per_page=per_page,
             collection_id=collection_id,
-            available_only=available_only
+            available_only=available_only,
+            after=after,
+            include_total=include_total,
+            min_price=min_price,
+            max_price=max_price
         )
-        return result
+        return fast_response(result, ProductListResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{handle}", response_model=ProductResponse)
-async def get_product(handle: str, db: Session = Depends(get_db)):
+@query_budget(6)
+async def get_product(handle: str, db: DbSession = Depends(get_read_db)):
     """개별 제품 조회"""
     try:
-        product = product_service.get_product_by_handle(db=db, handle=handle)
+        product = await product_service.get_product_by_handle(db=db, handle=handle)
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
-        return product
+        return fast_response(product, ProductResponse)
     except Exception as e:
         if "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail=str(e))
@@ -57,12 +71,12 @@ async def get_product(handle: str, db: Session = Depends(get_db)):
 @router.post("/", response_model=ProductResponse, status_code=201)
 async def create_product(
     product_data: ProductCreate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """새 제품 생성"""
     try:
-        product = product_service.create_product(db=db, product_data=product_data)
-        return product
+        product = await product_service.create_product(db=db, product_data=product_data)
+        return fast_response(product, ProductResponse, status_code=201)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -72,24 +86,51 @@ async def create_product(
 async def update_product(
     handle: str,
     product_data: ProductUpdate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """제품 정보 업데이트"""
     try:
-        product = product_service.update_product(db=db, handle=handle, product_data=product_data)
+        product = await product_service.update_product(db=db, handle=handle, product_data=product_data)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return fast_response(product, ProductResponse)
+    except Exception as e:
+        if "not found" in str(e).lower():
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put("/{handle}/variants/{variant_id}/inventory-shards", response_model=ProductResponse)
+async def set_inventory_shards(
+    handle: str,
+    variant_id: int,
+    shards: InventoryShardsUpdate,
+    db: DbSession = Depends(get_db)
+):
+    """변형 상품 분할 재고 설정 (주문이 몰리는 변형 상품의 재고를 여러 서브 카운터로 나눔)"""
+    try:
+        product = await product_service.set_inventory_shards(
+            db=db,
+            handle=handle,
+            variant_id=variant_id,
+            shard_count=shards.shard_count
+        )
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
-        return product
+        return fast_response(product, ProductResponse)
+    except ValueError as e:
+        if "not found" in str(e).lower():
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         if "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{handle}")
-async def delete_product(handle: str, db: Session = Depends(get_db)):
+async def delete_product(handle: str, db: DbSession = Depends(get_db)):
     """제품 삭제"""
     try:
-        success = product_service.delete_product(db=db, handle=handle)
+        success = await product_service.delete_product(db=db, handle=handle)
         if not success:
             raise HTTPException(status_code=404, detail="Product not found")
         return {"message": "Product deleted successfully"}
@@ -102,27 +143,28 @@ async def delete_product(handle: str, db: Session = Depends(get_db)):
 async def get_product_recommendations(
     handle: str,
     limit: int = Query(4, ge=1, le=20, description="추천 제품 수"),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_read_db)
 ):
     """제품 추천 목록 조회"""
     try:
-        recommendations = product_service.get_product_recommendations(
+        recommendations = await product_service.get_product_recommendations(
             db=db, 
             handle=handle, 
             limit=limit
         )
-        return recommendations
+        return fast_response(recommendations, List[ProductResponse])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/search", response_model=ProductListResponse)
+@query_budget(8)
 async def search_products(
     search_request: ProductSearchRequest,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_read_db)
 ):
     """제품 검색 (POST 방식)"""
     try:
-        result = product_service.get_products(
+        result = await product_service.get_products(
             db=db,
             query=search_request.query,
             sort_key=search_request.sort_key,
@@ -130,8 +172,14 @@ async def search_products(
             page=search_request.page,
             per_page=search_request.per_page,
             collection_id=search_request.collection_id,
-            available_only=search_request.available_only
+            available_only=search_request.available_only,
+            after=search_request.after,
+            include_total=search_request.include_total,
+            min_price=search_request.min_price,
+            max_price=search_request.max_price
         )
-        return result
+        return fast_response(result, ProductListResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from database.connection import get_read_db, DbSession
+from core.serialization import fast_response
+from database.query_stats import query_budget
+from schemas.report import DailySalesResponse, TopVariantResponse, TopProductResponse
+from services.async_services import AsyncReportService
+from typing import List, Optional, Tuple
+import datetime
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+report_service = AsyncReportService()
+
+def _date_range(start: Optional[datetime.date], end: Optional[datetime.date]) -> Tuple[datetime.date, datetime.date]:
+    """조회 기간 (기본: 오늘까지 30일, UTC)"""
+    end = end or datetime.datetime.utcnow().date()
+    start = start or end - datetime.timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days > 366:
+        raise HTTPException(status_code=400, detail="Date range must be at most 366 days")
+    return start, end
+
+@router.get("/sales/daily", response_model=List[DailySalesResponse])
+@query_budget(1)
+async def get_daily_sales(
+    start: Optional[datetime.date] = Query(None, description="시작일 (기본: 29일 전)"),
+    end: Optional[datetime.date] = Query(None, description="종료일 (포함, 기본: 오늘)"),
+    currency_code: Optional[str] = Query(None, description="통화"),
+    db: DbSession = Depends(get_read_db)
+):
+    """일별 매출"""
+    start, end = _date_range(start, end)
+    try:
+        result = await report_service.daily_sales(db=db, start=start, end=end, currency_code=currency_code)
+        return fast_response(result, List[DailySalesResponse])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/variants/top", response_model=List[TopVariantResponse])
+@query_budget(2)
+async def get_top_variants(
+    start: Optional[datetime.date] = Query(None, description="시작일 (기본: 29일 전)"),
+    end: Optional[datetime.date] = Query(None, description="종료일 (포함, 기본: 오늘)"),
+    limit: int = Query(10, ge=1, le=100, description="항목 수"),
+    currency_code: Optional[str] = Query(None, description="통화"),
+    db: DbSession = Depends(get_read_db)
+):
+    """판매 수량 상위 변형 상품"""
+    start, end = _date_range(start, end)
+    try:
+        result = await report_service.top_variants(
+            db=db, start=start, end=end, limit=limit, currency_code=currency_code
+        )
+        return fast_response(result, List[TopVariantResponse])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/products/top", response_model=List[TopProductResponse])
+@query_budget(2)
+async def get_top_products(
+    start: Optional[datetime.date] = Query(None, description="시작일 (기본: 29일 전)"),
+    end: Optional[datetime.date] = Query(None, description="종료일 (포함, 기본: 오늘)"),
+    limit: int = Query(10, ge=1, le=100, description="항목 수"),
+    currency_code: Optional[str] = Query(None, description="통화"),
+    db: DbSession = Depends(get_read_db)
+):
+    """판매 수량 상위 제품"""
+    start, end = _date_range(start, end)
+    try:
+        result = await report_service.top_products(
+            db=db, start=start, end=end, limit=limit, currency_code=currency_code
+        )
+        return fast_response(result, List[TopProductResponse])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from models.order import OrderStatus
+from schemas.order import OrderResponse
+
+class FulfillmentClaimRequest(BaseModel):
+    picker_id: str = Field(..., min_length=1, max_length=100, description="피커 ID")
+    limit: int = Field(10, ge=1, description="가져올 주문 수 (최대 FULFILLMENT_MAX_CLAIM)")
+
+class FulfillmentClaimResponse(BaseModel):
+    """가져간 주문 (남은 확정 주문이 없으면 lease_id가 None이고 orders가 비어 있음)"""
+    lease_id: Optional[str]
+    picker_id: str
+    expires_at: Optional[datetime]
+    orders: List[OrderResponse]
+
+class FulfillmentLeaseResponse(BaseModel):
+    lease_id: str
+    expires_at: datetime
+    order_ids: List[str]
+
+class FulfillmentAck(BaseModel):
+    status: OrderStatus = Field(..., description="바꿀 주문 상태 (processing, shipped)")
+    order_ids: Optional[List[str]] = Field(None, description="확인할 주문 ID 목록 (없으면 임대한 주문 전부)")
+
+class FulfillmentRelease(BaseModel):
+    order_ids: Optional[List[str]] = Field(None, description="반납할 주문 ID 목록 (없으면 임대한 주문 전부)")
+
+class FulfillmentReleaseResponse(BaseModel):
+    released: int
@@ -3,6 +3,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 from decimal import Decimal
 from models.order import OrderStatus, PaymentStatus
+from schemas.product import ProductVariantResponse
 
 class OrderItemResponse(BaseModel):
     id: int
@@ -54,14 +55,79 @@ class OrderResponse(BaseModel):
 
 class OrderListResponse(BaseModel):
     orders: List[OrderResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class OrderItemDetailResponse(OrderItemResponse):
+    """현재 변형 상품 정보를 포함한 주문 아이템 (include_variants=true)"""
+    variant: Optional[ProductVariantResponse]
+
+class OrderDetailResponse(OrderResponse):
+    items: List[OrderItemDetailResponse]
+
+class OrderDetailListResponse(OrderListResponse):
+    orders: List[OrderDetailResponse]
+
+class OrderSummaryItemResponse(BaseModel):
+    """주문 목록 요약의 첫 아이템 (주문 시점 스냅샷)"""
+    variant_id: int
+    quantity: int
+    price: Decimal
+    product_title: Optional[str]
+    variant_title: Optional[str]
+    product_handle: Optional[str]
+
+class OrderSummaryResponse(BaseModel):
+    """주문 목록 요약 (아이템 대신 아이템 수와 첫 아이템)"""
+    id: str
+    order_number: str
+    status: str
+    payment_status: str
+    total_amount: Decimal
+    currency_code: str
+    created_at: datetime
+    shipped_at: Optional[datetime]
+    delivered_at: Optional[datetime]
+    item_count: int
+    total_quantity: int
+    first_item: Optional[OrderSummaryItemResponse]
+
+class OrderSummaryListResponse(BaseModel):
+    orders: List[OrderSummaryResponse]
+    total: Optional[int] = None
+    page: int
+    per_page: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class OrderStatusUpdate(BaseModel):
     status: OrderStatus = Field(..., description="주문 상태")
 
+class BulkOrderStatusGroup(BaseModel):
+    status: OrderStatus = Field(..., description="목표 주문 상태")
+    order_ids: List[str] = Field(default_factory=list, description="주문 ID 목록")
+    order_numbers: List[str] = Field(default_factory=list, description="주문 번호 목록")
+
+class BulkOrderStatusUpdate(BaseModel):
+    updates: List[BulkOrderStatusGroup] = Field(..., min_length=1, description="목표 상태별 주문 목록")
+
+class BulkOrderStatusResult(BaseModel):
+    """주문별 처리 결과 (updated, unchanged, invalid_transition, archived, not_found)"""
+    order_id: Optional[str]
+    order_number: Optional[str]
+    result: str
+    status: Optional[str]  # 처리 후 주문 상태 (찾지 못했으면 None)
+
+class BulkOrderStatusResponse(BaseModel):
+    updated: int
+    unchanged: int
+    rejected: int
+    not_found: int
+    results: List[BulkOrderStatusResult]
+
 class PaymentStatusUpdate(BaseModel):
     payment_status: PaymentStatus = Field(..., description="결제 상태")
     payment_id: Optional[str] = Field(None, description="결제 ID")
@@ -45,6 +45,9 @@ class ProductVariantUpdate(BaseModel):
     weight_unit: Optional[str] = None
     available_for_sale: Optional[bool] = None
 
+class InventoryShardsUpdate(BaseModel):
+    shard_count: int = Field(..., ge=0, description="분할 재고 서브 카운터 수 (0이면 분할 해제)")
+
 class ProductVariantResponse(ProductVariantBase):
     id: int
     product_id: int
@@ -118,16 +121,21 @@ class ProductResponse(ProductBase):
 
 class ProductListResponse(BaseModel):
     products: List[ProductResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class ProductSearchRequest(BaseModel):
     query: Optional[str] = Field(None, description="검색어")
-    sort_key: str = Field("created_at", description="정렬 기준")
+    sort_key: str = Field("created_at", description="정렬 기준 (created_at, updated_at, title, price, relevance)")
     reverse: bool = Field(False, description="역순 정렬 여부")
     page: int = Field(1, ge=1, description="페이지 번호")
     per_page: int = Field(20, ge=1, le=100, description="페이지당 항목 수")
     collection_id: Optional[int] = Field(None, description="컬렉션 ID")
     available_only: bool = Field(True, description="판매 가능한 상품만")
+    after: Optional[str] = Field(None, description="다음 페이지 커서 (지정 시 page 무시)")
+    include_total: bool = Field(True, description="전체 개수 포함 여부")
+    min_price: Optional[float] = Field(None, ge=0, description="최저 가격 (가격대가 겹치는 제품)")
+    max_price: Optional[float] = Field(None, ge=0, description="최고 가격 (가격대가 겹치는 제품)")
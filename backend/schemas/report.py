@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+
+class DailySalesStatusResponse(BaseModel):
+    status: str
+    payment_status: str
+    order_count: int
+    total_amount: Decimal
+
+class DailySalesResponse(BaseModel):
+    """일별 매출 (net은 취소/환불 제외, paid는 그중 결제 완료)"""
+    day: date
+    currency_code: str
+    order_count: int
+    gross_amount: Decimal
+    net_order_count: int
+    net_amount: Decimal
+    paid_amount: Decimal
+    statuses: List[DailySalesStatusResponse]
+
+class TopVariantResponse(BaseModel):
+    variant_id: int
+    product_id: Optional[int]
+    variant_title: Optional[str]
+    product_title: Optional[str]
+    product_handle: Optional[str]
+    units: int
+    order_count: int
+    revenue: Decimal
+
+class TopProductResponse(BaseModel):
+    product_id: int
+    title: Optional[str]
+    handle: Optional[str]
+    units: int
+    revenue: Decimal
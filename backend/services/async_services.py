@@ -0,0 +1,54 @@
+from database.connection import DbSession, run_db
+from services.product_service import ProductService
+from services.cart_service import CartService, HotCartService
+from services.cart_store import hot_carts
+from services.order_service import OrderService
+from services.collection_service import CollectionService
+from services.report_service import ReportService
+from services.fulfillment_queue import FulfillmentQueue
+import functools
+
+class AsyncServiceAdapter:
+    """동기 서비스의 비동기 버전
+
+    서비스 메서드를 그대로 노출하되 awaitable로 바꿔, 비동기 엔진 설정이면
+    AsyncSession.run_sync로, 아니면 스레드풀에서 실행한다.
+    어느 쪽이든 쿼리 대기 중에 이벤트 루프가 다른 요청을 처리할 수 있다.
+    """
+
+    service_class = None
+
+    def __init__(self, service=None):
+        self.service = service or self.service_class()
+
+    def __getattr__(self, name: str):
+        method = getattr(self.service, name)
+        if name.startswith("_") or not callable(method):
+            return method
+
+        @functools.wraps(method)
+        async def call(db: DbSession, *args, **kwargs):
+            return await run_db(db, method, *args, **kwargs)
+
+        # 다음 조회부터는 __getattr__을 거치지 않도록 캐시
+        setattr(self, name, call)
+        return call
+
+class AsyncProductService(AsyncServiceAdapter):
+    service_class = ProductService
+
+class AsyncCartService(AsyncServiceAdapter):
+    # CART_STORE 설정 시 핫 스토어 경로 사용
+    service_class = HotCartService if hot_carts is not None else CartService
+
+class AsyncOrderService(AsyncServiceAdapter):
+    service_class = OrderService
+
+class AsyncCollectionService(AsyncServiceAdapter):
+    service_class = CollectionService
+
+class AsyncReportService(AsyncServiceAdapter):
+    service_class = ReportService
+
+class AsyncFulfillmentQueue(AsyncServiceAdapter):
+    service_class = FulfillmentQueue
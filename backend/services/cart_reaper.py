@@ -0,0 +1,179 @@
+from sqlalchemy import and_, delete, func, or_
+from sqlalchemy.orm import Session
+from models import Cart, CartItem, InventoryReservation
+from services.inventory_service import inventory_service
+from core.config import settings
+from core.metrics import registry
+from typing import Callable, Dict, Optional
+import datetime
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 방치된 장바구니 정리
+#
+# updated_at이 CART_IDLE_TTL보다 오래된 장바구니를 idx_carts_updated_at 인덱스 순서로 찾아
+# 작은 배치마다 짧은 트랜잭션으로 삭제하고, 배치 사이에 쉬어 긴 잠금/복제 지연을 만들지 않는다.
+# 배치 안에서는 PK 순서로 잠그고 삭제해 다른 트랜잭션과의 교착을 피한다.
+# 삭제하는 장바구니의 재고 보류도 같은 트랜잭션에서 해제해 보류 합계가 남지 않게 한다.
+#
+# 핫 스토어(CART_STORE) 사용 시 DB 행만 삭제한다. 저장소에 남은 장바구니가 다시 변경되면
+# 플러시 때 새로 기록된다.
+
+reaped_rows = registry.counter(
+    "cart_reaper_rows",
+    "Rows deleted (or counted in dry-run mode) by the abandoned cart reaper",
+    ["table", "dry_run"]
+)
+batch_seconds = registry.histogram(
+    "cart_reaper_batch_seconds",
+    "Time spent in one reaper batch transaction"
+)
+
+class CartReaper:
+    """방치된 장바구니를 배치 단위로 삭제"""
+
+    def __init__(
+        self,
+        idle_ttl: int,
+        batch_size: int = 500,
+        pause: float = 0.2,
+        guest_only: bool = True,
+        dry_run: bool = False
+    ):
+        self.idle_ttl = idle_ttl
+        self.batch_size = batch_size
+        self.pause = pause
+        self.guest_only = guest_only
+        self.dry_run = dry_run
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _candidates(self, db: Session, cutoff: datetime.datetime, after):
+        """(updated_at, id) 순서로 다음 배치 후보 조회"""
+        query = db.query(Cart.id, Cart.updated_at).filter(Cart.updated_at < cutoff)
+        if self.guest_only:
+            query = query.filter(Cart.user_id.is_(None))
+        if after is not None:
+            last_updated_at, last_id = after
+            query = query.filter(or_(
+                Cart.updated_at > last_updated_at,
+                and_(Cart.updated_at == last_updated_at, Cart.id > last_id)
+            ))
+        return query.order_by(Cart.updated_at, Cart.id).limit(self.batch_size).all()
+
+    def _reap_batch(self, db: Session, cart_ids, cutoff: datetime.datetime) -> Dict[str, int]:
+        """한 배치 삭제 (후보 조회 후 변경된 장바구니는 제외)"""
+        stale = db.query(Cart.id).filter(Cart.id.in_(cart_ids), Cart.updated_at < cutoff)
+        if self.guest_only:
+            stale = stale.filter(Cart.user_id.is_(None))
+
+        if self.dry_run:
+            stale_ids = [cart_id for (cart_id,) in stale.all()]
+            if not stale_ids:
+                return {'carts': 0, 'cart_items': 0, 'inventory_reservations': 0}
+            items = db.query(func.count(CartItem.id)).filter(CartItem.cart_id.in_(stale_ids)).scalar()
+            holds = db.query(func.count(InventoryReservation.id))\
+                .filter(InventoryReservation.cart_id.in_(stale_ids)).scalar()
+            return {'carts': len(stale_ids), 'cart_items': items, 'inventory_reservations': holds}
+
+        # PK 순서로 잠가 동시에 변경되는 장바구니를 삭제하지 않도록 함
+        stale_ids = [cart_id for (cart_id,) in stale.order_by(Cart.id).with_for_update().all()]
+        if not stale_ids:
+            return {'carts': 0, 'cart_items': 0, 'inventory_reservations': 0}
+
+        holds = inventory_service.release_carts(db, stale_ids)
+        items = db.execute(
+            delete(CartItem.__table__).where(CartItem.__table__.c.cart_id.in_(stale_ids))
+        ).rowcount
+        carts = db.execute(
+            delete(Cart.__table__).where(Cart.__table__.c.id.in_(stale_ids))
+        ).rowcount
+        return {'carts': carts, 'cart_items': items, 'inventory_reservations': holds}
+
+    def run_once(self, session_factory: Callable[[], Session]) -> Dict[str, int]:
+        """대상 장바구니를 모두 처리하고 삭제(또는 집계)한 행 수 반환"""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.idle_ttl)
+        dry_run = "true" if self.dry_run else "false"
+        totals = {'carts': 0, 'cart_items': 0, 'inventory_reservations': 0}
+        after = None
+
+        while not self._stop.is_set():
+            db = session_factory()
+            started_at = time.perf_counter()
+            try:
+                rows = self._candidates(db, cutoff, after)
+                if not rows:
+                    break
+                after = (rows[-1].updated_at, rows[-1].id)
+
+                counts = self._reap_batch(db, sorted(row.id for row in rows), cutoff)
+                if self.dry_run:
+                    db.rollback()
+                else:
+                    db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+                batch_seconds.observe(time.perf_counter() - started_at)
+
+            for table, count in counts.items():
+                totals[table] += count
+                reaped_rows.inc(count, table=table, dry_run=dry_run)
+
+            if len(rows) < self.batch_size:
+                break
+            self._stop.wait(self.pause)
+
+        action = "Would delete" if self.dry_run else "Deleted"
+        logger.info(
+            f"{action} {totals['carts']} idle carts "
+            f"({totals['cart_items']} items, {totals['inventory_reservations']} inventory holds)"
+        )
+        return totals
+
+    def start(self, session_factory: Callable[[], Session], interval: float):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(session_factory, interval), daemon=True, name="cart-reaper"
+        )
+        self._thread.start()
+
+    def _run(self, session_factory: Callable[[], Session], interval: float):
+        while not self._stop.is_set():
+            try:
+                self.run_once(session_factory)
+            except Exception as e:
+                logger.error(f"Cart reaper failed: {e}")
+            self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+cart_reaper = CartReaper(
+    settings.CART_IDLE_TTL,
+    settings.CART_REAPER_BATCH_SIZE,
+    settings.CART_REAPER_PAUSE,
+    settings.CART_REAPER_GUEST_ONLY,
+    settings.CART_REAPER_DRY_RUN
+)
+
+if __name__ == "__main__":
+    # 크론 등에서 한 번 실행: python -m services.cart_reaper [--dry-run]
+    import argparse
+    from database.connection import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Delete idle carts in small batches")
+    parser.add_argument("--dry-run", action="store_true", help="count candidates without deleting")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
+    if args.dry_run:
+        cart_reaper.dry_run = True
+    print(cart_reaper.run_once(SessionLocal))
@@ -1,8 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql import func
 from models.cart import Cart, CartItem
-from models.product import ProductVariant
+from models.product import Product, ProductVariant
 from schemas.cart import CartCreate, CartItemCreate, CartItemUpdate
-from typing import List, Optional, Dict, Any
+from database.upsert import upsert
+from services.inventory_service import inventory_service
+from services.cart_store import (
+    HotCartStore, CartMissing, hot_carts, cart_response, variant_summary, utc_timestamp
+)
+from typing import Any, Callable, Dict, List, Optional
 import uuid
 import logging
 
@@ -10,6 +16,15 @@ logger = logging.getLogger(__name__)
 
 class CartService:
     
+    def _cart_query(self, db: Session):
+        """응답 직렬화에 필요한 아이템/변형 상품/제품/이미지를 함께 로드 (아이템 수와 무관하게 고정 쿼리 수)"""
+        return db.query(Cart).options(
+            selectinload(Cart.items)
+            .selectinload(CartItem.variant)
+            .selectinload(ProductVariant.product)
+            .selectinload(Product.images)
+        )
+    
     def create_cart(self, db: Session, cart_data: CartCreate) -> Dict[str, Any]:
         """새 장바구니 생성"""
         cart = Cart(
@@ -26,7 +41,7 @@ class CartService:
     def get_cart(self, db: Session, cart_id: str) -> Optional[Dict[str, Any]]:
         """장바구니 조회"""
         try:
-            cart = db.query(Cart).filter(Cart.id == cart_id).first()
+            cart = self._cart_query(db).filter(Cart.id == cart_id).first()
             if not cart:
                 return None
             
@@ -53,62 +68,85 @@ class CartService:
                 }
             return None
     
+    def _load_cart(self, db: Session, cart_id: str) -> Optional[Cart]:
+        """변경 후 응답용으로 장바구니를 다시 로드 (세션에 남은 이전 상태를 덮어씀)"""
+        return self._cart_query(db).filter(Cart.id == cart_id).populate_existing().first()
+    
+    def _touch(self, db: Session, cart_id: str):
+        """아이템 변경 시 장바구니 updated_at 갱신 (방치된 장바구니 정리 기준)"""
+        db.query(Cart).filter(Cart.id == cart_id).update(
+            {Cart.updated_at: func.now()}, synchronize_session=False
+        )
+    
+    def _variants_by_id(self, db: Session, variant_ids) -> Dict[int, ProductVariant]:
+        """변형 상품을 한 번의 IN 쿼리로 조회"""
+        if not variant_ids:
+            return {}
+        variants = db.query(ProductVariant).filter(ProductVariant.id.in_(set(variant_ids))).all()
+        return {variant.id: variant for variant in variants}
+    
     def add_items_to_cart(
         self, 
         db: Session, 
         cart_id: str, 
         items: List[CartItemCreate]
     ) -> Optional[Dict[str, Any]]:
-        """장바구니에 상품 추가"""
+        """장바구니에 상품 추가 (아이템 수와 무관하게 고정 쿼리 수)"""
         
-        cart = db.query(Cart).filter(Cart.id == cart_id).first()
+        cart = db.query(Cart.id).filter(Cart.id == cart_id).first()
         if not cart:
             return None
         
+        # 같은 변형 상품이 여러 번 오면 수량 합산 (요청 순서 유지)
+        quantities: Dict[int, int] = {}
         for item_data in items:
-            # 변형 상품 존재 확인
-            variant = db.query(ProductVariant).filter(
-                ProductVariant.id == item_data.variant_id
-            ).first()
+            quantities[item_data.variant_id] = quantities.get(item_data.variant_id, 0) + item_data.quantity
+        
+        variants = self._variants_by_id(db, quantities)
+        existing_quantities = dict(
+            db.query(CartItem.variant_id, CartItem.quantity).filter(
+                CartItem.cart_id == cart_id,
+                CartItem.variant_id.in_(list(quantities))
+            ).all()
+        ) if quantities else {}
+        
+        rows = []
+        totals: Dict[int, int] = {}
+        for variant_id, quantity in quantities.items():
+            variant = variants.get(variant_id)
             
+            # 변형 상품 존재 확인
             if not variant:
-                raise ValueError(f"Product variant {item_data.variant_id} not found")
+                raise ValueError(f"Product variant {variant_id} not found")
             
             if not variant.available_for_sale:
-                raise ValueError(f"Product variant {item_data.variant_id} is not available for sale")
+                raise ValueError(f"Product variant {variant_id} is not available for sale")
             
-            # 재고 확인
-            if variant.inventory_quantity < item_data.quantity:
-                raise ValueError(f"Insufficient inventory for variant {item_data.variant_id}")
-            
-            # 기존 장바구니 아이템 확인
-            existing_item = db.query(CartItem).filter(
-                CartItem.cart_id == cart_id,
-                CartItem.variant_id == item_data.variant_id
-            ).first()
+            # 재고 확인 (기존 수량 포함) - 보류 사용 시에는 reserve가 확인
+            totals[variant_id] = existing_quantities.get(variant_id, 0) + quantity
+            if not inventory_service.holds_enabled and variant.total_inventory < totals[variant_id]:
+                raise ValueError(f"Insufficient inventory for variant {variant_id}")
             
-            if existing_item:
-                # 기존 아이템의 수량 업데이트
-                new_quantity = existing_item.quantity + item_data.quantity
-                
-                # 재고 재확인
-                if variant.inventory_quantity < new_quantity:
-                    raise ValueError(f"Insufficient inventory for variant {item_data.variant_id}")
-                
-                existing_item.quantity = new_quantity
-            else:
-                # 새 아이템 추가
-                cart_item = CartItem(
-                    cart_id=cart_id,
-                    variant_id=item_data.variant_id,
-                    quantity=item_data.quantity
-                )
-                db.add(cart_item)
+            rows.append({'cart_id': cart_id, 'variant_id': variant_id, 'quantity': quantity})
+        
+        # 장바구니 수량만큼 재고 보류 (판매 가능 수량이 부족하면 롤백 후 오류)
+        inventory_service.reserve(db, cart_id, totals)
         
+        # 기존 아이템은 수량 증가, 없으면 추가 (unique_cart_variant 키)
+        upsert(
+            db,
+            CartItem.__table__,
+            rows,
+            ['cart_id', 'variant_id'],
+            lambda inserted: {
+                'quantity': CartItem.__table__.c.quantity + inserted.quantity,
+                'updated_at': func.now()
+            }
+        )
+        self._touch(db, cart_id)
         db.commit()
-        db.refresh(cart)
         
-        return cart.to_dict()
+        return self._load_cart(db, cart_id).to_dict()
     
     def update_cart_items(
         self, 
@@ -118,15 +156,27 @@ class CartService:
     ) -> Optional[Dict[str, Any]]:
         """장바구니 상품 수량 업데이트"""
         
-        cart = db.query(Cart).filter(Cart.id == cart_id).first()
+        cart = db.query(Cart.id).filter(Cart.id == cart_id).first()
         if not cart:
             return None
         
+        # 변형 상품 변경 시 다른 아이템과의 중복 확인을 위해 장바구니 아이템 전체 조회
+        cart_items = {
+            cart_item.id: cart_item
+            for cart_item in db.query(CartItem).filter(CartItem.cart_id == cart_id).all()
+        } if items else {}
+        
+        # 현재/변경할 변형 상품을 한 번에 조회
+        variant_ids = {cart_items[item_data.id].variant_id for item_data in items if item_data.id in cart_items}
+        variant_ids.update(item_data.variant_id for item_data in items if item_data.variant_id)
+        variants = self._variants_by_id(db, variant_ids)
+        
+        # 변경 후 변형 상품별 보류 수량 (0이면 해제)
+        holds: Dict[int, int] = {}
+        check_inventory = not inventory_service.holds_enabled
+        
         for item_data in items:
-            cart_item = db.query(CartItem).filter(
-                CartItem.id == item_data.id,
-                CartItem.cart_id == cart_id
-            ).first()
+            cart_item = cart_items.get(item_data.id)
             
             if not cart_item:
                 raise ValueError(f"Cart item {item_data.id} not found")
@@ -134,10 +184,11 @@ class CartService:
             if item_data.quantity <= 0:
                 # 수량이 0 이하면 아이템 삭제
                 db.delete(cart_item)
+                holds[cart_item.variant_id] = 0
             else:
                 # 재고 확인
-                variant = cart_item.variant
-                if variant and variant.inventory_quantity < item_data.quantity:
+                variant = variants.get(cart_item.variant_id)
+                if check_inventory and variant and variant.total_inventory < item_data.quantity:
                     raise ValueError(f"Insufficient inventory for variant {cart_item.variant_id}")
                 
                 # 수량 업데이트
@@ -145,9 +196,7 @@ class CartService:
                 
                 # 변형 상품 변경 (선택사항)
                 if item_data.variant_id and item_data.variant_id != cart_item.variant_id:
-                    new_variant = db.query(ProductVariant).filter(
-                        ProductVariant.id == item_data.variant_id
-                    ).first()
+                    new_variant = variants.get(item_data.variant_id)
                     
                     if not new_variant:
                         raise ValueError(f"Product variant {item_data.variant_id} not found")
@@ -155,15 +204,23 @@ class CartService:
                     if not new_variant.available_for_sale:
                         raise ValueError(f"Product variant {item_data.variant_id} is not available for sale")
                     
-                    if new_variant.inventory_quantity < item_data.quantity:
+                    if check_inventory and new_variant.total_inventory < item_data.quantity:
                         raise ValueError(f"Insufficient inventory for variant {item_data.variant_id}")
                     
+                    # unique_cart_variant 키와 충돌하면 커밋이 실패하므로 미리 거부
+                    if any(other.variant_id == item_data.variant_id for other in cart_items.values() if other is not cart_item):
+                        raise ValueError(f"Product variant {item_data.variant_id} is already in cart")
+                    
+                    holds.setdefault(cart_item.variant_id, 0)
                     cart_item.variant_id = item_data.variant_id
+                
+                holds[cart_item.variant_id] = item_data.quantity
         
+        inventory_service.reserve(db, cart_id, holds)
+        self._touch(db, cart_id)
         db.commit()
-        db.refresh(cart)
         
-        return cart.to_dict()
+        return self._load_cart(db, cart_id).to_dict()
     
     def remove_items_from_cart(
         self, 
@@ -173,25 +230,25 @@ class CartService:
     ) -> bool:
         """장바구니에서 상품 제거"""
         
-        cart = db.query(Cart).filter(Cart.id == cart_id).first()
-        if not cart:
+        cart = db.query(Cart.id).filter(Cart.id == cart_id).first()
+        if not cart or not item_ids:
             return False
         
-        # 아이템들 삭제
-        deleted_count = 0
-        for item_id in item_ids:
-            cart_item = db.query(CartItem).filter(
-                CartItem.id == item_id,
-                CartItem.cart_id == cart_id
-            ).first()
-            
-            if cart_item:
-                db.delete(cart_item)
-                deleted_count += 1
+        removed = db.query(CartItem).filter(
+            CartItem.cart_id == cart_id,
+            CartItem.id.in_(set(item_ids))
+        )
+        variant_ids = [variant_id for (variant_id,) in removed.with_entities(CartItem.variant_id).all()]
+        
+        # 아이템들을 한 번에 삭제
+        deleted_count = removed.delete(synchronize_session=False)
         
         if deleted_count == 0:
+            db.rollback()
             return False
         
+        inventory_service.release_cart(db, cart_id, variant_ids)
+        self._touch(db, cart_id)
         db.commit()
         return True
     
@@ -204,6 +261,8 @@ class CartService:
         
         # 모든 아이템 삭제
         db.query(CartItem).filter(CartItem.cart_id == cart_id).delete()
+        inventory_service.release_cart(db, cart_id)
+        self._touch(db, cart_id)
         db.commit()
         
         return True
@@ -216,11 +275,269 @@ class CartService:
             return False
         
         db.delete(cart)
+        inventory_service.release_cart(db, cart_id)
         db.commit()
         
         return True
     
     def get_cart_by_session(self, db: Session, session_id: str) -> Optional[Dict[str, Any]]:
         """세션 ID로 장바구니 조회"""
-        cart = db.query(Cart).filter(Cart.session_id == session_id).first()
+        cart = self._cart_query(db).filter(Cart.session_id == session_id).first()
         return cart.to_dict() if cart else None
+
+class HotCartService(CartService):
+    """장바구니 핫 스토어(CART_STORE) 사용 시의 장바구니 서비스 (CartService와 같은 API)
+
+    읽기/쓰기는 저장소에서 처리하고 DB에는 플러셔가 나중에 반영한다.
+    DB 조회는 변형 상품 검증(추가/수정)과 저장소에 없는 장바구니 로드에만 사용한다.
+    """
+    
+    def __init__(self, store: Optional[HotCartStore] = None):
+        self.store = store or hot_carts
+    
+    def _with_holds(self, db: Session, hold: Callable[[], None], change: Callable[[], Any]) -> Any:
+        """DB에 재고 보류를 건 뒤 저장소를 변경하고 함께 확정 (저장소 변경이 실패하면 보류도 롤백)"""
+        try:
+            hold()
+            result = change()
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        return result
+    
+    def create_cart(self, db: Session, cart_data: CartCreate) -> Dict[str, Any]:
+        """새 장바구니 생성"""
+        return cart_response(self.store.create(cart_data.user_id))
+    
+    def get_cart(self, db: Session, cart_id: str) -> Optional[Dict[str, Any]]:
+        """장바구니 조회"""
+        state = self.store.get(db, cart_id)
+        return cart_response(state) if state else None
+    
+    def get_cart_by_session(self, db: Session, session_id: str) -> Optional[Dict[str, Any]]:
+        """세션 ID로 장바구니 조회"""
+        state = self.store.get_by_session(db, session_id)
+        return cart_response(state) if state else None
+    
+    def add_items_to_cart(
+        self, 
+        db: Session, 
+        cart_id: str, 
+        items: List[CartItemCreate]
+    ) -> Optional[Dict[str, Any]]:
+        """장바구니에 상품 추가"""
+        
+        state = self.store.get(db, cart_id)
+        if not state:
+            return None
+        
+        # 같은 변형 상품이 여러 번 오면 수량 합산 (요청 순서 유지)
+        quantities: Dict[int, int] = {}
+        for item_data in items:
+            quantities[item_data.variant_id] = quantities.get(item_data.variant_id, 0) + item_data.quantity
+        
+        variants = self.store.load_variants(db, quantities)
+        for variant_id in quantities:
+            variant = variants.get(variant_id)
+            if not variant:
+                raise ValueError(f"Product variant {variant_id} not found")
+            if not variant.available_for_sale:
+                raise ValueError(f"Product variant {variant_id} is not available for sale")
+        
+        in_cart = {item['variant_id']: item['quantity'] for item in state['items']}
+        item_ids = self.store.reserve_item_ids(sum(1 for variant_id in quantities if variant_id not in in_cart))
+        totals = {variant_id: in_cart.get(variant_id, 0) + quantity for variant_id, quantity in quantities.items()}
+        
+        def apply(state: Dict[str, Any]):
+            by_variant = {item['variant_id']: item for item in state['items']}
+            now = utc_timestamp()
+            for variant_id, quantity in quantities.items():
+                variant = variants[variant_id]
+                item = by_variant.get(variant_id)
+                
+                # 재고 확인 (기존 수량 포함) - 보류 사용 시에는 reserve가 확인
+                if not inventory_service.holds_enabled and \
+                        variant.total_inventory < (item['quantity'] if item else 0) + quantity:
+                    raise ValueError(f"Insufficient inventory for variant {variant_id}")
+                
+                if item:
+                    item['quantity'] += quantity
+                    item['updated_at'] = now
+                    item['variant'] = variant_summary(variant)
+                else:
+                    # 다른 요청이 먼저 아이템을 지웠으면 예약분보다 많이 필요할 수 있음
+                    item_id = item_ids.pop(0) if item_ids else self.store.reserve_item_ids(1)[0]
+                    state['items'].append({
+                        'id': item_id,
+                        'variant_id': variant_id,
+                        'quantity': quantity,
+                        'created_at': now,
+                        'updated_at': now,
+                        'variant': variant_summary(variant)
+                    })
+        
+        try:
+            state = self._with_holds(
+                db,
+                lambda: inventory_service.reserve(db, cart_id, totals),
+                lambda: self.store.mutate(cart_id, apply)
+            )
+        except CartMissing:
+            return None
+        return cart_response(state)
+    
+    def update_cart_items(
+        self, 
+        db: Session, 
+        cart_id: str, 
+        items: List[CartItemUpdate]
+    ) -> Optional[Dict[str, Any]]:
+        """장바구니 상품 수량 업데이트"""
+        
+        state = self.store.get(db, cart_id)
+        if not state:
+            return None
+        
+        variant_ids = {item['variant_id'] for item in state['items']}
+        variant_ids.update(item_data.variant_id for item_data in items if item_data.variant_id)
+        variants = self.store.load_variants(db, variant_ids)
+        check_inventory = not inventory_service.holds_enabled
+        
+        # 변경 후 변형 상품별 보류 수량 (0이면 해제, 잘못된 요청은 apply에서 거부)
+        holds: Dict[int, int] = {}
+        current = {item['id']: item['variant_id'] for item in state['items']}
+        for item_data in items:
+            variant_id = current.get(item_data.id)
+            if variant_id is None:
+                continue
+            if item_data.quantity <= 0:
+                holds[variant_id] = 0
+                continue
+            new_variant = variants.get(item_data.variant_id) if item_data.variant_id else None
+            if new_variant and new_variant.available_for_sale and new_variant.id != variant_id:
+                holds.setdefault(variant_id, 0)
+                variant_id = new_variant.id
+            holds[variant_id] = item_data.quantity
+        
+        def apply(state: Dict[str, Any]):
+            by_id = {item['id']: item for item in state['items']}
+            removed = set()
+            now = utc_timestamp()
+            for item_data in items:
+                item = by_id.get(item_data.id)
+                
+                if not item or item['id'] in removed:
+                    raise ValueError(f"Cart item {item_data.id} not found")
+                
+                if item_data.quantity <= 0:
+                    # 수량이 0 이하면 아이템 삭제
+                    removed.add(item['id'])
+                    continue
+                
+                # 재고 확인
+                variant = variants.get(item['variant_id'])
+                if check_inventory and variant and variant.total_inventory < item_data.quantity:
+                    raise ValueError(f"Insufficient inventory for variant {item['variant_id']}")
+                
+                # 수량 업데이트
+                item['quantity'] = item_data.quantity
+                item['updated_at'] = now
+                
+                # 변형 상품 변경 (선택사항)
+                if item_data.variant_id and item_data.variant_id != item['variant_id']:
+                    new_variant = variants.get(item_data.variant_id)
+                    
+                    if not new_variant:
+                        raise ValueError(f"Product variant {item_data.variant_id} not found")
+                    
+                    if not new_variant.available_for_sale:
+                        raise ValueError(f"Product variant {item_data.variant_id} is not available for sale")
+                    
+                    if check_inventory and new_variant.total_inventory < item_data.quantity:
+                        raise ValueError(f"Insufficient inventory for variant {item_data.variant_id}")
+                    
+                    # unique_cart_variant 키와 충돌하면 플러시가 실패하므로 미리 거부
+                    if any(other['variant_id'] == item_data.variant_id for other in state['items'] if other is not item):
+                        raise ValueError(f"Product variant {item_data.variant_id} is already in cart")
+                    
+                    item['variant_id'] = item_data.variant_id
+                    variant = new_variant
+                
+                if variant:
+                    item['variant'] = variant_summary(variant)
+            
+            state['items'] = [item for item in state['items'] if item['id'] not in removed]
+        
+        try:
+            state = self._with_holds(
+                db,
+                lambda: inventory_service.reserve(db, cart_id, holds),
+                lambda: self.store.mutate(cart_id, apply)
+            )
+        except CartMissing:
+            return None
+        return cart_response(state)
+    
+    def remove_items_from_cart(
+        self, 
+        db: Session, 
+        cart_id: str, 
+        item_ids: List[int]
+    ) -> bool:
+        """장바구니에서 상품 제거"""
+        
+        state = self.store.get(db, cart_id)
+        item_ids = set(item_ids)
+        if not state or not any(item['id'] in item_ids for item in state['items']):
+            return False
+        
+        variant_ids = [item['variant_id'] for item in state['items'] if item['id'] in item_ids]
+        
+        def apply(state: Dict[str, Any]):
+            state['items'] = [item for item in state['items'] if item['id'] not in item_ids]
+        
+        try:
+            self._with_holds(
+                db,
+                lambda: inventory_service.release_cart(db, cart_id, variant_ids),
+                lambda: self.store.mutate(cart_id, apply)
+            )
+        except CartMissing:
+            return False
+        return True
+    
+    def clear_cart(self, db: Session, cart_id: str) -> bool:
+        """장바구니 비우기"""
+        
+        if not self.store.get(db, cart_id):
+            return False
+        
+        def apply(state: Dict[str, Any]):
+            state['items'] = []
+        
+        try:
+            self._with_holds(
+                db,
+                lambda: inventory_service.release_cart(db, cart_id),
+                lambda: self.store.mutate(cart_id, apply)
+            )
+        except CartMissing:
+            return False
+        return True
+    
+    def delete_cart(self, db: Session, cart_id: str) -> bool:
+        """장바구니 삭제"""
+        
+        if not self.store.get(db, cart_id):
+            return False
+        
+        try:
+            self._with_holds(
+                db,
+                lambda: inventory_service.release_cart(db, cart_id),
+                lambda: self.store.delete(cart_id)
+            )
+        except CartMissing:
+            return False
+        return True
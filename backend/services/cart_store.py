@@ -0,0 +1,652 @@
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session, joinedload, selectinload
+from models.cart import Cart, CartItem
+from models.product import Product, ProductVariant
+from database.upsert import upsert
+from core.concurrency import blocking_call, off_event_loop
+from core.config import settings
+from core.metrics import registry
+from core.ids import new_id
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import datetime
+import json
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# 장바구니 핫 스토어 (write-behind)
+#
+# CART_STORE가 memory/redis이면 장바구니 상태(아이템, 변형 상품 요약)를 키-값 저장소에 두고
+# 읽기/쓰기를 저장소에서 처리한다. 변경된 장바구니는 dirty 집합에 기록되고, 백그라운드 플러셔가
+# CART_FLUSH_INTERVAL마다 CART_FLUSH_BATCH_SIZE개씩 carts/cart_items 테이블에 일괄 반영한다.
+#
+# - 저장소가 원본이고 DB는 뒤따라간다. 주문 생성처럼 DB의 장바구니를 읽는 경로는 먼저 flush_cart를 호출한다.
+# - 아이템 ID는 저장소의 시퀀스로 발급하고 DB에도 같은 ID로 기록한다 (시작 시 DB 최대 ID 이상으로 맞춤).
+# - 변형 상품 가격/제목 등 표시 정보는 아이템을 추가/수정할 때의 값을 보관한다.
+# - 플러시는 저장소 잠금으로 한 번에 한 워커만 수행해, 오래된 상태가 최신 상태를 덮어쓰지 않게 한다.
+# - memory 저장소는 프로세스마다 따로 존재하므로 워커가 하나일 때만 사용한다.
+
+flushed_carts = registry.counter(
+    "cart_store_flushed_carts",
+    "Carts written from the hot cart store to the database"
+)
+flush_failures = registry.counter(
+    "cart_store_flush_failures",
+    "Cart flush batches that failed and were re-queued"
+)
+flush_seconds = registry.histogram(
+    "cart_store_flush_seconds",
+    "Time spent writing one batch of carts to the database"
+)
+
+class CartMissing(Exception):
+    """저장소에 장바구니가 없음 (만료/삭제)"""
+
+def utc_timestamp() -> str:
+    return datetime.datetime.utcnow().replace(microsecond=0).isoformat()
+
+def _dumps(state: Dict[str, Any]) -> str:
+    return json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+
+class MemoryCartBackend:
+    """프로세스 내 장바구니 저장소 (단일 노드/테스트용)"""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._carts: Dict[str, tuple] = {}
+        self._sessions: Dict[str, str] = {}
+        self._dirty: Dict[str, None] = {}
+        self._sequence = 0
+        self._locked_until = 0.0
+        self._lock = threading.RLock()
+
+    def get(self, cart_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._carts.get(cart_id)
+            if entry is None:
+                return None
+            raw, expires_at = entry
+            if expires_at <= time.time():
+                del self._carts[cart_id]
+                return None
+            return json.loads(raw)
+
+    def get_session(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def add(self, state: Dict[str, Any]) -> bool:
+        """없을 때만 저장 (DB에서 읽어 채울 때 사용)"""
+        with self._lock:
+            if self.get(state['id']) is not None:
+                return False
+            self._write(state)
+            return True
+
+    def _write(self, state: Dict[str, Any]):
+        self._carts[state['id']] = (_dumps(state), time.time() + self.ttl)
+        if state.get('session_id'):
+            self._sessions[state['session_id']] = state['id']
+
+    def update(self, cart_id: str, fn: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            state = fn(self.get(cart_id))
+            self._write(state)
+            self._dirty[cart_id] = None
+            return state
+
+    def remove(self, cart_id: str):
+        with self._lock:
+            entry = self._carts.pop(cart_id, None)
+            if entry is not None:
+                session_id = json.loads(entry[0]).get('session_id')
+                if session_id and self._sessions.get(session_id) == cart_id:
+                    del self._sessions[session_id]
+
+    def pop_dirty(self, limit: int) -> List[str]:
+        with self._lock:
+            cart_ids = list(self._dirty)[:limit]
+            for cart_id in cart_ids:
+                del self._dirty[cart_id]
+            return cart_ids
+
+    def mark_dirty(self, cart_ids: Iterable[str]):
+        with self._lock:
+            for cart_id in cart_ids:
+                self._dirty[cart_id] = None
+
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    def reserve_item_ids(self, count: int) -> int:
+        """연속된 아이템 ID count개를 예약하고 첫 ID 반환"""
+        with self._lock:
+            first = self._sequence + 1
+            self._sequence += count
+            return first
+
+    def raise_item_id_floor(self, value: int):
+        with self._lock:
+            self._sequence = max(self._sequence, value)
+
+    def acquire_flush_lock(self, ttl: float) -> Optional[str]:
+        with self._lock:
+            now = time.monotonic()
+            if self._locked_until > now:
+                return None
+            self._locked_until = now + ttl
+            return "memory"
+
+    def release_flush_lock(self, token: str):
+        with self._lock:
+            self._locked_until = 0.0
+
+class RedisCartBackend:
+    """Redis 장바구니 저장소 (워커/노드 간 공유)"""
+
+    # 현재 값보다 클 때만 시퀀스를 올림
+    _RAISE_FLOOR = "local c = tonumber(redis.call('GET', KEYS[1]) or '0') " \
+                   "if c < tonumber(ARGV[1]) then redis.call('SET', KEYS[1], ARGV[1]) end return 1"
+    # 자신이 잡은 잠금만 해제
+    _RELEASE = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None,
+                 ttl: int = 86400, prefix: str = "commerce:cart:"):
+        import redis
+
+        self.client = redis.Redis(
+            host=host,
+            port=port,
+            db=db,
+            password=password,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+        self.ttl = ttl
+        self.prefix = prefix
+        self._watch_error = redis.WatchError
+
+    def _key(self, cart_id: str) -> str:
+        return f"{self.prefix}{cart_id}"
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}"
+
+    @property
+    def _dirty_key(self) -> str:
+        return f"{self.prefix}dirty"
+
+    @off_event_loop
+    def get(self, cart_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self._key(cart_id))
+        return json.loads(raw) if raw is not None else None
+
+    @off_event_loop
+    def get_session(self, session_id: str) -> Optional[str]:
+        raw = self.client.get(self._session_key(session_id))
+        return raw.decode() if raw is not None else None
+
+    @off_event_loop
+    def add(self, state: Dict[str, Any]) -> bool:
+        added = self.client.set(self._key(state['id']), _dumps(state), ex=self.ttl, nx=True)
+        if added and state.get('session_id'):
+            self.client.set(self._session_key(state['session_id']), state['id'], ex=self.ttl)
+        return bool(added)
+
+    def update(self, cart_id: str, fn: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        key = self._key(cart_id)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    # 다른 워커가 먼저 바꾸면 다시 읽어서 재시도 (낙관적 잠금)
+                    # fn은 호출한 쪽(세션이 있는 곳)에서 실행하고 Redis 왕복만 이벤트 루프 밖에서 처리
+                    raw = blocking_call(self._watch_get, pipe, key)
+                    state = fn(json.loads(raw) if raw is not None else None)
+                    blocking_call(self._commit, pipe, cart_id, state)
+                    return state
+                except self._watch_error:
+                    continue
+
+    def _watch_get(self, pipe, key: str) -> Optional[bytes]:
+        pipe.watch(key)
+        return pipe.get(key)
+
+    def _commit(self, pipe, cart_id: str, state: Dict[str, Any]):
+        pipe.multi()
+        pipe.set(self._key(cart_id), _dumps(state), ex=self.ttl)
+        if state.get('session_id'):
+            pipe.set(self._session_key(state['session_id']), cart_id, ex=self.ttl)
+        pipe.sadd(self._dirty_key, cart_id)
+        pipe.execute()
+
+    @off_event_loop
+    def remove(self, cart_id: str):
+        state = self.get(cart_id)
+        keys = [self._key(cart_id)]
+        if state and state.get('session_id'):
+            keys.append(self._session_key(state['session_id']))
+        self.client.delete(*keys)
+
+    @off_event_loop
+    def pop_dirty(self, limit: int) -> List[str]:
+        cart_ids = self.client.spop(self._dirty_key, limit) or []
+        return [cart_id.decode() for cart_id in cart_ids]
+
+    @off_event_loop
+    def mark_dirty(self, cart_ids: Iterable[str]):
+        cart_ids = list(cart_ids)
+        if cart_ids:
+            self.client.sadd(self._dirty_key, *cart_ids)
+
+    @off_event_loop
+    def dirty_count(self) -> int:
+        return self.client.scard(self._dirty_key)
+
+    @off_event_loop
+    def reserve_item_ids(self, count: int) -> int:
+        last = self.client.incrby(f"{self.prefix}item_seq", count)
+        return last - count + 1
+
+    @off_event_loop
+    def raise_item_id_floor(self, value: int):
+        self.client.eval(self._RAISE_FLOOR, 1, f"{self.prefix}item_seq", value)
+
+    @off_event_loop
+    def acquire_flush_lock(self, ttl: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if self.client.set(f"{self.prefix}flush_lock", token, px=int(ttl * 1000), nx=True):
+            return token
+        return None
+
+    @off_event_loop
+    def release_flush_lock(self, token: str):
+        self.client.eval(self._RELEASE, 1, f"{self.prefix}flush_lock", token)
+
+def variant_summary(variant: Optional[ProductVariant]) -> Optional[Dict[str, Any]]:
+    """응답에 필요한 변형 상품 정보 (CartItem.to_dict의 merchandise와 같은 값)"""
+    if variant is None:
+        return None
+    product = variant.product
+    return {
+        'id': variant.id,
+        'title': variant.title,
+        'price': str(variant.price) if variant.price else None,
+        'product': {
+            'id': str(product.id),
+            'handle': product.handle,
+            'title': product.title,
+            'featured_image': product.images[0].to_dict() if product.images else None
+        } if product else None
+    }
+
+def _format_datetime(value: Optional[datetime.datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromisoformat(value) if value else None
+
+def cart_state(cart: Cart) -> Dict[str, Any]:
+    """DB 장바구니를 저장소 상태로 변환"""
+    return {
+        'id': cart.id,
+        'user_id': cart.user_id,
+        'session_id': cart.session_id,
+        'currency_code': cart.currency_code,
+        'created_at': _format_datetime(cart.created_at),
+        'updated_at': _format_datetime(cart.updated_at),
+        'items': [
+            {
+                'id': item.id,
+                'variant_id': item.variant_id,
+                'quantity': item.quantity,
+                'created_at': _format_datetime(item.created_at),
+                'updated_at': _format_datetime(item.updated_at),
+                'variant': variant_summary(item.variant)
+            }
+            for item in cart.items
+        ]
+    }
+
+def cart_response(state: Dict[str, Any]) -> Dict[str, Any]:
+    """저장소 상태를 Cart.to_dict()와 같은 형태로 변환"""
+    currency_code = state['currency_code']
+    items = []
+    subtotal_amount = 0
+    total_quantity = 0
+    for item in state['items']:
+        variant = item['variant']
+        total_amount = float(variant['price']) * item['quantity'] if variant and variant['price'] else 0.0
+        subtotal_amount += total_amount
+        total_quantity += item['quantity']
+        items.append({
+            'id': item['id'],
+            'cart_id': state['id'],
+            'variant_id': item['variant_id'],
+            'quantity': item['quantity'],
+            'created_at': item['created_at'],
+            'updated_at': item['updated_at'],
+            'cost': {
+                'total_amount': {
+                    'amount': str(total_amount),
+                    'currency_code': currency_code
+                }
+            },
+            'merchandise': {
+                'id': str(variant['id']),
+                'title': variant['title'],
+                'price': {
+                    'amount': variant['price'] or '0.00',
+                    'currency_code': currency_code
+                },
+                'product': {
+                    'id': variant['product']['id'] if variant['product'] else None,
+                    'handle': variant['product']['handle'] if variant['product'] else None,
+                    'title': variant['product']['title'] if variant['product'] else None,
+                    'featured_image': variant['product']['featured_image'] if variant['product'] else None
+                }
+            } if variant else None
+        })
+
+    return {
+        'id': state['id'],
+        'user_id': state['user_id'],
+        'session_id': state['session_id'],
+        'currency_code': currency_code,
+        'created_at': state['created_at'],
+        'updated_at': state['updated_at'],
+        'items': items,
+        'total_quantity': total_quantity,
+        'cost': {
+            'subtotal_amount': {
+                'amount': str(subtotal_amount),
+                'currency_code': currency_code
+            },
+            'total_amount': {
+                'amount': str(subtotal_amount),
+                'currency_code': currency_code
+            },
+            'total_tax_amount': {
+                'amount': '0.00',
+                'currency_code': currency_code
+            }
+        }
+    }
+
+class HotCartStore:
+    """장바구니 핫 스토어와 write-behind 플러셔"""
+
+    def __init__(self, backend, flush_interval: float = 1.0, batch_size: int = 100):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # 읽기
+
+    def load_variants(self, db: Session, variant_ids: Iterable[int]) -> Dict[int, ProductVariant]:
+        """변형 상품과 제품/이미지를 함께 조회 (검증과 표시 정보 갱신용)"""
+        variant_ids = set(variant_ids)
+        if not variant_ids:
+            return {}
+        variants = db.query(ProductVariant).options(
+            joinedload(ProductVariant.product).selectinload(Product.images)
+        ).filter(ProductVariant.id.in_(variant_ids)).all()
+        return {variant.id: variant for variant in variants}
+
+    def get(self, db: Session, cart_id: str) -> Optional[Dict[str, Any]]:
+        """장바구니 상태 조회 (저장소에 없으면 DB에서 읽어 채움)"""
+        state = self.backend.get(cart_id)
+        if state is not None:
+            return None if state.get('deleted') else state
+
+        cart = db.query(Cart).options(
+            selectinload(Cart.items)
+            .selectinload(CartItem.variant)
+            .selectinload(ProductVariant.product)
+            .selectinload(Product.images)
+        ).filter(Cart.id == cart_id).first()
+        if cart is None:
+            return None
+
+        state = cart_state(cart)
+        if not self.backend.add(state):
+            # 그사이 다른 요청이 채웠으면 그 값을 사용
+            state = self.backend.get(cart_id)
+            if state is None or state.get('deleted'):
+                return None
+        return state
+
+    def get_by_session(self, db: Session, session_id: str) -> Optional[Dict[str, Any]]:
+        cart_id = self.backend.get_session(session_id)
+        if cart_id is None:
+            row = db.query(Cart.id).filter(Cart.session_id == session_id).first()
+            if row is None:
+                return None
+            cart_id = row[0]
+        return self.get(db, cart_id)
+
+    # 쓰기
+
+    def create(self, user_id: Optional[str]) -> Dict[str, Any]:
+        now = utc_timestamp()
+        state = {
+            'id': new_id(),
+            'user_id': user_id,
+            'session_id': str(uuid.uuid4()),
+            'currency_code': "USD",
+            'created_at': now,
+            'updated_at': now,
+            'items': []
+        }
+        return self.backend.update(state['id'], lambda current: state)
+
+    def mutate(self, cart_id: str, fn: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """장바구니 상태를 원자적으로 변경 (fn은 상태를 직접 수정, 충돌 시 재실행될 수 있음)"""
+        def apply(state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            if state is None or state.get('deleted'):
+                raise CartMissing(cart_id)
+            fn(state)
+            state['updated_at'] = utc_timestamp()
+            return state
+        return self.backend.update(cart_id, apply)
+
+    def delete(self, cart_id: str) -> Dict[str, Any]:
+        """삭제 표시 (플러시 때 DB 행 삭제 후 저장소에서도 제거)"""
+        def apply(state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            if state is None or state.get('deleted'):
+                raise CartMissing(cart_id)
+            return {'id': cart_id, 'session_id': state.get('session_id'), 'deleted': True}
+        return self.backend.update(cart_id, apply)
+
+    def reserve_item_ids(self, count: int) -> List[int]:
+        if count <= 0:
+            return []
+        first = self.backend.reserve_item_ids(count)
+        return list(range(first, first + count))
+
+    def remove_items(self, cart_id: str, item_ids: Iterable[int]):
+        """주문으로 옮겨진 아이템 제거 (주문 생성 후 호출)"""
+        item_ids = set(item_ids)
+
+        def apply(state: Dict[str, Any]):
+            state['items'] = [item for item in state['items'] if item['id'] not in item_ids]
+
+        try:
+            self.mutate(cart_id, apply)
+        except CartMissing:
+            pass
+
+    # 플러시
+
+    def _write(self, db: Session, states: List[Dict[str, Any]]):
+        """상태 목록을 DB에 반영 (커밋은 호출자가 수행)"""
+        deleted_ids = [state['id'] for state in states if state.get('deleted')]
+        live = [state for state in states if not state.get('deleted')]
+        cart_ids = [state['id'] for state in states]
+
+        items_table = CartItem.__table__
+        carts_table = Cart.__table__
+
+        # 장바구니 아이템은 장바구니 단위로 통째로 교체
+        db.execute(delete(items_table).where(items_table.c.cart_id.in_(cart_ids)))
+        if deleted_ids:
+            db.execute(delete(carts_table).where(carts_table.c.id.in_(deleted_ids)))
+        if not live:
+            return
+
+        upsert(
+            db,
+            carts_table,
+            [
+                {
+                    'id': state['id'],
+                    'user_id': state['user_id'],
+                    'session_id': state['session_id'],
+                    'currency_code': state['currency_code'],
+                    'created_at': _parse_datetime(state['created_at']),
+                    'updated_at': _parse_datetime(state['updated_at'])
+                }
+                for state in live
+            ],
+            ['id'],
+            lambda inserted: {
+                'user_id': inserted.user_id,
+                'session_id': inserted.session_id,
+                'currency_code': inserted.currency_code,
+                'updated_at': inserted.updated_at
+            }
+        )
+
+        variant_ids = {item['variant_id'] for state in live for item in state['items']}
+        # 그사이 삭제된 변형 상품의 아이템은 외래 키 오류가 나지 않도록 제외
+        existing = {
+            variant_id for (variant_id,) in
+            db.query(ProductVariant.id).filter(ProductVariant.id.in_(variant_ids)).all()
+        } if variant_ids else set()
+        rows = [
+            {
+                'id': item['id'],
+                'cart_id': state['id'],
+                'variant_id': item['variant_id'],
+                'quantity': item['quantity'],
+                'created_at': _parse_datetime(item['created_at']),
+                'updated_at': _parse_datetime(item['updated_at'])
+            }
+            for state in live
+            for item in state['items']
+            if item['variant_id'] in existing
+        ]
+        if rows:
+            db.execute(insert(items_table), rows)
+
+    def flush_cart(self, db: Session, cart_id: str):
+        """장바구니 하나를 호출자의 트랜잭션으로 DB에 반영 (dirty 표시는 유지)"""
+        state = self.backend.get(cart_id)
+        if state is not None:
+            self._write(db, [state])
+
+    def flush(self, session_factory: Callable[[], Session]) -> int:
+        """dirty 장바구니를 배치 단위로 반영하고 반영한 수 반환"""
+        token = self.backend.acquire_flush_lock(max(self.flush_interval * 10, 30))
+        if token is None:
+            return 0
+
+        total = 0
+        try:
+            while True:
+                cart_ids = self.backend.pop_dirty(self.batch_size)
+                if not cart_ids:
+                    break
+
+                states = []
+                for cart_id in cart_ids:
+                    state = self.backend.get(cart_id)
+                    if state is not None:
+                        states.append(state)
+
+                started_at = time.perf_counter()
+                db = session_factory()
+                try:
+                    self._write(db, states)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    self.backend.mark_dirty(cart_ids)
+                    flush_failures.inc()
+                    raise
+                finally:
+                    db.close()
+                    flush_seconds.observe(time.perf_counter() - started_at)
+
+                for state in states:
+                    if state.get('deleted'):
+                        self.backend.remove(state['id'])
+                flushed_carts.inc(len(states))
+                total += len(states)
+
+                if len(cart_ids) < self.batch_size:
+                    break
+        finally:
+            self.backend.release_flush_lock(token)
+        return total
+
+    def start(self, session_factory: Callable[[], Session]):
+        """아이템 ID 시퀀스를 DB 최대 ID 이상으로 맞추고 플러셔 시작"""
+        db = session_factory()
+        try:
+            max_item_id = db.query(CartItem.id).order_by(CartItem.id.desc()).limit(1).scalar() or 0
+        finally:
+            db.close()
+        self.backend.raise_item_id_floor(max_item_id)
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(session_factory,), daemon=True, name="cart-flusher"
+        )
+        self._thread.start()
+
+    def _run(self, session_factory: Callable[[], Session]):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush(session_factory)
+            except Exception as e:
+                logger.error(f"Cart flush failed: {e}")
+
+    def stop(self, session_factory: Callable[[], Session]):
+        """플러셔 중지 후 남은 변경분 반영"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        try:
+            self.flush(session_factory)
+        except Exception as e:
+            logger.error(f"Final cart flush failed: {e}")
+
+def create_cart_store() -> Optional[HotCartStore]:
+    """설정에 따라 핫 스토어 생성 (CART_STORE: none이면 None - DB 직접 사용)"""
+    backend_name = settings.CART_STORE
+    if backend_name == "none":
+        return None
+
+    if backend_name == "redis":
+        try:
+            backend = RedisCartBackend(
+                settings.REDIS_HOST,
+                settings.REDIS_PORT,
+                settings.REDIS_DB,
+                settings.REDIS_PASSWORD,
+                ttl=settings.CART_STORE_TTL
+            )
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-memory cart store")
+            backend = MemoryCartBackend(settings.CART_STORE_TTL)
+    else:
+        backend = MemoryCartBackend(settings.CART_STORE_TTL)
+
+    return HotCartStore(backend, settings.CART_FLUSH_INTERVAL, settings.CART_FLUSH_BATCH_SIZE)
+
+hot_carts = create_cart_store()
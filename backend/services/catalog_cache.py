@@ -0,0 +1,49 @@
+from sqlalchemy.orm import Session
+from models.product import Product, ProductVariant, Collection, product_collections
+from core.cache import cache, product_cache_key, collection_cache_key
+from typing import Iterable, List
+
+# 카탈로그 문서 캐시 무효화
+#
+# 제품 문서에는 소속 컬렉션(제목, 제품 수)과 변형 상품 재고가 포함되고,
+# 컬렉션 문서에는 제품 수가 포함되므로 변경 범위에 맞는 키만 골라 무효화한다.
+
+def invalidate_products(handles: Iterable[str]):
+    """제품 문서 무효화"""
+    cache.invalidate(product_cache_key(handle) for handle in handles if handle)
+
+def collection_cache_keys(db: Session, collection_ids: Iterable[int], include_products: bool = True) -> List[str]:
+    """컬렉션 변경 시 무효화할 키 (include_products면 컬렉션을 포함하는 제품 문서까지)"""
+    collection_ids = list(set(collection_ids))
+    if not collection_ids or not cache.enabled:
+        return []
+
+    handles = db.query(Collection.handle).filter(Collection.id.in_(collection_ids)).all()
+    keys = [collection_cache_key(handle) for (handle,) in handles]
+
+    if include_products:
+        product_handles = db.query(Product.handle)\
+            .join(product_collections, product_collections.c.product_id == Product.id)\
+            .filter(product_collections.c.collection_id.in_(collection_ids))\
+            .distinct()\
+            .all()
+        keys.extend(product_cache_key(handle) for (handle,) in product_handles)
+
+    return keys
+
+def invalidate_collections(db: Session, collection_ids: Iterable[int], include_products: bool = True):
+    """컬렉션 문서 무효화"""
+    cache.invalidate(collection_cache_keys(db, collection_ids, include_products))
+
+def invalidate_variants(db: Session, variant_ids: Iterable[int]):
+    """변형 상품(재고 등) 변경 시 해당 제품 문서 무효화"""
+    variant_ids = list(set(variant_ids))
+    if not variant_ids or not cache.enabled:
+        return
+
+    handles = db.query(Product.handle)\
+        .join(ProductVariant, ProductVariant.product_id == Product.id)\
+        .filter(ProductVariant.id.in_(variant_ids))\
+        .distinct()\
+        .all()
+    invalidate_products(handle for (handle,) in handles)
@@ -0,0 +1,209 @@
+from sqlalchemy.orm import Session
+from models.product import Collection, Product
+from schemas.product import CollectionCreate
+from services.product_loader import product_loader
+from services.catalog_cache import invalidate_collections, collection_cache_keys, invalidate_products
+from core.pagination import paginate, encode_cursor
+from core.cache import cache, collection_cache_key
+from typing import List, Optional, Dict, Any
+import math
+
+class CollectionService:
+
+    def get_collections(self, db: Session, published_only: bool = True) -> List[Dict[str, Any]]:
+        """컬렉션 목록 조회"""
+        query = db.query(Collection)
+
+        if published_only:
+            query = query.filter(Collection.published == True)
+
+        collections = query.order_by(Collection.created_at.desc()).all()
+        return product_loader.serialize_collections(db, collections)
+
+    def get_collection(self, db: Session, handle: str) -> Optional[Dict[str, Any]]:
+        """개별 컬렉션 조회 (읽기 캐시 경유)"""
+        def load():
+            collection = db.query(Collection).filter(Collection.handle == handle).first()
+            return product_loader.serialize_collections(db, [collection])[0] if collection else None
+
+        return cache.get_or_load(collection_cache_key(handle), load)
+
+    def get_collection_products(
+        self,
+        db: Session,
+        handle: str,
+        page: int = 1,
+        per_page: int = 20,
+        sort_key: Optional[str] = None,
+        reverse: bool = False,
+        available_only: bool = True,
+        after: Optional[str] = None,
+        include_total: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """컬렉션의 제품 목록 조회"""
+        # 컬렉션 존재 확인
+        collection = db.query(Collection).filter(Collection.handle == handle).first()
+        if not collection:
+            return None
+
+        # 제품 쿼리 구성
+        query = db.query(Product).join(Product.collections).filter(Collection.id == collection.id)
+
+        if available_only:
+            query = query.filter(Product.available_for_sale == True)
+
+        # 정렬 적용
+        if sort_key == "title":
+            order_column = Product.title
+        elif sort_key == "price":
+            # 비정규화된 최저가 컬럼으로 정렬 (인덱스 사용)
+            order_column = Product.min_price
+        elif sort_key == "created_at":
+            order_column = Product.created_at
+        else:
+            # 기본 정렬: 생성일 역순
+            sort_key = "created_at"
+            order_column = Product.created_at
+            reverse = True
+
+        # 총 개수 계산 (선택)
+        total = query.count() if include_total else None
+
+        # 페이지네이션 적용
+        products, has_next_page = paginate(
+            query,
+            order_column,
+            Product.id,
+            sort_key=sort_key,
+            reverse=reverse,
+            page=page,
+            per_page=per_page,
+            after=after
+        )
+
+        next_cursor = None
+        if has_next_page:
+            last = products[-1]
+            next_cursor = encode_cursor(sort_key, getattr(last, order_column.key), last.id)
+
+        # 총 페이지 수 계산
+        pages = math.ceil(total / per_page) if total is not None else None
+
+        # 제품 데이터 변환 (연관 데이터 일괄 로드)
+        products_data = product_loader.serialize(db, products)
+
+        return {
+            "products": products_data,
+            "collection": product_loader.serialize_collections(db, [collection])[0],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "has_next_page": has_next_page,
+            "has_previous_page": bool(after) or page > 1,
+            "next_cursor": next_cursor
+        }
+
+    def create_collection(self, db: Session, collection_data: CollectionCreate) -> Dict[str, Any]:
+        """새 컬렉션 생성"""
+        # 중복 handle 검사
+        existing_collection = db.query(Collection).filter(
+            Collection.handle == collection_data.handle
+        ).first()
+
+        if existing_collection:
+            raise ValueError("Collection with this handle already exists")
+
+        collection = Collection(
+            handle=collection_data.handle,
+            title=collection_data.title,
+            description=collection_data.description,
+            published=collection_data.published
+        )
+
+        db.add(collection)
+        db.commit()
+        db.refresh(collection)
+
+        cache.invalidate([collection_cache_key(collection.handle)])
+
+        return collection.to_dict(product_count=0)
+
+    def update_collection(self, db: Session, handle: str, collection_data: CollectionCreate) -> Optional[Dict[str, Any]]:
+        """컬렉션 정보 업데이트"""
+        collection = db.query(Collection).filter(Collection.handle == handle).first()
+
+        if not collection:
+            return None
+
+        collection.title = collection_data.title
+        collection.description = collection_data.description
+        collection.published = collection_data.published
+
+        db.commit()
+        db.refresh(collection)
+
+        # 제품 문서에도 컬렉션 정보가 포함되므로 함께 무효화
+        invalidate_collections(db, [collection.id])
+
+        return product_loader.serialize_collections(db, [collection])[0]
+
+    def delete_collection(self, db: Session, handle: str) -> bool:
+        """컬렉션 삭제"""
+        collection = db.query(Collection).filter(Collection.handle == handle).first()
+
+        if not collection:
+            return False
+
+        cache_keys = collection_cache_keys(db, [collection.id])
+
+        db.delete(collection)
+        db.commit()
+
+        cache.invalidate(cache_keys)
+
+        return True
+
+    def _get_collection_and_product(self, db: Session, handle: str, product_id: int):
+        collection = db.query(Collection).filter(Collection.handle == handle).first()
+        if not collection:
+            raise ValueError("Collection not found")
+
+        product = db.query(Product).filter(Product.id == product_id).first()
+        if not product:
+            raise ValueError("Product not found")
+
+        return collection, product
+
+    def add_product_to_collection(self, db: Session, handle: str, product_id: int) -> bool:
+        """컬렉션에 제품 추가"""
+        collection, product = self._get_collection_and_product(db, handle, product_id)
+
+        # 이미 컬렉션에 있는지 확인
+        if product in collection.products:
+            raise ValueError("Product already in collection")
+
+        collection.products.append(product)
+        db.commit()
+
+        # 컬렉션 제품 수가 바뀌므로 컬렉션에 속한 제품 문서까지 무효화
+        invalidate_collections(db, [collection.id])
+
+        return True
+
+    def remove_product_from_collection(self, db: Session, handle: str, product_id: int) -> bool:
+        """컬렉션에서 제품 제거"""
+        collection, product = self._get_collection_and_product(db, handle, product_id)
+
+        # 컬렉션에 있는지 확인
+        if product not in collection.products:
+            raise ValueError("Product not in collection")
+
+        collection.products.remove(product)
+        db.commit()
+
+        # 컬렉션 제품 수가 바뀌므로 컬렉션에 속한 제품 문서까지 무효화
+        invalidate_collections(db, [collection.id])
+        invalidate_products([product.handle])
+
+        return True
@@ -0,0 +1,218 @@
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session, selectinload
+from models.order import Order, OrderStatus
+from models.fulfillment import FulfillmentLease
+from database.upsert import upsert
+from services.order_service import OrderService
+from core.config import settings
+from core.ids import new_id
+from core.metrics import registry
+from typing import Any, Dict, List, Optional
+import datetime
+
+# 피킹 작업 큐 (확정된 주문)
+#
+# 1. claim: 가져가지 않은(fulfillment_claimed = false) 확정 주문을 created_at 순으로 SELECT ... FOR UPDATE
+#    SKIP LOCKED 해 다른 피커가 잠근 행은 건너뛰고, 주문에 가져감 표시를 하고 fulfillment_leases에
+#    임대(lease_id, 만료 시각)를 기록한 뒤 바로 커밋한다. (status, fulfillment_claimed, created_at)
+#    인덱스 앞부분만 읽으므로 큐 길이나 임대 중인 주문 수와 관계없이 가져갈 주문 수만큼만 훑는다.
+# 2. extend: 피킹이 오래 걸리면 만료 전에 임대를 연장한다.
+# 3. ack: 임대 행을 잠가 유효한지 확인하고, 같은 트랜잭션에서 OrderService 일괄 상태 변경으로
+#    processing/shipped로 바꾼 뒤 임대를 지운다. 확인 뒤 임대가 만료되어 다른 피커가 가져갈 틈이 없다.
+# 4. release: 처리하지 못한 주문의 임대를 지우고 가져감 표시를 풀어 바로 다시 큐에 넣는다.
+# 피커가 사라지면 임대가 만료되고, 다음 claim이 만료된 임대를 조금씩 지우며 주문을 큐로 되돌린다.
+
+ACK_STATUSES = (OrderStatus.PROCESSING, OrderStatus.SHIPPED)
+
+queue_orders = registry.counter(
+    "fulfillment_queue_orders",
+    "Orders claimed, acknowledged, released or requeued after lease expiry through the fulfillment queue",
+    ["action"]
+)
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow().replace(microsecond=0)
+
+class FulfillmentQueue:
+    """확정된 주문을 피커에게 나눠 주는 작업 큐"""
+
+    def __init__(self, lease: int = 300, max_claim: int = 100, requeue_batch_size: int = 500):
+        self.lease = lease
+        self.max_claim = max_claim
+        self.requeue_batch_size = requeue_batch_size
+        self.orders = OrderService()
+
+    def _set_claimed(self, db: Session, order_ids: List[str], claimed: bool):
+        db.query(Order)\
+            .filter(Order.id.in_(order_ids))\
+            .update({Order.fulfillment_claimed: claimed}, synchronize_session=False)
+
+    def claim(self, db: Session, picker_id: str, limit: int = 10) -> Dict[str, Any]:
+        """다음 확정 주문을 최대 limit개 가져와 임대 (다른 피커가 잠그거나 가져간 주문은 건너뜀)"""
+        self.requeue_expired(db)
+
+        now = _utcnow()
+        limit = min(max(limit, 1), self.max_claim)
+        # 잠금 읽기는 최신 커밋 버전으로 조건을 확인하므로 방금 다른 피커가 가져간 주문은 걸러짐
+        order_ids = [
+            order_id for (order_id,) in db.query(Order.id)
+            .filter(Order.status == OrderStatus.CONFIRMED, Order.fulfillment_claimed == False)  # noqa: E712
+            .order_by(Order.created_at, Order.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        ]
+        if not order_ids:
+            db.rollback()
+            return {'lease_id': None, 'picker_id': picker_id, 'expires_at': None, 'orders': []}
+
+        lease_id = new_id()
+        expires_at = now + datetime.timedelta(seconds=self.lease)
+        self._set_claimed(db, order_ids, True)
+        table = FulfillmentLease.__table__
+        # 정리되기 전에 남은 이전 임대는 새 임대로 덮어씀
+        upsert(
+            db,
+            table,
+            [
+                {
+                    'order_id': order_id,
+                    'lease_token': lease_id,
+                    'picker_id': picker_id,
+                    'claimed_at': now,
+                    'expires_at': expires_at
+                }
+                for order_id in order_ids
+            ],
+            ['order_id'],
+            lambda inserted: {
+                'lease_token': inserted.lease_token,
+                'picker_id': inserted.picker_id,
+                'claimed_at': inserted.claimed_at,
+                'expires_at': inserted.expires_at
+            }
+        )
+        db.commit()
+        queue_orders.inc(len(order_ids), action="claimed")
+
+        orders = db.query(Order)\
+            .options(selectinload(Order.items))\
+            .filter(Order.id.in_(order_ids))\
+            .order_by(Order.created_at, Order.id)\
+            .all()
+        return {
+            'lease_id': lease_id,
+            'picker_id': picker_id,
+            'expires_at': expires_at.isoformat(),
+            'orders': [order.to_dict() for order in orders]
+        }
+
+    def _held(self, db: Session, lease_id: str, lock: bool = False) -> Dict[str, datetime.datetime]:
+        """임대 중인 주문 ID → 만료 시각"""
+        query = db.query(FulfillmentLease.order_id, FulfillmentLease.expires_at)\
+            .filter(FulfillmentLease.lease_token == lease_id)\
+            .order_by(FulfillmentLease.order_id)
+        if lock:
+            query = query.with_for_update()
+        return {order_id: expires_at for order_id, expires_at in query.all()}
+
+    def extend(self, db: Session, lease_id: str) -> Optional[Dict[str, Any]]:
+        """만료되지 않은 임대 연장 (유효한 임대가 없으면 None)"""
+        now = _utcnow()
+        expires_at = now + datetime.timedelta(seconds=self.lease)
+        table = FulfillmentLease.__table__
+        extended = db.execute(
+            update(table)
+            .where(table.c.lease_token == lease_id, table.c.expires_at > now)
+            .values(expires_at=expires_at)
+        ).rowcount
+        if extended == 0:
+            db.rollback()
+            return None
+        db.commit()
+
+        order_ids = sorted(
+            order_id for order_id, held_until in self._held(db, lease_id).items() if held_until == expires_at
+        )
+        return {'lease_id': lease_id, 'expires_at': expires_at.isoformat(), 'order_ids': order_ids}
+
+    def ack(
+        self,
+        db: Session,
+        lease_id: str,
+        status: OrderStatus,
+        order_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """임대한 주문(order_ids가 없으면 전부)의 상태를 바꾸고 임대 해제
+
+        임대가 만료됐거나 이 임대가 아닌 주문은 바꾸지 않고 lease_expired/not_leased로 돌려준다.
+        """
+        if status not in ACK_STATUSES:
+            raise ValueError(f"Fulfillment can only move orders to {', '.join(s.value for s in ACK_STATUSES)}")
+
+        now = _utcnow()
+        table = FulfillmentLease.__table__
+        try:
+            # 임대 행을 잠가 확인부터 상태 변경/임대 삭제까지 한 트랜잭션에서 처리
+            # (그사이 만료되어 큐로 돌아가거나 다른 피커가 가져갈 수 없음)
+            held = self._held(db, lease_id, lock=True)
+            targets = list(dict.fromkeys(order_ids)) if order_ids else sorted(held)
+            active = [order_id for order_id in targets if order_id in held and held[order_id] > now]
+
+            if active:
+                result = self.orders.bulk_update_status(db, [(status, active, [])], commit=False)
+                db.execute(delete(table).where(table.c.lease_token == lease_id, table.c.order_id.in_(active)))
+                self._set_claimed(db, active, False)
+            else:
+                result = {'updated': 0, 'unchanged': 0, 'rejected': 0, 'not_found': 0, 'results': []}
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        queue_orders.inc(result['updated'], action="acknowledged")
+
+        for order_id in targets:
+            if order_id in active:
+                continue
+            result['rejected'] += 1
+            result['results'].append({
+                'order_id': order_id,
+                'order_number': None,
+                'result': 'lease_expired' if order_id in held else 'not_leased',
+                'status': None
+            })
+        return result
+
+    def release(self, db: Session, lease_id: str, order_ids: Optional[List[str]] = None) -> int:
+        """임대 해제 (주문을 바로 다시 큐에 넣음), 해제한 주문 수 반환"""
+        held = self._held(db, lease_id, lock=True)
+        released = [order_id for order_id in held if not order_ids or order_id in order_ids]
+        if released:
+            table = FulfillmentLease.__table__
+            db.execute(delete(table).where(table.c.lease_token == lease_id, table.c.order_id.in_(released)))
+            self._set_claimed(db, released, False)
+        db.commit()
+        queue_orders.inc(len(released), action="released")
+        return len(released)
+
+    def requeue_expired(self, db: Session) -> int:
+        """만료된 임대를 한 배치 지우고 주문을 큐로 되돌림 (다른 요청이 잠근 임대는 건너뜀)"""
+        order_ids = [
+            order_id for (order_id,) in db.query(FulfillmentLease.order_id)
+            .filter(FulfillmentLease.expires_at <= _utcnow())
+            .order_by(FulfillmentLease.expires_at)
+            .limit(self.requeue_batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        ]
+        if not order_ids:
+            db.rollback()
+            return 0
+        table = FulfillmentLease.__table__
+        db.execute(delete(table).where(table.c.order_id.in_(order_ids)))
+        self._set_claimed(db, order_ids, False)
+        db.commit()
+        queue_orders.inc(len(order_ids), action="requeued")
+        return len(order_ids)
+
+fulfillment_queue = FulfillmentQueue(settings.FULFILLMENT_LEASE_SECONDS, settings.FULFILLMENT_MAX_CLAIM)
@@ -0,0 +1,433 @@
+from fastapi import HTTPException
+from sqlalchemy import delete, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from models.idempotency import IdempotencyKey, IdempotencyStatus
+from core.config import settings
+from core.metrics import registry
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import contextvars
+import datetime
+import hashlib
+import itertools
+import json
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Idempotency-Key 처리 (POST /orders, PUT /orders/{id}/payment)
+#
+# 1. (scope, key) 유니크 인덱스로 기존 기록을 찾는다. 없으면 in_progress 행을 넣어 키를 선점하고 요청을 실행한다.
+# 2. 응답(5xx 제외)을 저장하고 completed로 바꾼다. 5xx/예외면 키를 지워 클라이언트가 다시 시도할 수 있게 한다.
+# 3. 같은 키의 재시도는
+#    - completed: 저장된 응답을 그대로 돌려준다 (장바구니/재고를 다시 건드리지 않음)
+#    - in_progress: 원래 요청이 끝날 때까지 기다린다 (같은 프로세스면 이벤트, 다른 워커면 짧은 폴링)
+#    - 요청 내용이 다르면 422
+# 4. 진행 중인 키에는 임대(locked_until)를 두고 요청을 처리하는 동안 lease/3마다 연장한다.
+#    워커가 죽거나 종료되어 complete/release 없이 임대가 만료되면 같은 키의 재시도가 키를 이어받아 실행한다.
+#    선점/이어받을 때마다 임대 토큰을 새로 발급하고 연장/응답 저장/해제는 토큰이 일치할 때만 한다.
+# 5. 주문 생성/결제 변경은 같은 트랜잭션 안에서 키에 주문 ID(resource_id)를 기록한다 (record_resource).
+#    커밋 뒤 응답을 저장하지 못하고 실패/종료해도 이어받은 재시도는 다시 실행하지 않고 그 주문으로 응답을 만든다.
+#    이미 다른 시도가 키를 이어받았으면 기록이 실패해 트랜잭션이 커밋되지 않는다.
+# 키는 IDEMPOTENCY_KEY_TTL 뒤에 만료되며, 만료된 키는 새 키를 선점할 때 조금씩 정리한다.
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+idempotent_requests = registry.counter(
+    "idempotent_requests",
+    "Requests carrying an Idempotency-Key, by outcome",
+    ["scope", "result"]
+)
+
+# 현재 요청이 실행 중인 키 (scope, key, 임대 토큰)
+_current_claim: contextvars.ContextVar[Optional[Tuple[str, str, str]]] = contextvars.ContextVar(
+    "idempotency_claim", default=None
+)
+
+class LeaseLost(Exception):
+    """다른 시도가 키를 이어받아 이 시도의 결과를 기록할 수 없음"""
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow().replace(microsecond=0)
+
+def record_resource(db: Session, resource_id: str):
+    """업무 트랜잭션 안에서 현재 요청의 키에 리소스 ID 기록 (Idempotency-Key 없는 요청이면 무시)
+
+    임대를 다른 시도가 이어받았으면 LeaseLost를 올려 트랜잭션이 커밋되지 않게 한다.
+    """
+    claim = _current_claim.get()
+    if claim is None:
+        return
+    scope, key, token = claim
+    recorded = db.query(IdempotencyKey).filter(
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.idempotency_key == key,
+        IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS,
+        IdempotencyKey.lease_token == token
+    ).update({IdempotencyKey.resource_id: resource_id}, synchronize_session=False)
+    if recorded != 1:
+        raise LeaseLost(f"Idempotency key {scope}/{key} was taken over by another request")
+
+def request_fingerprint(*parts: Any) -> str:
+    """요청 내용 해시 (경로 매개변수와 요청 본문 등)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if hasattr(part, "model_dump"):
+            part = part.model_dump(mode="json")
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class IdempotencyStore:
+    """Idempotency-Key 기록 저장소 (요청 세션과 별개의 짧은 트랜잭션 사용)"""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        ttl: int = 24 * 3600,
+        wait_timeout: float = 10.0,
+        lease: int = 30,
+        poll_interval: float = 0.1,
+        purge_every: int = 100,
+        purge_batch_size: int = 500
+    ):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.purge_every = purge_every
+        self.purge_batch_size = purge_batch_size
+        self._claims = itertools.count(1)
+        # 같은 프로세스에서 진행 중인 키 (같은 이벤트 루프의 재시도는 폴링하지 않고 기다림)
+        self._inflight: Dict[Tuple[str, str], Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from database.connection import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def _find(self, db: Session, scope: str, key: str) -> Optional[IdempotencyKey]:
+        return db.query(IdempotencyKey).filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.idempotency_key == key
+        ).first()
+
+    def lookup(self, scope: str, key: str) -> Optional[IdempotencyKey]:
+        """기록 조회 (만료된 기록은 없는 것으로 봄)"""
+        db = self._session()
+        try:
+            record = self._find(db, scope, key)
+            if record is None or record.expires_at <= _utcnow():
+                return None
+            db.expunge(record)
+            return record
+        finally:
+            db.close()
+
+    def claim(self, scope: str, key: str, fingerprint: str) -> Tuple[Optional[str], Optional[IdempotencyKey]]:
+        """키 선점 - (임대 토큰, 기록)
+
+        - 새로 선점: (토큰, None)
+        - 임대가 만료된 같은 요청의 키를 이어받음 (처리하던 워커가 사라짐): (토큰, 이어받은 기록)
+        - 이미 유효한 기록이 있음: (None, 기록)
+        """
+        db = self._session()
+        try:
+            now = _utcnow()
+            locked_until = now + datetime.timedelta(seconds=self.lease)
+            token = str(uuid.uuid4())
+            record = self._find(db, scope, key)
+            if record is not None:
+                if record.expires_at > now:
+                    if self._lease_expired(record, now) and record.fingerprint == fingerprint:
+                        taken = self._take_over(db, record, now, locked_until, token)
+                        # 커밋으로 만료된 기록을 다시 조회
+                        record = self._find(db, scope, key)
+                        if record is None:
+                            # 그사이 실패한 요청이 키를 해제함
+                            return self.claim(scope, key, fingerprint)
+                        db.expunge(record)
+                        # 이어받지 못했으면 다른 재시도가 먼저 이어받았거나 그사이 완료됨
+                        return (token, record) if taken else (None, record)
+                    db.expunge(record)
+                    return None, record
+                # 만료된 키는 새 요청으로 취급
+                db.delete(record)
+                db.flush()
+
+            db.add(IdempotencyKey(
+                scope=scope,
+                idempotency_key=key,
+                fingerprint=fingerprint,
+                status=IdempotencyStatus.IN_PROGRESS,
+                expires_at=now + datetime.timedelta(seconds=self.ttl),
+                locked_until=locked_until,
+                lease_token=token
+            ))
+            try:
+                db.commit()
+            except IntegrityError:
+                # 동시에 같은 키로 들어온 요청이 먼저 선점함
+                db.rollback()
+                record = self._find(db, scope, key)
+                if record is None:
+                    return self.claim(scope, key, fingerprint)
+                db.expunge(record)
+                return None, record
+
+            if next(self._claims) % self.purge_every == 0:
+                self.purge_expired(db)
+            return token, None
+        finally:
+            db.close()
+
+    def _lease_expired(self, record: IdempotencyKey, now: datetime.datetime) -> bool:
+        # 임대 값이 없는 진행 중 기록은 임대 도입 전 기록이므로 만료된 것으로 봄
+        return record.status == IdempotencyStatus.IN_PROGRESS and (
+            record.locked_until is None or record.locked_until <= now
+        )
+
+    def _take_over(
+        self,
+        db: Session,
+        record: IdempotencyKey,
+        now: datetime.datetime,
+        locked_until: datetime.datetime,
+        token: str
+    ) -> bool:
+        """임대가 만료된 진행 중 기록을 조건부 UPDATE로 이어받음 (동시 재시도 중 한 요청만 성공)"""
+        taken = db.query(IdempotencyKey).filter(
+            IdempotencyKey.id == record.id,
+            IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS,
+            or_(IdempotencyKey.locked_until.is_(None), IdempotencyKey.locked_until <= now)
+        ).update({
+            IdempotencyKey.locked_until: locked_until,
+            IdempotencyKey.lease_token: token
+        }, synchronize_session=False)
+        db.commit()
+        if taken:
+            logger.warning(f"Took over idempotency key {record.scope}/{record.idempotency_key} after lease expired")
+        return taken == 1
+
+    def _owned(self, db: Session, scope: str, key: str, token: str):
+        """토큰으로 선점한 진행 중 기록 (다른 시도가 이어받았으면 비어 있음)"""
+        return db.query(IdempotencyKey).filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.idempotency_key == key,
+            IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS,
+            IdempotencyKey.lease_token == token
+        )
+
+    def extend(self, scope: str, key: str, token: str) -> bool:
+        """진행 중인 키의 임대 연장 (이미 완료됐거나 다른 요청이 이어받았으면 False)"""
+        db = self._session()
+        try:
+            extended = self._owned(db, scope, key, token).update({
+                IdempotencyKey.locked_until: _utcnow() + datetime.timedelta(seconds=self.lease)
+            }, synchronize_session=False)
+            db.commit()
+            return extended == 1
+        finally:
+            db.close()
+
+    async def _heartbeat(self, scope: str, key: str, token: str):
+        """요청을 처리하는 동안 임대를 주기적으로 연장 (다른 시도가 이어받았으면 중단)"""
+        interval = max(self.lease / 3, 0.1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await run_in_threadpool(self.extend, scope, key, token):
+                    logger.warning(f"Lost idempotency key lease {scope}/{key}")
+                    return
+            except Exception as e:
+                logger.error(f"Failed to extend idempotency key lease {scope}/{key}: {e}")
+
+    def complete(self, scope: str, key: str, token: str, status_code: int, body: bytes, media_type: Optional[str]):
+        """응답 저장 (다른 시도가 이어받았으면 그 시도의 응답을 덮어쓰지 않음)"""
+        db = self._session()
+        try:
+            self._owned(db, scope, key, token).update({
+                IdempotencyKey.status: IdempotencyStatus.COMPLETED,
+                IdempotencyKey.locked_until: None,
+                IdempotencyKey.response_status: status_code,
+                IdempotencyKey.response_body: body.decode("utf-8"),
+                IdempotencyKey.response_media_type: media_type
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, scope: str, key: str, token: str):
+        """진행 중인 키 해제 (요청이 실패해 다시 시도할 수 있게 함)
+
+        업무 트랜잭션이 커밋되어 리소스 ID가 기록된 키는 지우지 않고 임대만 풀어 재시도가 결과를 재생하게 한다.
+        """
+        db = self._session()
+        try:
+            deleted = self._owned(db, scope, key, token)\
+                .filter(IdempotencyKey.resource_id.is_(None))\
+                .delete(synchronize_session=False)
+            if not deleted:
+                self._owned(db, scope, key, token).update(
+                    {IdempotencyKey.locked_until: None}, synchronize_session=False
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    def purge_expired(self, db: Session) -> int:
+        """만료된 키를 한 배치 삭제"""
+        ids = [
+            record_id for (record_id,) in db.query(IdempotencyKey.id)
+            .filter(IdempotencyKey.expires_at <= _utcnow())
+            .order_by(IdempotencyKey.expires_at)
+            .limit(self.purge_batch_size)
+            .all()
+        ]
+        if ids:
+            table = IdempotencyKey.__table__
+            db.execute(delete(table).where(table.c.id.in_(ids)))
+            db.commit()
+        return len(ids)
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        fingerprint: str,
+        call: Callable[[], Awaitable[Response]],
+        replay: Optional[Callable[[str], Awaitable[Response]]] = None
+    ) -> Response:
+        """Idempotency-Key가 있으면 첫 응답을 저장/재사용하며 call 실행
+
+        replay - 이전 시도가 기록한 리소스 ID로 응답 생성 (커밋 후 응답 저장 전에 실패한 키를 이어받은 경우)
+        """
+        if not key:
+            return await call()
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters")
+
+        token, record = await run_in_threadpool(self.claim, scope, key, fingerprint)
+        if token is not None:
+            return await self._claimed(scope, key, token, record, call, replay)
+        return await self._duplicate(scope, key, fingerprint, record, call, replay)
+
+    async def _claimed(
+        self,
+        scope: str,
+        key: str,
+        token: str,
+        record: Optional[IdempotencyKey],
+        call: Callable[[], Awaitable[Response]],
+        replay: Optional[Callable[[str], Awaitable[Response]]]
+    ) -> Response:
+        """선점한 키 처리 - 이어받은 키에 리소스 ID가 있으면 다시 실행하지 않고 재생"""
+        if record is not None and record.resource_id is not None and replay is not None:
+            idempotent_requests.inc(scope=scope, result="recovered")
+            resource_id = record.resource_id
+            return await self._execute(scope, key, token, lambda: replay(resource_id))
+        idempotent_requests.inc(scope=scope, result="new")
+        return await self._execute(scope, key, token, call)
+
+    async def _execute(self, scope: str, key: str, token: str, call: Callable[[], Awaitable[Response]]) -> Response:
+        """선점한 키로 요청 실행 후 응답 저장 (5xx/예외면 키 해제)"""
+        done = asyncio.Event()
+        self._inflight[(scope, key)] = (asyncio.get_running_loop(), done)
+        heartbeat = asyncio.create_task(self._heartbeat(scope, key, token))
+        claim = _current_claim.set((scope, key, token))
+        stored = False
+        try:
+            try:
+                response = await call()
+            except HTTPException as e:
+                if e.status_code < 500:
+                    body = json.dumps(
+                        {"detail": e.detail}, ensure_ascii=False, separators=(",", ":")
+                    ).encode("utf-8")
+                    await run_in_threadpool(self.complete, scope, key, token, e.status_code, body, "application/json")
+                    stored = True
+                raise
+
+            if response.status_code < 500:
+                await run_in_threadpool(
+                    self.complete, scope, key, token, response.status_code, response.body, response.media_type
+                )
+                stored = True
+            return response
+        finally:
+            _current_claim.reset(claim)
+            heartbeat.cancel()
+            if not stored:
+                try:
+                    await run_in_threadpool(self.release, scope, key, token)
+                except Exception as e:
+                    logger.error(f"Failed to release idempotency key {scope}/{key}: {e}")
+            self._inflight.pop((scope, key), None)
+            done.set()
+
+    async def _duplicate(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        record: IdempotencyKey,
+        call: Callable[[], Awaitable[Response]],
+        replay: Optional[Callable[[str], Awaitable[Response]]]
+    ) -> Response:
+        """같은 키의 재시도 - 저장된 응답 재사용, 진행 중이면 대기"""
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+        while True:
+            if record.fingerprint != fingerprint:
+                idempotent_requests.inc(scope=scope, result="mismatch")
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+                )
+
+            if record.status == IdempotencyStatus.COMPLETED:
+                idempotent_requests.inc(scope=scope, result="waited" if waited else "replayed")
+                return Response(
+                    content=(record.response_body or "").encode("utf-8"),
+                    status_code=record.response_status,
+                    media_type=record.response_media_type,
+                    headers={REPLAYED_HEADER: "true"}
+                )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                idempotent_requests.inc(scope=scope, result="in_progress")
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress"
+                )
+
+            waited = True
+            inflight = self._inflight.get((scope, key))
+            if inflight is not None and inflight[0] is asyncio.get_running_loop():
+                try:
+                    await asyncio.wait_for(inflight[1].wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(min(self.poll_interval, remaining))
+
+            token, record = await run_in_threadpool(self.claim, scope, key, fingerprint)
+            if token is not None:
+                # 원래 요청이 실패해 키가 풀렸거나 임대가 만료됐으면 이 요청이 이어서 처리
+                return await self._claimed(scope, key, token, record, call, replay)
+
+idempotency_store = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_KEY_TTL,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+    lease=settings.IDEMPOTENCY_LEASE_SECONDS
+)
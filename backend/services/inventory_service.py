@@ -0,0 +1,313 @@
+from sqlalchemy import case, delete, func, update
+from sqlalchemy.orm import Session
+from models.product import ProductVariant
+from models.inventory import InventoryReservation, InventoryShard
+from database.upsert import upsert
+from services.inventory_shards import inventory_shards
+from core.config import settings
+from typing import Dict, Iterable, Optional, Tuple
+import datetime
+
+# 재고 증감과 장바구니 재고 보류
+#
+# 재고는 읽어서 확인한 뒤 ORM으로 빼지 않고, 조건부 UPDATE 한 문장으로 처리한다.
+#   UPDATE product_variants SET inventory_quantity = inventory_quantity - CASE id WHEN .. END
+#   WHERE id IN (..) AND inventory_quantity - reserved_quantity + (내 보류) >= CASE id WHEN .. END
+# 영향받은 행 수가 변형 상품 수보다 적으면 재고가 부족한 상품이 있는 것이므로 트랜잭션을 되돌린다.
+# 행 잠금은 UPDATE부터 커밋까지만 유지되고, IN 목록은 PK 순서로 잠가 동시 주문 간 교착을 피한다.
+#
+# 보류: 장바구니에 담으면 INVENTORY_HOLD_TTL 동안 수량을 확보한다.
+# - inventory_reservations: 장바구니/변형 상품별 보류 수량과 만료 시각
+# - product_variants.reserved_quantity: 변형 상품별 보류 합계 (보류 테이블을 집계하지 않고 바로 비교)
+# - 만료된 보류는 해당 변형 상품을 다시 보류하거나 주문할 때 함께 정리한다 (다른 트랜잭션이 잡은 행은 건너뜀)
+# - 주문 시 내 보류만큼은 판매 가능 수량에 더해 차감하고 보류를 없앤다
+#
+# 분할 재고(services/inventory_shards.py) 변형 상품은 서브 카운터에서 차감/복원한다.
+# 보류 합계를 변형 상품 행에 쓰면 다시 한 행에 몰리므로, 분할 재고는 보류하지 않고 재고 합계만 확인한다.
+
+class InsufficientInventory(ValueError):
+    """조건부 차감/보류 실패 (재고 부족)"""
+
+def aggregate_quantities(items: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    """(변형 상품 ID, 수량) 목록을 변형 상품별 합계로 변환"""
+    quantities: Dict[int, int] = {}
+    for variant_id, quantity in items:
+        quantities[variant_id] = quantities.get(variant_id, 0) + quantity
+    return quantities
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow().replace(microsecond=0)
+
+class InventoryService:
+
+    def __init__(self, hold_ttl: int = 900, sweep_batch_size: int = 500):
+        self.hold_ttl = hold_ttl
+        self.sweep_batch_size = sweep_batch_size
+
+    @property
+    def holds_enabled(self) -> bool:
+        return self.hold_ttl > 0
+
+    def _adjust_reserved(self, db: Session, deltas: Dict[int, int]):
+        """reserved_quantity를 변형 상품별로 증감 (조건 없음 - 해제용)"""
+        deltas = {variant_id: delta for variant_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        table = ProductVariant.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id.in_(list(deltas)))
+            # 보류 합계 변경은 변형 상품 수정 시각을 바꾸지 않음
+            .values(
+                reserved_quantity=table.c.reserved_quantity + case(deltas, value=table.c.id),
+                updated_at=table.c.updated_at
+            )
+        )
+
+    def _cart_holds(self, db: Session, cart_id: str, variant_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        """장바구니의 보류 수량 (행을 잠가 동시 정리와 겹치지 않게 함)"""
+        query = db.query(InventoryReservation.variant_id, InventoryReservation.quantity)\
+            .filter(InventoryReservation.cart_id == cart_id)
+        if variant_ids is not None:
+            query = query.filter(InventoryReservation.variant_id.in_(list(variant_ids)))
+        return dict(query.order_by(InventoryReservation.variant_id).with_for_update().all())
+
+    def sweep_expired(self, db: Session, variant_ids: Optional[Iterable[int]] = None) -> int:
+        """만료된 보류를 정리하고 정리한 수 반환 (variant_ids가 주어지면 해당 변형 상품만)"""
+        if not self.holds_enabled:
+            return 0
+
+        query = db.query(
+            InventoryReservation.id,
+            InventoryReservation.variant_id,
+            InventoryReservation.quantity
+        ).filter(InventoryReservation.expires_at < _utcnow())
+        if variant_ids is not None:
+            query = query.filter(InventoryReservation.variant_id.in_(list(variant_ids)))
+        rows = query.order_by(InventoryReservation.id)\
+            .limit(self.sweep_batch_size)\
+            .with_for_update(skip_locked=True)\
+            .all()
+        if not rows:
+            return 0
+
+        table = InventoryReservation.__table__
+        db.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+        self._adjust_reserved(db, {
+            variant_id: -quantity
+            for variant_id, quantity in aggregate_quantities((row.variant_id, row.quantity) for row in rows).items()
+        })
+        return len(rows)
+
+    def reserve(self, db: Session, cart_id: str, quantities: Dict[int, int]):
+        """장바구니의 변형 상품별 보류 수량을 quantities로 맞춤 (0이면 해제, 커밋은 호출자가 한다)
+
+        늘어나는 수량은 판매 가능 수량(재고 - 보류 합계) 안에서만 보류하고, 부족하면 롤백 후 InsufficientInventory.
+        보류한 변형 상품은 만료 시각을 새로 연장한다.
+        """
+        if not quantities or not self.holds_enabled:
+            return
+
+        self.sweep_expired(db, quantities)
+        held = self._cart_holds(db, cart_id, quantities)
+
+        increases = {}
+        decreases = {}
+        for variant_id, quantity in quantities.items():
+            delta = max(quantity, 0) - held.get(variant_id, 0)
+            if delta > 0:
+                increases[variant_id] = delta
+            elif delta < 0:
+                decreases[variant_id] = delta
+
+        # 분할 재고는 보류하지 않고 재고 합계만 확인
+        sharded = inventory_shards.shard_counts(db, increases) if increases else {}
+        if sharded:
+            totals = dict(
+                db.query(InventoryShard.variant_id, func.sum(InventoryShard.quantity))
+                .filter(InventoryShard.variant_id.in_(list(sharded)))
+                .group_by(InventoryShard.variant_id)
+                .all()
+            )
+            for variant_id in sorted(sharded):
+                if (totals.get(variant_id) or 0) < quantities[variant_id]:
+                    db.rollback()
+                    raise InsufficientInventory(f"Insufficient inventory for variant {variant_id}")
+            increases = {variant_id: delta for variant_id, delta in increases.items() if variant_id not in sharded}
+
+        if increases:
+            table = ProductVariant.__table__
+            amount = case(increases, value=table.c.id)
+            result = db.execute(
+                update(table)
+                .where(
+                    table.c.id.in_(list(increases)),
+                    table.c.inventory_quantity - table.c.reserved_quantity >= amount
+                )
+                .values(reserved_quantity=table.c.reserved_quantity + amount)
+            )
+            if result.rowcount != len(increases):
+                db.rollback()
+                variant_id = self._short_variant_id(db, increases, held)
+                raise InsufficientInventory(f"Insufficient inventory for variant {variant_id}")
+
+        self._adjust_reserved(db, decreases)
+
+        table = InventoryReservation.__table__
+        released = [variant_id for variant_id, quantity in quantities.items() if quantity <= 0]
+        if released:
+            db.execute(delete(table).where(table.c.cart_id == cart_id, table.c.variant_id.in_(released)))
+
+        expires_at = _utcnow() + datetime.timedelta(seconds=self.hold_ttl)
+        upsert(
+            db,
+            table,
+            [
+                {'cart_id': cart_id, 'variant_id': variant_id, 'quantity': quantity, 'expires_at': expires_at}
+                for variant_id, quantity in quantities.items() if quantity > 0 and variant_id not in sharded
+            ],
+            ['cart_id', 'variant_id'],
+            lambda inserted: {'quantity': inserted.quantity, 'expires_at': inserted.expires_at}
+        )
+
+    def release_cart(self, db: Session, cart_id: str, variant_ids: Optional[Iterable[int]] = None):
+        """장바구니의 보류 해제 (variant_ids가 주어지면 해당 변형 상품만, 커밋은 호출자가 한다)"""
+        if not self.holds_enabled:
+            return
+
+        held = self._cart_holds(db, cart_id, variant_ids)
+        if not held:
+            return
+
+        table = InventoryReservation.__table__
+        db.execute(delete(table).where(table.c.cart_id == cart_id, table.c.variant_id.in_(list(held))))
+        self._adjust_reserved(db, {variant_id: -quantity for variant_id, quantity in held.items()})
+
+    def release_carts(self, db: Session, cart_ids: Iterable[str]) -> int:
+        """여러 장바구니의 보류를 모두 해제하고 해제한 보류 수 반환 (장바구니 정리용, 커밋은 호출자가 한다)"""
+        cart_ids = list(cart_ids)
+        if not cart_ids:
+            return 0
+
+        rows = db.query(
+            InventoryReservation.id,
+            InventoryReservation.variant_id,
+            InventoryReservation.quantity
+        ).filter(InventoryReservation.cart_id.in_(cart_ids))\
+            .order_by(InventoryReservation.id)\
+            .with_for_update()\
+            .all()
+        if not rows:
+            return 0
+
+        table = InventoryReservation.__table__
+        db.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+        self._adjust_reserved(db, {
+            variant_id: -quantity
+            for variant_id, quantity in aggregate_quantities((row.variant_id, row.quantity) for row in rows).items()
+        })
+        return len(rows)
+
+    def decrement(self, db: Session, quantities: Dict[int, int], cart_id: Optional[str] = None):
+        """재고를 한 번에 조건부 차감 (하나라도 부족하면 롤백 후 InsufficientInventory)
+
+        cart_id가 주어지면 그 장바구니의 보류를 차감에 사용하고 남은 보류는 모두 해제한다.
+        호출자의 트랜잭션 안에서 실행하며, 성공 시 커밋은 호출자가 한다.
+        """
+        if not quantities:
+            return
+
+        held: Dict[int, int] = {}
+        if cart_id is not None and self.holds_enabled:
+            self.sweep_expired(db, quantities)
+            held = self._cart_holds(db, cart_id)
+
+        sharded = inventory_shards.shard_counts(db, quantities)
+        plain = {variant_id: quantity for variant_id, quantity in quantities.items() if variant_id not in sharded}
+
+        # 이번 주문에 쓰이는 내 보류 수량 (주문 수량보다 많이 보류한 경우에도 주문 수량까지만)
+        used = {
+            variant_id: min(held[variant_id], quantity)
+            for variant_id, quantity in plain.items() if held.get(variant_id)
+        }
+        if plain:
+            table = ProductVariant.__table__
+            amount = case(plain, value=table.c.id)
+            own = case(used, value=table.c.id, else_=0) if used else 0
+            result = db.execute(
+                update(table)
+                .where(
+                    table.c.id.in_(list(plain)),
+                    table.c.inventory_quantity - table.c.reserved_quantity + own >= amount
+                )
+                .values(
+                    inventory_quantity=table.c.inventory_quantity - amount,
+                    reserved_quantity=table.c.reserved_quantity - own
+                )
+            )
+            if result.rowcount != len(plain):
+                db.rollback()
+                raise InsufficientInventory(self._shortage_message(db, plain, held))
+
+        if sharded:
+            short_variant_id = inventory_shards.decrement(
+                db, {variant_id: quantities[variant_id] for variant_id in sharded}
+            )
+            if short_variant_id is not None:
+                db.rollback()
+                raise InsufficientInventory(self._shortage_message(db, {short_variant_id: quantities[short_variant_id]}, {}))
+
+        if held:
+            reservations = InventoryReservation.__table__
+            db.execute(delete(reservations).where(reservations.c.cart_id == cart_id))
+            # 주문에 쓰이지 않은 보류(주문 수량 초과분, 주문에 없는 상품) 해제
+            self._adjust_reserved(db, {
+                variant_id: -(quantity - used.get(variant_id, 0))
+                for variant_id, quantity in held.items()
+            })
+
+    def restock(self, db: Session, quantities: Dict[int, int]):
+        """재고를 한 번에 복원 (커밋은 호출자가 한다)"""
+        if not quantities:
+            return
+
+        sharded = inventory_shards.shard_counts(db, quantities)
+        if sharded:
+            inventory_shards.restock(db, {variant_id: quantities[variant_id] for variant_id in sharded}, sharded)
+            quantities = {variant_id: quantity for variant_id, quantity in quantities.items() if variant_id not in sharded}
+            if not quantities:
+                return
+
+        table = ProductVariant.__table__
+        amount = case(quantities, value=table.c.id)
+        db.execute(
+            update(table)
+            .where(table.c.id.in_(list(quantities)))
+            .values(inventory_quantity=table.c.inventory_quantity + amount)
+        )
+
+    def available_quantity(self, variant: ProductVariant) -> int:
+        """판매 가능 수량 (재고 - 보류 합계)"""
+        return (variant.total_inventory or 0) - (variant.reserved_quantity or 0)
+
+    def _short_variant_id(self, db: Session, quantities: Dict[int, int], held: Dict[int, int]) -> int:
+        """롤백 후 판매 가능 수량이 부족한 변형 상품 ID (못 찾으면 첫 번째 ID)"""
+        variants = db.query(ProductVariant).filter(ProductVariant.id.in_(list(quantities))).all()
+        for variant in sorted(variants, key=lambda variant: variant.id):
+            if self.available_quantity(variant) + held.get(variant.id, 0) < quantities[variant.id]:
+                return variant.id
+        return min(quantities)
+
+    def _shortage_message(self, db: Session, quantities: Dict[int, int], held: Dict[int, int]) -> str:
+        """롤백 후 재고가 부족한 변형 상품을 찾아 오류 메시지 생성"""
+        variants = db.query(ProductVariant).filter(ProductVariant.id.in_(list(quantities))).all()
+        for variant in sorted(variants, key=lambda variant: variant.id):
+            if self.available_quantity(variant) + held.get(variant.id, 0) < quantities[variant.id]:
+                return f"Insufficient inventory for product {variant.title}"
+        missing = sorted(set(quantities) - {variant.id for variant in variants})
+        if missing:
+            return f"Product variant {missing[0]} not found"
+        # 조회 시점에는 재고가 다시 생긴 경우 (동시 취소 등)
+        return "Insufficient inventory"
+
+inventory_service = InventoryService(settings.INVENTORY_HOLD_TTL, settings.INVENTORY_SWEEP_BATCH_SIZE)
@@ -0,0 +1,241 @@
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from models.product import ProductVariant
+from models.inventory import InventoryShard
+from core.config import settings
+from core.metrics import registry
+from typing import Callable, Dict, Iterable, List, Optional
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 분할 재고 (핫 SKU용 서브 카운터)
+#
+# inventory_shard_count > 0인 변형 상품은 재고를 inventory_shards의 N개 행에 나눠 두고,
+# 주문은 재고가 있는 서브 카운터 하나를 무작위로 골라 조건부 UPDATE로 차감한다.
+# 동시 주문이 서로 다른 행을 잠그므로 한 변형 상품 행에서 직렬화되지 않는다.
+# 고른 행이 그사이 부족해졌거나 어느 한 행으로도 모자라면 해당 변형 상품의 서브 카운터를
+# 모두 (shard 순서로) 잠그고 나눠서 차감한다.
+#
+# 재고 합계는 서브 카운터의 합이다 (ProductVariant.total_inventory).
+# product_variants.inventory_quantity는 재분배 때 합계로 맞춰 두는 참고값이며 차감 시에는 건드리지 않는다.
+# 차감이 한쪽에 몰려 비어 가는 서브 카운터는 백그라운드 재분배(rebalance)가 고르게 다시 나눈다.
+
+rebalanced_variants = registry.counter(
+    "inventory_shard_rebalances",
+    "Sharded variants whose sub-counters were redistributed"
+)
+fallback_decrements = registry.counter(
+    "inventory_shard_fallbacks",
+    "Sharded decrements that had to lock every sub-counter of a variant"
+)
+rebalance_seconds = registry.histogram(
+    "inventory_shard_rebalance_seconds",
+    "Time spent in one inventory shard rebalance pass"
+)
+
+def split_evenly(total: int, count: int) -> List[int]:
+    """total을 count개로 최대한 고르게 나눔 (앞쪽 서브 카운터가 1개씩 더 가짐)"""
+    base, extra = divmod(max(total, 0), count)
+    return [base + (1 if shard < extra else 0) for shard in range(count)]
+
+class InventoryShards:
+    """분할 재고 설정/차감/복원/재분배"""
+
+    def __init__(self, max_shards: int = 64, batch_size: int = 100):
+        self.max_shards = max_shards
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def shard_counts(self, db: Session, variant_ids: Iterable[int]) -> Dict[int, int]:
+        """분할 재고인 변형 상품의 서브 카운터 수 (분할하지 않은 변형 상품은 제외)"""
+        variant_ids = list(variant_ids)
+        if not variant_ids:
+            return {}
+        return dict(
+            db.query(ProductVariant.id, ProductVariant.inventory_shard_count)
+            .filter(ProductVariant.id.in_(variant_ids), ProductVariant.inventory_shard_count > 0)
+            .all()
+        )
+
+    def _locked_shards(self, db: Session, variant_id: int) -> List[InventoryShard]:
+        return db.query(InventoryShard)\
+            .filter(InventoryShard.variant_id == variant_id)\
+            .order_by(InventoryShard.shard)\
+            .populate_existing()\
+            .with_for_update()\
+            .all()
+
+    def configure(self, db: Session, variant_id: int, shard_count: int) -> bool:
+        """변형 상품의 서브 카운터 수 변경 (0이면 분할 해제, 커밋은 호출자가 한다)
+
+        현재 재고 합계를 새 서브 카운터들에 고르게 나눈다. 변형 상품이 없으면 False.
+        """
+        if shard_count < 0 or shard_count > self.max_shards:
+            raise ValueError(f"Shard count must be between 0 and {self.max_shards}")
+
+        variant = db.query(ProductVariant)\
+            .filter(ProductVariant.id == variant_id)\
+            .with_for_update()\
+            .first()
+        if not variant:
+            return False
+
+        total = variant.inventory_quantity or 0
+        if variant.inventory_shard_count:
+            total = sum(shard.quantity for shard in self._locked_shards(db, variant_id))
+            db.execute(delete(InventoryShard.__table__).where(InventoryShard.__table__.c.variant_id == variant_id))
+
+        if shard_count:
+            db.add_all([
+                InventoryShard(variant_id=variant_id, shard=shard, quantity=quantity)
+                for shard, quantity in enumerate(split_evenly(total, shard_count))
+            ])
+
+        variant.inventory_quantity = total
+        variant.inventory_shard_count = shard_count
+        db.flush()
+        db.expire(variant, ['shards'])
+        return True
+
+    def decrement(self, db: Session, quantities: Dict[int, int]) -> Optional[int]:
+        """분할 재고 차감 (커밋은 호출자가 한다)
+
+        부족한 변형 상품이 있으면 그 ID를 반환한다 (이미 차감한 행이 있으므로 호출자가 롤백해야 함).
+        """
+        table = InventoryShard.__table__
+        # 변형 상품 ID 순서로 처리해 동시 주문 간 교착을 피함
+        for variant_id in sorted(quantities):
+            amount = quantities[variant_id]
+
+            # 잠그지 않고 읽은 값으로 재고가 충분한 서브 카운터를 무작위로 고름
+            candidates = [
+                shard for shard, quantity in db.query(InventoryShard.shard, InventoryShard.quantity)
+                .filter(InventoryShard.variant_id == variant_id, InventoryShard.quantity >= amount)
+                .all()
+            ]
+            if candidates:
+                result = db.execute(
+                    update(table)
+                    .where(
+                        table.c.variant_id == variant_id,
+                        table.c.shard == random.choice(candidates),
+                        table.c.quantity >= amount
+                    )
+                    .values(quantity=table.c.quantity - amount)
+                )
+                if result.rowcount == 1:
+                    continue
+
+            # 한 서브 카운터로 부족하면 전체를 잠그고 나눠서 차감
+            fallback_decrements.inc()
+            shards = self._locked_shards(db, variant_id)
+            if sum(shard.quantity for shard in shards) < amount:
+                return variant_id
+
+            remaining = amount
+            for shard in sorted(shards, key=lambda shard: -shard.quantity):
+                taken = min(shard.quantity, remaining)
+                shard.quantity -= taken
+                remaining -= taken
+                if not remaining:
+                    break
+            db.flush()
+        return None
+
+    def restock(self, db: Session, quantities: Dict[int, int], shard_counts: Dict[int, int]):
+        """분할 재고 복원 - 무작위 서브 카운터 하나에 더함 (커밋은 호출자가 한다)"""
+        table = InventoryShard.__table__
+        for variant_id in sorted(quantities):
+            db.execute(
+                update(table)
+                .where(
+                    table.c.variant_id == variant_id,
+                    table.c.shard == random.randrange(shard_counts[variant_id])
+                )
+                .values(quantity=table.c.quantity + quantities[variant_id])
+            )
+
+    def rebalance(self, db: Session, variant_id: int) -> bool:
+        """서브 카운터를 고르게 다시 나누고 inventory_quantity를 합계로 맞춤 (재분배했으면 True)"""
+        shards = self._locked_shards(db, variant_id)
+        if not shards:
+            return False
+
+        quantities = [shard.quantity for shard in shards]
+        total = sum(quantities)
+        target = split_evenly(total, len(shards))
+        # 가장 많은 서브 카운터와 가장 적은 서브 카운터의 차가 1 이하이면 이미 고름
+        changed = max(quantities) - min(quantities) > 1
+        if changed:
+            for shard, quantity in zip(shards, target):
+                shard.quantity = quantity
+
+        table = ProductVariant.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == variant_id, table.c.inventory_quantity != total)
+            # 참고값 동기화는 변형 상품 수정 시각을 바꾸지 않음
+            .values(inventory_quantity=total, updated_at=table.c.updated_at)
+        )
+        return changed
+
+    def run_once(self, session_factory: Callable[[], Session]) -> int:
+        """분할 재고인 변형 상품을 하나씩 짧은 트랜잭션으로 재분배하고 재분배한 수 반환"""
+        started_at = time.perf_counter()
+        rebalanced = 0
+        after = 0
+        try:
+            while not self._stop.is_set():
+                db = session_factory()
+                try:
+                    variant_ids = [
+                        variant_id for (variant_id,) in db.query(ProductVariant.id)
+                        .filter(ProductVariant.inventory_shard_count > 0, ProductVariant.id > after)
+                        .order_by(ProductVariant.id)
+                        .limit(self.batch_size)
+                        .all()
+                    ]
+                    db.rollback()
+                    for variant_id in variant_ids:
+                        if self.rebalance(db, variant_id):
+                            rebalanced += 1
+                            rebalanced_variants.inc()
+                        db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+                finally:
+                    db.close()
+
+                if len(variant_ids) < self.batch_size:
+                    break
+                after = variant_ids[-1]
+        finally:
+            rebalance_seconds.observe(time.perf_counter() - started_at)
+        return rebalanced
+
+    def start(self, session_factory: Callable[[], Session], interval: float):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(session_factory, interval), daemon=True, name="inventory-shard-rebalancer"
+        )
+        self._thread.start()
+
+    def _run(self, session_factory: Callable[[], Session], interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.run_once(session_factory)
+            except Exception as e:
+                logger.error(f"Inventory shard rebalance failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+inventory_shards = InventoryShards(settings.INVENTORY_MAX_SHARDS)
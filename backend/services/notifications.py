@@ -0,0 +1,173 @@
+from email.message import EmailMessage
+from core.config import settings
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+import logging
+import smtplib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 주문 이후 부수 효과 (메일, 결제 승인/환불, 웹훅)
+#
+# 아웃박스 워커(services/outbox.py)가 요청 밖에서 호출한다. 실패하면 예외를 던지고 워커가 재시도하므로
+# 같은 이벤트가 두 번 이상 처리될 수 있다 (at-least-once). 결제/웹훅에는 아웃박스 행 ID로 만든
+# 멱등 키를 보내 중복 처리를 막는다.
+#
+# MAIL_BACKEND / PAYMENT_BACKEND 가 local이면 외부로 보내지 않고 메모리에 기록하는 대체 구현을 사용한다
+# (개발/테스트용).
+
+class LocalMailer:
+    """보낸 메일을 메모리에 기록 (SMTP 대체)"""
+
+    def __init__(self):
+        self.sent: List[EmailMessage] = []
+        self._lock = threading.Lock()
+
+    def send(self, message: EmailMessage):
+        with self._lock:
+            self.sent.append(message)
+        logger.info(f"Mail to {message['To']}: {message['Subject']}")
+
+class SmtpMailer:
+    """SMTP 발송 (STARTTLS)"""
+
+    def __init__(self, host: str, port: int, user: Optional[str], password: Optional[str], timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+
+    def send(self, message: EmailMessage):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password or "")
+            smtp.send_message(message)
+
+class LocalPaymentGateway:
+    """결제 승인/환불을 메모리에 기록 (Stripe 대체, 같은 멱등 키는 한 번만 처리)"""
+
+    def __init__(self):
+        self.captures: Dict[str, str] = {}
+        self.refunds: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def capture(self, payment_id: str, idempotency_key: str):
+        with self._lock:
+            self.captures.setdefault(idempotency_key, payment_id)
+
+    def refund(self, payment_id: str, idempotency_key: str):
+        with self._lock:
+            self.refunds.setdefault(idempotency_key, payment_id)
+
+class StripePaymentGateway:
+    """Stripe PaymentIntent 승인/환불"""
+
+    def __init__(self, secret_key: Optional[str]):
+        import stripe
+        self.stripe = stripe
+        self.secret_key = secret_key
+
+    def capture(self, payment_id: str, idempotency_key: str):
+        self.stripe.PaymentIntent.capture(
+            payment_id, api_key=self.secret_key, idempotency_key=idempotency_key
+        )
+
+    def refund(self, payment_id: str, idempotency_key: str):
+        self.stripe.Refund.create(
+            payment_intent=payment_id, api_key=self.secret_key, idempotency_key=idempotency_key
+        )
+
+def create_mailer():
+    if settings.MAIL_BACKEND == "smtp":
+        return SmtpMailer(settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USER, settings.SMTP_PASSWORD)
+    return LocalMailer()
+
+def create_payment_gateway():
+    if settings.PAYMENT_BACKEND == "stripe":
+        return StripePaymentGateway(settings.STRIPE_SECRET_KEY)
+    return LocalPaymentGateway()
+
+mailer = create_mailer()
+payment_gateway = create_payment_gateway()
+
+def _idempotency_key(event_id: int) -> str:
+    return f"outbox-{event_id}"
+
+def _send_mail(to: str, subject: str, body: str):
+    message = EmailMessage()
+    message['From'] = settings.MAIL_FROM
+    message['To'] = to
+    message['Subject'] = subject
+    message.set_content(body)
+    mailer.send(message)
+
+def _order_mail(subject: str, body: str) -> Callable[[Dict[str, Any], int], None]:
+    """주문 메일 핸들러 (제목/본문은 payload 값으로 채움)"""
+    def handle(payload: Dict[str, Any], event_id: int):
+        _send_mail(payload['email'], subject.format(**payload), body.format(**payload))
+    return handle
+
+def capture_payment(payload: Dict[str, Any], event_id: int):
+    """결제 승인 (결제 ID가 없으면 처리할 것 없음)"""
+    if payload.get('payment_id'):
+        payment_gateway.capture(payload['payment_id'], _idempotency_key(event_id))
+
+def refund_payment(payload: Dict[str, Any], event_id: int):
+    """결제된 주문이 취소되면 환불"""
+    if payload.get('payment_status') == "paid" and payload.get('payment_id'):
+        payment_gateway.refund(payload['payment_id'], _idempotency_key(event_id))
+
+def post_webhook(payload: Dict[str, Any], event_id: int):
+    """OUTBOX_WEBHOOK_URL로 이벤트 전송 (2xx가 아니면 재시도)"""
+    response = httpx.post(
+        settings.OUTBOX_WEBHOOK_URL,
+        json=payload,
+        headers={"Idempotency-Key": _idempotency_key(event_id)},
+        timeout=10.0
+    )
+    response.raise_for_status()
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any], int], None]] = {
+    "send_order_confirmation": _order_mail(
+        "Order {order_number} received",
+        "Thank you for your order.\n\nOrder: {order_number}\nTotal: {total_amount} {currency_code}\n"
+    ),
+    "send_payment_receipt": _order_mail(
+        "Payment received for order {order_number}",
+        "We received your payment of {total_amount} {currency_code} for order {order_number}.\n"
+    ),
+    "send_payment_failed": _order_mail(
+        "Payment failed for order {order_number}",
+        "Your payment for order {order_number} could not be processed. Please try again.\n"
+    ),
+    "send_refund_notice": _order_mail(
+        "Refund for order {order_number}",
+        "Your payment of {total_amount} {currency_code} for order {order_number} has been refunded.\n"
+    ),
+    "send_cancellation_notice": _order_mail(
+        "Order {order_number} cancelled",
+        "Your order {order_number} has been cancelled.\n"
+    ),
+    "capture_payment": capture_payment,
+    "refund_payment": refund_payment,
+    "post_webhook": post_webhook,
+}
+
+# 이벤트별 핸들러 (결제 처리를 메일보다 먼저 기록해 먼저 처리되도록 함)
+SUBSCRIPTIONS: Dict[str, List[str]] = {
+    "order.created": ["send_order_confirmation"],
+    "order.paid": ["capture_payment", "send_payment_receipt"],
+    "order.payment_failed": ["send_payment_failed"],
+    "order.refunded": ["send_refund_notice"],
+    "order.cancelled": ["refund_payment", "send_cancellation_notice"],
+}
+
+def subscribers(event_type: str) -> List[str]:
+    """이벤트를 처리할 핸들러 이름 (웹훅 URL이 설정되어 있으면 모든 이벤트를 웹훅으로도 전송)"""
+    names = list(SUBSCRIPTIONS.get(event_type, []))
+    if settings.OUTBOX_WEBHOOK_URL:
+        names.append("post_webhook")
+    return names
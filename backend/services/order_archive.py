@@ -0,0 +1,265 @@
+from sqlalchemy import and_, delete, func, insert, or_, select, text
+from sqlalchemy.orm import Session, selectinload
+from models.order import Order, OrderItem, OrderStatus
+from models.order_archive import ArchivedOrder, ArchivedOrderItem, OrderArchiveIndex
+from core.config import settings
+from core.metrics import registry
+from typing import Callable, Dict, Optional
+import datetime
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 종료된 주문 보관
+#
+# 배송 완료/취소/환불 상태로 ORDER_ARCHIVE_AFTER_MONTHS개월 넘게 지난 주문을 created_at 순서로 찾아
+# 배치마다 짧은 트랜잭션으로 orders_archive/order_items_archive(월별 파티션)에 복사하고
+# order_archive_index에 (주문 ID, 주문 번호, 사용자, created_at)을 기록한 뒤 원본을 삭제한다.
+# 기준은 월 단위(그 달 1일 0시)라 한 달치 주문이 함께 옮겨진다.
+#
+# orders/order_items에는 진행 중인 주문과 최근 주문만 남아 인덱스 유지/탐색 비용이 일정하게 유지되고,
+# 보관된 주문은 OrderService 조회(get_order, get_order_by_number, get_user_orders)에서
+# 라우팅 색인으로 파티션을 찾아 그대로 읽는다. 보관된 주문은 상태를 바꿀 수 없다.
+
+CLOSED_STATUSES = (OrderStatus.DELIVERED, OrderStatus.CANCELLED, OrderStatus.REFUNDED)
+
+archived_rows = registry.counter(
+    "order_archive_rows",
+    "Rows moved from the live order tables to the archive",
+    ["table"]
+)
+batch_seconds = registry.histogram(
+    "order_archive_batch_seconds",
+    "Time spent in one order archive batch transaction"
+)
+
+# 월별 파티션을 나눠 추가하는 보관 테이블 (파티션 키 순)
+PARTITIONED_TABLES = ("orders_archive", "order_items_archive")
+
+def _add_months(value: datetime.datetime, months: int) -> datetime.datetime:
+    """value가 속한 달에서 months개월 이동한 달의 1일 0시"""
+    month_index = value.year * 12 + (value.month - 1) + months
+    return datetime.datetime(month_index // 12, month_index % 12 + 1, 1)
+
+def archive_cutoff(months: int, now: Optional[datetime.datetime] = None) -> datetime.datetime:
+    """months개월 전 달의 1일 0시 (이전에 생성된 종료 주문이 보관 대상)"""
+    return _add_months(now or datetime.datetime.utcnow(), -months)
+
+def find_archived_order(
+    db: Session,
+    order_id: Optional[str] = None,
+    order_number: Optional[str] = None
+) -> Optional[ArchivedOrder]:
+    """보관된 주문 조회 (라우팅 색인으로 created_at을 찾아 파티션 하나만 읽음)"""
+    query = db.query(OrderArchiveIndex.order_id, OrderArchiveIndex.created_at)
+    if order_id is not None:
+        query = query.filter(OrderArchiveIndex.order_id == order_id)
+    else:
+        query = query.filter(OrderArchiveIndex.order_number == order_number)
+    entry = query.first()
+    if entry is None:
+        return None
+
+    return db.query(ArchivedOrder)\
+        .options(selectinload(ArchivedOrder.items))\
+        .filter(ArchivedOrder.id == entry.order_id, ArchivedOrder.created_at == entry.created_at)\
+        .first()
+
+class OrderArchiver:
+    """오래된 종료 주문을 배치 단위로 보관 테이블로 이동"""
+
+    def __init__(self, after_months: int, batch_size: int = 500, pause: float = 0.2):
+        self.after_months = after_months
+        self.batch_size = batch_size
+        self.pause = pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ensure_partitions(self, db: Session, cutoff: datetime.datetime) -> int:
+        """MySQL 보관 테이블에 cutoff 이전 달까지 월별 파티션 추가 (pmax를 나눔), 추가한 파티션 수 반환
+
+        파티션 없이 만든 테이블(다른 DB, 직접 만든 테이블)은 그대로 둔다. ALTER TABLE은 암묵적으로
+        커밋하므로 보관 배치와 별도로 실행한다.
+        """
+        if db.get_bind().dialect.name not in ("mysql", "mariadb"):
+            return 0
+        oldest = db.query(func.min(Order.created_at))\
+            .filter(Order.created_at < cutoff, Order.status.in_(CLOSED_STATUSES))\
+            .scalar()
+        if oldest is None:
+            return 0
+
+        added = 0
+        for table in PARTITIONED_TABLES:
+            names = [
+                name for (name,) in db.execute(
+                    text(
+                        "SELECT partition_name FROM information_schema.partitions "
+                        "WHERE table_schema = DATABASE() AND table_name = :table AND partition_name IS NOT NULL"
+                    ),
+                    {"table": table}
+                )
+            ]
+            if "pmax" not in names:
+                continue
+
+            months = sorted(name[1:] for name in names if name != "pmax")
+            if months:
+                month = _add_months(datetime.datetime.strptime(months[-1], "%Y%m"), 1)
+            else:
+                month = _add_months(oldest, 0)
+
+            partitions = []
+            while month < cutoff:
+                upper = _add_months(month, 1)
+                partitions.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{upper:%Y-%m-%d}')")
+                month = upper
+            if partitions:
+                db.execute(text(
+                    f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO "
+                    f"({', '.join(partitions)}, PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+                ))
+                logger.info(f"Added {len(partitions)} monthly partitions to {table}")
+                added += len(partitions)
+        return added
+
+    def _candidates(self, db: Session, cutoff: datetime.datetime, after):
+        """(created_at, id) 순서로 다음 배치 후보 조회"""
+        query = db.query(Order.id, Order.created_at)\
+            .filter(Order.created_at < cutoff, Order.status.in_(CLOSED_STATUSES))
+        if after is not None:
+            last_created_at, last_id = after
+            query = query.filter(or_(
+                Order.created_at > last_created_at,
+                and_(Order.created_at == last_created_at, Order.id > last_id)
+            ))
+        return query.order_by(Order.created_at, Order.id).limit(self.batch_size).all()
+
+    def _archive_batch(self, db: Session, order_ids, cutoff: datetime.datetime) -> Dict[str, int]:
+        """한 배치 이동 (후보 조회 후 상태가 바뀐 주문은 제외)"""
+        # PK 순서로 잠가 동시에 변경되는 주문을 옮기지 않도록 함
+        order_ids = [
+            order_id for (order_id,) in db.query(Order.id)
+            .filter(Order.id.in_(order_ids), Order.created_at < cutoff, Order.status.in_(CLOSED_STATUSES))
+            .order_by(Order.id)
+            .with_for_update()
+            .all()
+        ]
+        if not order_ids:
+            return {'orders': 0, 'order_items': 0}
+
+        orders = Order.__table__
+        items = OrderItem.__table__
+        # 큐 상태 등 진행 중인 주문에만 쓰는 컬럼은 보관하지 않음
+        order_columns = [column.name for column in orders.columns if column.name in ArchivedOrder.__table__.c]
+        item_columns = [column.name for column in items.columns]
+
+        db.execute(
+            insert(ArchivedOrder.__table__).from_select(
+                order_columns,
+                select(*[orders.c[name] for name in order_columns]).where(orders.c.id.in_(order_ids))
+            )
+        )
+        db.execute(
+            insert(ArchivedOrderItem.__table__).from_select(
+                item_columns + ['order_created_at'],
+                select(*[items.c[name] for name in item_columns], orders.c.created_at)
+                .select_from(items.join(orders, orders.c.id == items.c.order_id))
+                .where(items.c.order_id.in_(order_ids))
+            )
+        )
+        db.execute(
+            insert(OrderArchiveIndex.__table__).from_select(
+                ['order_id', 'order_number', 'user_id', 'created_at'],
+                select(orders.c.id, orders.c.order_number, orders.c.user_id, orders.c.created_at)
+                .where(orders.c.id.in_(order_ids))
+            )
+        )
+
+        item_count = db.execute(delete(items).where(items.c.order_id.in_(order_ids))).rowcount
+        order_count = db.execute(delete(orders).where(orders.c.id.in_(order_ids))).rowcount
+        return {'orders': order_count, 'order_items': item_count}
+
+    def run_once(self, session_factory: Callable[[], Session]) -> Dict[str, int]:
+        """대상 주문을 모두 옮기고 옮긴 행 수 반환"""
+        cutoff = archive_cutoff(self.after_months)
+        totals = {'orders': 0, 'order_items': 0}
+        after = None
+
+        db = session_factory()
+        try:
+            self.ensure_partitions(db, cutoff)
+            db.commit()
+        finally:
+            db.close()
+
+        while not self._stop.is_set():
+            db = session_factory()
+            started_at = time.perf_counter()
+            try:
+                rows = self._candidates(db, cutoff, after)
+                if not rows:
+                    break
+                after = (rows[-1].created_at, rows[-1].id)
+
+                counts = self._archive_batch(db, sorted(row.id for row in rows), cutoff)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+                batch_seconds.observe(time.perf_counter() - started_at)
+
+            for table, count in counts.items():
+                totals[table] += count
+                archived_rows.inc(count, table=table)
+
+            if len(rows) < self.batch_size:
+                break
+            self._stop.wait(self.pause)
+
+        logger.info(f"Archived {totals['orders']} orders ({totals['order_items']} items) created before {cutoff:%Y-%m-%d}")
+        return totals
+
+    def start(self, session_factory: Callable[[], Session], interval: float):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(session_factory, interval), daemon=True, name="order-archiver"
+        )
+        self._thread.start()
+
+    def _run(self, session_factory: Callable[[], Session], interval: float):
+        while not self._stop.is_set():
+            try:
+                self.run_once(session_factory)
+            except Exception as e:
+                logger.error(f"Order archiver failed: {e}")
+            self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+order_archiver = OrderArchiver(
+    settings.ORDER_ARCHIVE_AFTER_MONTHS,
+    settings.ORDER_ARCHIVE_BATCH_SIZE,
+    settings.ORDER_ARCHIVE_PAUSE
+)
+
+if __name__ == "__main__":
+    # 크론 등에서 한 번 실행: python -m services.order_archive [--months N]
+    import argparse
+    from database.connection import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Move old closed orders to the archive tables in small batches")
+    parser.add_argument("--months", type=int, help="archive closed orders created before this many months ago")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
+    if args.months is not None:
+        order_archiver.after_months = args.months
+    print(order_archiver.run_once(SessionLocal))
@@ -1,8 +1,20 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, selectinload
 from models.order import Order, OrderItem, OrderStatus, PaymentStatus
+from models.order_archive import ArchivedOrder, ArchivedOrderItem, OrderArchiveIndex
 from models.cart import Cart, CartItem
 from models.product import ProductVariant
-from typing import Dict, Any, Optional, List
+from core.pagination import paginate, encode_cursor
+from services.catalog_cache import invalidate_variants
+from services.cart_store import hot_carts
+from services.inventory_service import inventory_service, aggregate_quantities
+from services.outbox import publish
+from services.idempotency import record_resource
+from services.sales_rollup import sales_rollup
+from services.order_archive import find_archived_order
+from core.ids import uuid7, base32, id_timestamp
+from core.config import settings
+from typing import Dict, Any, Optional, List, Tuple
 import uuid
 import datetime
 
@@ -19,6 +31,10 @@ class OrderService:
     ) -> Dict[str, Any]:
         """장바구니에서 주문 생성"""
         
+        # 핫 스토어의 최신 장바구니를 먼저 DB에 반영
+        if hot_carts is not None:
+            hot_carts.flush_cart(db, cart_id)
+        
         # 장바구니 조회
         cart = db.query(Cart).filter(Cart.id == cart_id).first()
         if not cart:
@@ -36,11 +52,12 @@ class OrderService:
             if not variant.available_for_sale:
                 raise ValueError(f"Product variant {variant.id} is not available for sale")
             
-            if variant.inventory_quantity < cart_item.quantity:
+            if variant.total_inventory < cart_item.quantity:
                 raise ValueError(f"Insufficient inventory for product {variant.title}")
         
         # 주문 번호 생성
-        order_number = self._generate_order_number()
+        order_id = uuid7()
+        order_number = self._generate_order_number(order_id)
         
         # 금액 계산
         subtotal_amount = cart.subtotal_amount
@@ -48,8 +65,9 @@ class OrderService:
         shipping_amount = self._calculate_shipping(subtotal_amount)
         total_amount = subtotal_amount + tax_amount + shipping_amount
         
-        # 주문 생성
+        # 주문 생성 (생성 시각은 주문 번호 날짜/매출 집계 날짜와 같도록 주문 ID의 UTC 시각으로 지정)
         order = Order(
+            id=str(order_id),
             order_number=order_number,
             user_id=cart.user_id,
             email=email,
@@ -62,7 +80,8 @@ class OrderService:
             currency_code=cart.currency_code,
             shipping_address=shipping_address,
             billing_address=billing_address or shipping_address,
-            notes=notes
+            notes=notes,
+            created_at=self._order_time(order_id)
         )
         
         db.add(order)
@@ -84,26 +103,57 @@ class OrderService:
             )
             
             db.add(order_item)
-            
-            # 재고 차감
-            variant.inventory_quantity -= cart_item.quantity
+        
+        # 재고 차감 (조건부 UPDATE 한 번, 부족하면 전체 롤백) - 장바구니의 보류는 차감으로 전환
+        inventory_service.decrement(
+            db,
+            aggregate_quantities((cart_item.variant_id, cart_item.quantity) for cart_item in cart.items),
+            cart_id=cart_id
+        )
+        
+        # 매출 집계 반영
+        sales_rollup.order_created(db, order, [
+            (cart_item.variant_id, cart_item.variant.product_id, cart_item.quantity,
+             float(cart_item.variant.price) * cart_item.quantity)
+            for cart_item in cart.items
+        ])
+        
+        variant_ids = [cart_item.variant_id for cart_item in cart.items]
+        ordered_item_ids = [cart_item.id for cart_item in cart.items]
         
         # 장바구니 비우기
         db.query(CartItem).filter(CartItem.cart_id == cart_id).delete()
         
+        # 주문 확인 메일 등은 같은 트랜잭션에 기록하고 아웃박스 워커가 처리
+        publish(db, "order.created", order.id, self._event_payload(order))
+        
+        # Idempotency-Key 요청이면 같은 트랜잭션에서 주문 ID 기록 (응답 저장 전에 실패해도 재시도가 재생)
+        record_resource(db, order.id)
+        
         db.commit()
         db.refresh(order)
         
+        # 주문으로 옮겨진 아이템을 핫 스토어에서도 제거
+        if hot_carts is not None:
+            hot_carts.remove_items(cart_id, ordered_item_ids)
+        
+        # 재고가 바뀐 제품 문서 캐시 무효화
+        invalidate_variants(db, variant_ids)
+        
         return order.to_dict()
     
-    def get_order(self, db: Session, order_id: str) -> Optional[Dict[str, Any]]:
-        """주문 조회"""
+    def get_order(self, db: Session, order_id: str, include_variants: bool = False) -> Optional[Dict[str, Any]]:
+        """주문 조회 (없으면 보관된 주문에서 조회, include_variants면 아이템에 현재 변형 정보 포함)"""
         order = db.query(Order).filter(Order.id == order_id).first()
-        return order.to_dict() if order else None
+        if not order:
+            order = find_archived_order(db, order_id=order_id)
+        return order.to_dict(include_variants) if order else None
     
     def get_order_by_number(self, db: Session, order_number: str) -> Optional[Dict[str, Any]]:
-        """주문 번호로 주문 조회"""
+        """주문 번호로 주문 조회 (없으면 보관된 주문에서 조회)"""
         order = db.query(Order).filter(Order.order_number == order_number).first()
+        if not order:
+            order = find_archived_order(db, order_number=order_number)
         return order.to_dict() if order else None
     
     def get_user_orders(
@@ -111,31 +161,189 @@ class OrderService:
         db: Session, 
         user_id: str,
         page: int = 1,
-        per_page: int = 20
+        per_page: int = 20,
+        after: Optional[str] = None,
+        include_total: bool = True,
+        summary: bool = False,
+        include_variants: bool = False
     ) -> Dict[str, Any]:
-        """사용자 주문 목록 조회"""
+        """사용자 주문 목록 조회 (after 커서가 주어지면 키셋 페이지네이션)
+
+        summary면 아이템 대신 아이템 수와 첫 아이템 스냅샷만 반환한다.
+        아이템은 주문 시점 스냅샷으로 직렬화하고, include_variants면 현재 변형 정보도 함께 로드한다.
+        (summary와 함께 주면 무시)
+        보관된 주문이 있는 사용자는 보관 색인과 합쳐 같은 순서로 페이지를 만든다.
+        """
         
         query = db.query(Order).filter(Order.user_id == user_id)
+        archived_query = db.query(OrderArchiveIndex.created_at, OrderArchiveIndex.order_id.label('id'))\
+            .filter(OrderArchiveIndex.user_id == user_id)
+        if not summary:
+            # 페이지의 아이템을 한 번에 로드 (주문마다 지연 로드하지 않음)
+            query = query.options(self._items_loader(Order, OrderItem, include_variants))
+        
+        # 총 개수 계산 (선택)
+        if include_total:
+            archived_total = archived_query.count()
+            total = query.count() + archived_total
+            has_archived = archived_total > 0
+        else:
+            total = None
+            has_archived = archived_query.first() is not None
+        
+        if has_archived:
+            orders, has_next_page = self._merged_user_orders(
+                db, user_id, archived_query, page, per_page, after, summary, include_variants
+            )
+        else:
+            # 페이지네이션 적용 (user_id, created_at 인덱스 탐색)
+            orders, has_next_page = paginate(
+                query,
+                Order.created_at,
+                Order.id,
+                sort_key="created_at",
+                reverse=True,
+                page=page,
+                per_page=per_page,
+                after=after
+            )
         
-        # 총 개수 계산
-        total = query.count()
-        
-        # 페이지네이션 적용
-        offset = (page - 1) * per_page
-        orders = query.order_by(Order.created_at.desc()).offset(offset).limit(per_page).all()
+        next_cursor = None
+        if has_next_page and orders:
+            next_cursor = encode_cursor("created_at", orders[-1].created_at, orders[-1].id)
         
         # 총 페이지 수 계산
         import math
-        pages = math.ceil(total / per_page)
+        pages = math.ceil(total / per_page) if total is not None else None
+        
+        if summary:
+            results = self._order_summaries(db, orders)
+        else:
+            results = [order.to_dict(include_variants) for order in orders]
         
         return {
-            "orders": [order.to_dict() for order in orders],
+            "orders": results,
             "total": total,
             "page": page,
             "per_page": per_page,
-            "pages": pages
+            "pages": pages,
+            "next_cursor": next_cursor
         }
     
+    def _items_loader(self, order_model, item_model, include_variants: bool):
+        loader = selectinload(order_model.items)
+        return loader.selectinload(item_model.variant) if include_variants else loader
+    
+    def _merged_user_orders(self, db: Session, user_id: str, archived_query, page: int, per_page: int,
+                            after: Optional[str], summary: bool, include_variants: bool = False):
+        """주문과 보관된 주문을 (created_at, id) 역순으로 합친 한 페이지
+        
+        두 쪽에서 키만 같은 범위로 가져와 합친 뒤, 페이지에 들어갈 주문만 로드한다.
+        """
+        window = per_page if after else page * per_page
+        offset = 0 if after else (page - 1) * per_page
+        
+        keys, has_more = [], False
+        for key_query, column, id_column, archived in (
+            (db.query(Order.created_at, Order.id).filter(Order.user_id == user_id), Order.created_at, Order.id, False),
+            (archived_query, OrderArchiveIndex.created_at, OrderArchiveIndex.order_id, True),
+        ):
+            rows, more = paginate(
+                key_query, column, id_column, sort_key="created_at", reverse=True,
+                page=1, per_page=window, after=after
+            )
+            keys.extend((row.created_at, row.id, archived) for row in rows)
+            has_more = has_more or more
+        
+        keys.sort(key=lambda key: (key[0] or datetime.datetime.min, key[1]), reverse=True)
+        page_keys = keys[offset:offset + per_page]
+        has_next_page = has_more or len(keys) > offset + per_page
+        
+        loaded: Dict[str, Any] = {}
+        hot_ids = [order_id for _, order_id, archived in page_keys if not archived]
+        if hot_ids:
+            hot = db.query(Order).filter(Order.id.in_(hot_ids))
+            if not summary:
+                hot = hot.options(self._items_loader(Order, OrderItem, include_variants))
+            loaded.update((order.id, order) for order in hot)
+        archived_keys = [(created_at, order_id) for created_at, order_id, archived in page_keys if archived]
+        if archived_keys:
+            cold = db.query(ArchivedOrder).filter(
+                ArchivedOrder.id.in_([order_id for _, order_id in archived_keys]),
+                ArchivedOrder.created_at.in_({created_at for created_at, _ in archived_keys})
+            )
+            if not summary:
+                cold = cold.options(self._items_loader(ArchivedOrder, ArchivedOrderItem, include_variants))
+            loaded.update((order.id, order) for order in cold)
+        
+        # 키 조회 후 보관으로 옮겨진 주문은 이번 페이지에서 빠짐
+        orders = [loaded[order_id] for _, order_id, _ in page_keys if order_id in loaded]
+        return orders, has_next_page
+    
+    def _first_items(self, db: Session, item_model, order_ids: List[str]) -> Dict[str, Any]:
+        """주문별 아이템 수/수량 + 첫 아이템 스냅샷 (집계 쿼리 한 번)"""
+        counts = db.query(
+            item_model.order_id.label('order_id'),
+            func.count(item_model.id).label('item_count'),
+            func.sum(item_model.quantity).label('total_quantity'),
+            func.min(item_model.id).label('first_item_id')
+        )\
+            .filter(item_model.order_id.in_(order_ids))\
+            .group_by(item_model.order_id)\
+            .subquery()
+        
+        rows = db.query(
+            counts.c.order_id,
+            counts.c.item_count,
+            counts.c.total_quantity,
+            item_model.variant_id,
+            item_model.quantity,
+            item_model.price,
+            item_model.product_title,
+            item_model.variant_title,
+            item_model.product_handle
+        )\
+            .join(item_model, item_model.id == counts.c.first_item_id)\
+            .all()
+        return {row.order_id: row for row in rows}
+    
+    def _order_summaries(self, db: Session, orders: List[Any]) -> List[Dict[str, Any]]:
+        """주문 헤더 + 아이템 수/수량 + 첫 아이템 스냅샷 (주문/보관 주문마다 아이템 집계 쿼리 한 번)"""
+        if not orders:
+            return []
+        
+        aggregates = {}
+        for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+            order_ids = [order.id for order in orders if isinstance(order, order_model)]
+            if order_ids:
+                aggregates.update(self._first_items(db, item_model, order_ids))
+        
+        results = []
+        for order in orders:
+            row = aggregates.get(order.id)
+            results.append({
+                'id': order.id,
+                'order_number': order.order_number,
+                'status': order.status.value if order.status else None,
+                'payment_status': order.payment_status.value if order.payment_status else None,
+                'total_amount': float(order.total_amount) if order.total_amount else 0,
+                'currency_code': order.currency_code,
+                'created_at': order.created_at.isoformat() if order.created_at else None,
+                'shipped_at': order.shipped_at.isoformat() if order.shipped_at else None,
+                'delivered_at': order.delivered_at.isoformat() if order.delivered_at else None,
+                'item_count': row.item_count if row else 0,
+                'total_quantity': int(row.total_quantity) if row else 0,
+                'first_item': {
+                    'variant_id': row.variant_id,
+                    'quantity': row.quantity,
+                    'price': float(row.price) if row.price else 0,
+                    'product_title': row.product_title,
+                    'variant_title': row.variant_title,
+                    'product_handle': row.product_handle
+                } if row else None
+            })
+        return results
+    
     def update_order_status(
         self, 
         db: Session, 
@@ -148,6 +356,7 @@ class OrderService:
         if not order:
             return None
         
+        previous = (order.status, order.payment_status)
         order.status = status
         
         # 상태에 따른 타임스탬프 업데이트
@@ -156,11 +365,152 @@ class OrderService:
         elif status == OrderStatus.DELIVERED:
             order.delivered_at = datetime.datetime.utcnow()
         
+        sales_rollup.order_changed(db, order, previous, (order.status, order.payment_status))
+        
         db.commit()
         db.refresh(order)
         
         return order.to_dict()
     
+    # 일괄 상태 변경에서 허용하는 전환 (목표 상태: 이전 상태)
+    # 취소/환불은 재고 복원과 아웃박스 이벤트가 필요하므로 주문별 API로 처리한다.
+    _BULK_TRANSITIONS = {
+        OrderStatus.CONFIRMED: (OrderStatus.PENDING,),
+        OrderStatus.PROCESSING: (OrderStatus.PENDING, OrderStatus.CONFIRMED),
+        OrderStatus.SHIPPED: (OrderStatus.CONFIRMED, OrderStatus.PROCESSING),
+        OrderStatus.DELIVERED: (OrderStatus.SHIPPED,),
+    }
+    
+    def bulk_update_status(
+        self,
+        db: Session,
+        updates: List[Tuple[OrderStatus, List[str], List[str]]],
+        commit: bool = True
+    ) -> Dict[str, Any]:
+        """주문 상태 일괄 변경 ((목표 상태, 주문 ID 목록, 주문 번호 목록) 목록)
+        
+        ORDER_BULK_STATUS_CHUNK_SIZE개씩 PK 순서로 잠가 이전 상태를 읽고, 목표 상태마다
+        UPDATE ... WHERE id IN (...) AND status IN (허용된 이전 상태) 한 번으로 바꾼 뒤 커밋한다.
+        이미 목표 상태인 주문은 unchanged라 실패한 요청을 그대로 다시 보내도 된다.
+        commit=False면 커밋하지 않고 호출한 쪽 트랜잭션에 남긴다 (피킹 큐 ack의 임대 확인과 함께 커밋).
+        """
+        for status, _, _ in updates:
+            if status not in self._BULK_TRANSITIONS:
+                raise ValueError(f"Bulk transition to '{status.value}' is not supported")
+        if sum(len(order_ids) + len(order_numbers) for _, order_ids, order_numbers in updates) \
+                > settings.ORDER_BULK_STATUS_MAX_ORDERS:
+            raise ValueError(f"Too many orders (max {settings.ORDER_BULK_STATUS_MAX_ORDERS})")
+        
+        results = []
+        chunk_size = max(settings.ORDER_BULK_STATUS_CHUNK_SIZE, 1)
+        for status, order_ids, order_numbers in updates:
+            refs = list(dict.fromkeys(
+                [('id', order_id) for order_id in order_ids] +
+                [('number', order_number) for order_number in order_numbers]
+            ))
+            for start in range(0, len(refs), chunk_size):
+                results.extend(self._bulk_update_chunk(db, status, refs[start:start + chunk_size], commit))
+        
+        counts = {'updated': 0, 'unchanged': 0, 'rejected': 0, 'not_found': 0}
+        for result in results:
+            if result['result'] in ('updated', 'unchanged', 'not_found'):
+                counts[result['result']] += 1
+            else:
+                counts['rejected'] += 1
+        return {**counts, 'results': results}
+    
+    def _bulk_update_chunk(
+        self,
+        db: Session,
+        status: OrderStatus,
+        refs: List[Tuple[str, str]],
+        commit: bool = True
+    ) -> List[Dict[str, Any]]:
+        """한 트랜잭션에서 주문 묶음 하나의 상태 변경"""
+        allowed = self._BULK_TRANSITIONS[status]
+        order_ids = [value for kind, value in refs if kind == 'id']
+        order_numbers = [value for kind, value in refs if kind == 'number']
+        conditions = []
+        if order_ids:
+            conditions.append(Order.id.in_(order_ids))
+        if order_numbers:
+            conditions.append(Order.order_number.in_(order_numbers))
+        
+        try:
+            # 이전 상태를 읽는 동안 다른 변경이 끼어들지 않도록 PK 순서로 잠금
+            rows = db.query(
+                Order.id,
+                Order.order_number,
+                Order.status,
+                Order.payment_status,
+                Order.currency_code,
+                Order.subtotal_amount,
+                Order.total_amount,
+                Order.created_at
+            )\
+                .filter(or_(*conditions))\
+                .order_by(Order.id)\
+                .with_for_update()\
+                .all()
+            
+            movable = [row for row in rows if row.status in allowed]
+            if movable:
+                values = {Order.status: status}
+                if status == OrderStatus.SHIPPED:
+                    values[Order.shipped_at] = datetime.datetime.utcnow()
+                elif status == OrderStatus.DELIVERED:
+                    values[Order.delivered_at] = datetime.datetime.utcnow()
+                db.query(Order)\
+                    .filter(Order.id.in_([row.id for row in movable]), Order.status.in_(allowed))\
+                    .update(values, synchronize_session=False)
+                sales_rollup.orders_moved(db, movable, status)
+            
+            if commit:
+                db.commit()
+        except Exception:
+            if commit:
+                db.rollback()
+            raise
+        
+        by_id = {row.id: row for row in rows}
+        by_number = {row.order_number: row for row in rows}
+        missing = [
+            value for kind, value in refs
+            if (by_id if kind == 'id' else by_number).get(value) is None
+        ]
+        # 보관된 주문은 상태를 바꿀 수 없음 (not_found와 구분)
+        archived = set()
+        if missing:
+            for order_id, order_number in db.query(OrderArchiveIndex.order_id, OrderArchiveIndex.order_number)\
+                    .filter(or_(OrderArchiveIndex.order_id.in_(missing), OrderArchiveIndex.order_number.in_(missing)))\
+                    .all():
+                archived.update((order_id, order_number))
+        
+        results = []
+        for kind, value in refs:
+            row = (by_id if kind == 'id' else by_number).get(value)
+            if row is None:
+                results.append({
+                    'order_id': value if kind == 'id' else None,
+                    'order_number': value if kind == 'number' else None,
+                    'result': 'archived' if value in archived else 'not_found',
+                    'status': None
+                })
+                continue
+            if row.status == status:
+                result, current = 'unchanged', status
+            elif row.status in allowed:
+                result, current = 'updated', status
+            else:
+                result, current = 'invalid_transition', row.status
+            results.append({
+                'order_id': row.id,
+                'order_number': row.order_number,
+                'result': result,
+                'status': current.value if current else None
+            })
+        return results
+    
     def update_payment_status(
         self, 
         db: Session, 
@@ -169,12 +519,18 @@ class OrderService:
         payment_id: Optional[str] = None,
         payment_method: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
-        """결제 상태 업데이트"""
-        
-        order = db.query(Order).filter(Order.id == order_id).first()
+        """결제 상태 업데이트 (결제 이벤트는 결제 상태가 실제로 바뀔 때만 발행)"""
+        
+        # 행을 잠그고 최신 상태를 읽어 동시 결제 콜백이 같은 변경을 두 번 발행하지 않게 함
+        order = db.query(Order)\
+            .filter(Order.id == order_id)\
+            .populate_existing()\
+            .with_for_update()\
+            .first()
         if not order:
             return None
         
+        previous = (order.status, order.payment_status)
         order.payment_status = payment_status
         
         if payment_id:
@@ -187,6 +543,15 @@ class OrderService:
         if payment_status == PaymentStatus.PAID and order.status == OrderStatus.PENDING:
             order.status = OrderStatus.CONFIRMED
         
+        sales_rollup.order_changed(db, order, previous, (order.status, order.payment_status))
+        
+        # 같은 상태를 다시 보낸 요청은 결제 처리/영수증 메일을 반복하지 않음
+        event_type = self._PAYMENT_EVENTS.get(payment_status)
+        if event_type and previous[1] != order.payment_status:
+            publish(db, event_type, order.id, self._event_payload(order))
+        
+        record_resource(db, order.id)
+        
         db.commit()
         db.refresh(order)
         
@@ -195,33 +560,73 @@ class OrderService:
     def cancel_order(self, db: Session, order_id: str) -> Optional[Dict[str, Any]]:
         """주문 취소"""
         
-        order = db.query(Order).filter(Order.id == order_id).first()
+        # 행을 잠그고 최신 상태를 읽어 동시 취소/배송 처리와 겹치지 않게 하고,
+        # 매출 집계에서 뺄 이전 상태가 실제로 바뀌기 직전 값이 되도록 함
+        order = db.query(Order)\
+            .filter(Order.id == order_id)\
+            .populate_existing()\
+            .with_for_update()\
+            .first()
         if not order:
             return None
         
         # 취소 가능한 상태인지 확인
         if order.status in [OrderStatus.SHIPPED, OrderStatus.DELIVERED]:
+            db.rollback()
             raise ValueError("Cannot cancel shipped or delivered order")
         
-        # 재고 복원
-        for order_item in order.items:
-            variant = order_item.variant
-            if variant:
-                variant.inventory_quantity += order_item.quantity
+        if order.status == OrderStatus.CANCELLED:
+            db.rollback()
+            raise ValueError("Order is already cancelled")
         
-        # 주문 상태 업데이트
+        previous = (order.status, order.payment_status)
         order.status = OrderStatus.CANCELLED
         
+        sales_rollup.order_changed(db, order, previous, (order.status, order.payment_status))
+        
+        # 재고 복원 (UPDATE 한 번)
+        inventory_service.restock(
+            db, aggregate_quantities((order_item.variant_id, order_item.quantity) for order_item in order.items)
+        )
+        
+        # 환불/취소 안내는 아웃박스 워커가 처리
+        publish(db, "order.cancelled", order.id, self._event_payload(order))
+        
         db.commit()
         db.refresh(order)
         
+        # 재고가 바뀐 제품 문서 캐시 무효화
+        invalidate_variants(db, [order_item.variant_id for order_item in order.items])
+        
         return order.to_dict()
     
-    def _generate_order_number(self) -> str:
-        """주문 번호 생성"""
-        timestamp = datetime.datetime.now().strftime("%Y%m%d")
-        random_part = str(uuid.uuid4()).replace("-", "")[:8].upper()
-        return f"ORD-{timestamp}-{random_part}"
+    # 결제 상태별 아웃박스 이벤트
+    _PAYMENT_EVENTS = {
+        PaymentStatus.PAID: "order.paid",
+        PaymentStatus.FAILED: "order.payment_failed",
+        PaymentStatus.REFUNDED: "order.refunded",
+    }
+    
+    def _event_payload(self, order: Order) -> Dict[str, Any]:
+        """아웃박스 이벤트 내용 (핸들러가 DB를 다시 읽지 않도록 필요한 값을 담음)"""
+        return {
+            'order_id': order.id,
+            'order_number': order.order_number,
+            'email': order.email,
+            'total_amount': f"{float(order.total_amount or 0):.2f}",
+            'currency_code': order.currency_code,
+            'payment_status': order.payment_status.value if order.payment_status else None,
+            'payment_id': order.payment_id,
+        }
+    
+    def _order_time(self, order_id: uuid.UUID) -> datetime.datetime:
+        """주문 ID(UUIDv7)에 담긴 생성 시각 (UTC, 초 단위)"""
+        return datetime.datetime.utcfromtimestamp(int(id_timestamp(str(order_id))))
+    
+    def _generate_order_number(self, order_id: uuid.UUID) -> str:
+        """주문 번호 생성 (주문 ID의 Base32 표기라 충돌 없이 시간 순서로 정렬됨, 날짜는 주문 ID의 UTC 날짜)"""
+        timestamp = self._order_time(order_id).strftime("%Y%m%d")
+        return f"ORD-{timestamp}-{base32(order_id)}"
     
     def _calculate_tax(self, subtotal: float) -> float:
         """세금 계산 (예시: 10%)"""
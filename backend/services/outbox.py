@@ -0,0 +1,246 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from models.outbox import OutboxEvent, OutboxStatus
+from services.notifications import HANDLERS, subscribers
+from core.config import settings
+from core.metrics import registry
+from typing import Any, Callable, Dict, List, Optional
+import datetime
+import json
+import logging
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 트랜잭션 아웃박스
+#
+# 주문 생성/결제 상태 변경/취소는 publish로 outbox_events에 행을 추가하고 같은 트랜잭션으로 커밋한다.
+# 외부 호출(SMTP, 결제, 웹훅)은 요청 안에서 하지 않고 워커가 나중에 처리하므로 주문 응답 시간이
+# 외부 서비스에 좌우되지 않고, 주문이 롤백되면 이벤트도 함께 사라진다.
+#
+# 워커 (OutboxWorker):
+# 1. 처리할 행을 FOR UPDATE SKIP LOCKED로 가져와 processing으로 바꾸고 available_at을 임대 만료 시각으로
+#    미룬 뒤 바로 커밋한다 (여러 워커가 같은 행을 가져가지 않고, 외부 호출 중에 잠금을 잡고 있지 않음).
+# 2. 트랜잭션 밖에서 핸들러를 호출한다.
+# 3. 성공한 행은 done으로 바꾸고, 실패한 행은 지수 백오프(+지터) 뒤로 다시 미루며 OUTBOX_MAX_ATTEMPTS를
+#    넘으면 failed로 남긴다. 처리 중 워커가 죽으면 임대가 끝난 뒤 다른 워커가 다시 가져간다.
+
+processed_events = registry.counter(
+    "outbox_events_processed",
+    "Outbox rows handled by the worker",
+    ["handler", "result"]
+)
+delivery_lag = registry.histogram(
+    "outbox_delivery_lag_seconds",
+    "Time from publishing an outbox row to handling it successfully"
+)
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow().replace(microsecond=0)
+
+def publish(db: Session, event_type: str, aggregate_id: Optional[str], payload: Dict[str, Any]) -> List[OutboxEvent]:
+    """이벤트를 처리할 핸들러마다 아웃박스 행 추가 (커밋은 호출자의 트랜잭션에서)"""
+    body = json.dumps(payload, default=str, ensure_ascii=False)
+    events = [
+        OutboxEvent(
+            event_type=event_type,
+            handler=handler,
+            aggregate_id=aggregate_id,
+            payload=body,
+            status=OutboxStatus.PENDING,
+            attempts=0,
+            available_at=_utcnow()
+        )
+        for handler in subscribers(event_type)
+    ]
+    db.add_all(events)
+    return events
+
+class OutboxWorker:
+    """아웃박스를 배치 단위로 처리 (재시도/백오프 포함)"""
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[Dict[str, Any], int], None]],
+        batch_size: int = 50,
+        max_attempts: int = 8,
+        base_delay: float = 5.0,
+        max_delay: float = 3600.0,
+        lease: int = 300
+    ):
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def backoff(self, attempts: int) -> float:
+        """attempts번 실패 후 다음 시도까지 대기 시간 (초, 지수 증가 + 지터)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def claim(self, db: Session) -> List[Any]:
+        """처리할 행을 가져와 임대 (다른 워커가 잡은 행은 건너뜀)
+
+        커밋 후에도 쓸 수 있도록 필요한 컬럼만 읽으며, attempts는 이번 시도를 포함한 값이다.
+        """
+        now = _utcnow()
+        rows = db.query(
+            OutboxEvent.id,
+            OutboxEvent.event_type,
+            OutboxEvent.handler,
+            OutboxEvent.payload,
+            (OutboxEvent.attempts + 1).label('attempts'),
+            OutboxEvent.created_at
+        )\
+            .filter(
+                OutboxEvent.status.in_([OutboxStatus.PENDING, OutboxStatus.PROCESSING]),
+                OutboxEvent.available_at <= now
+            )\
+            .order_by(OutboxEvent.available_at, OutboxEvent.id)\
+            .limit(self.batch_size)\
+            .with_for_update(skip_locked=True)\
+            .all()
+        if not rows:
+            db.rollback()
+            return []
+
+        table = OutboxEvent.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id.in_([row.id for row in rows]))
+            .values(
+                status=OutboxStatus.PROCESSING,
+                attempts=table.c.attempts + 1,
+                available_at=now + datetime.timedelta(seconds=self.lease)
+            )
+        )
+        db.commit()
+        return rows
+
+    def handle(self, event) -> Optional[str]:
+        """핸들러 호출 (실패하면 오류 메시지 반환)"""
+        handler = self.handlers.get(event.handler)
+        if handler is None:
+            return f"Unknown outbox handler {event.handler}"
+        try:
+            handler(json.loads(event.payload), event.id)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+
+    def run_once(self, session_factory: Callable[[], Session]) -> int:
+        """한 배치를 처리하고 처리한 행 수 반환"""
+        db = session_factory()
+        try:
+            events = self.claim(db)
+            if not events:
+                return 0
+
+            done = []
+            failures = []
+            for event in events:
+                error = self.handle(event)
+                if error is None:
+                    done.append(event)
+                else:
+                    failures.append((event, error))
+
+            now = _utcnow()
+            table = OutboxEvent.__table__
+            if done:
+                db.execute(
+                    update(table)
+                    .where(table.c.id.in_([event.id for event in done]))
+                    .values(status=OutboxStatus.DONE, processed_at=now, last_error=None)
+                )
+            for event, error in failures:
+                attempts = event.attempts
+                failed = attempts >= self.max_attempts
+                db.execute(
+                    update(table)
+                    .where(table.c.id == event.id)
+                    .values(
+                        status=OutboxStatus.FAILED if failed else OutboxStatus.PENDING,
+                        available_at=now + datetime.timedelta(seconds=0 if failed else self.backoff(attempts)),
+                        last_error=error[:2000]
+                    )
+                )
+                log = logger.error if failed else logger.warning
+                log(f"Outbox {event.handler} for {event.event_type} #{event.id} failed (attempt {attempts}): {error}")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for event in done:
+            processed_events.inc(handler=event.handler, result="done")
+            if event.created_at:
+                delivery_lag.observe(max((now - event.created_at).total_seconds(), 0))
+        for event, _ in failures:
+            result = "failed" if event.attempts >= self.max_attempts else "retry"
+            processed_events.inc(handler=event.handler, result=result)
+        return len(events)
+
+    def drain(self, session_factory: Callable[[], Session]) -> int:
+        """지금 처리할 수 있는 행을 모두 처리"""
+        total = 0
+        while not self._stop.is_set():
+            count = self.run_once(session_factory)
+            total += count
+            if count < self.batch_size:
+                break
+        return total
+
+    def start(self, session_factory: Callable[[], Session], interval: float):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(session_factory, interval), daemon=True, name="outbox-worker"
+        )
+        self._thread.start()
+
+    def _run(self, session_factory: Callable[[], Session], interval: float):
+        while not self._stop.is_set():
+            try:
+                self.drain(session_factory)
+            except Exception as e:
+                logger.error(f"Outbox worker failed: {e}")
+            self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+outbox_worker = OutboxWorker(
+    HANDLERS,
+    settings.OUTBOX_BATCH_SIZE,
+    settings.OUTBOX_MAX_ATTEMPTS,
+    settings.OUTBOX_RETRY_BASE_DELAY,
+    settings.OUTBOX_RETRY_MAX_DELAY,
+    settings.OUTBOX_LEASE_SECONDS
+)
+
+if __name__ == "__main__":
+    # 별도 워커 프로세스: python -m services.outbox [--once]
+    import argparse
+    from database.connection import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Deliver transactional outbox events")
+    parser.add_argument("--once", action="store_true", help="drain pending events and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
+    if args.once:
+        print(outbox_worker.drain(SessionLocal))
+    else:
+        try:
+            outbox_worker._run(SessionLocal, settings.OUTBOX_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
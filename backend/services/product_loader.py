@@ -0,0 +1,106 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import func
+from models.product import Product, ProductVariant, ProductImage, Collection, product_collections
+from models.inventory import InventoryShard
+from typing import List, Dict, Any, Iterable
+
+class ProductLoader:
+    """제품 연관 데이터 일괄 로더
+
+    페이지 단위의 제품 목록에 대해 변형 상품, 이미지, 컬렉션, 컬렉션별 제품 수를
+    제품 수와 무관하게 고정된 개수(최대 4개, 분할 재고 변형 상품이 있으면 1개 추가)의 IN 쿼리로 로드한다.
+    """
+
+    def load(self, db: Session, products: List[Product]) -> Dict[int, int]:
+        """제품 목록의 연관 관계를 일괄 로드하고 컬렉션별 제품 수를 반환"""
+        if not products:
+            return {}
+
+        product_ids = [product.id for product in products]
+
+        # 변형 상품
+        variants_by_product: Dict[int, List[ProductVariant]] = {pid: [] for pid in product_ids}
+        variants = db.query(ProductVariant)\
+            .filter(ProductVariant.product_id.in_(product_ids))\
+            .order_by(ProductVariant.id)\
+            .all()
+        for variant in variants:
+            variants_by_product[variant.product_id].append(variant)
+        self.load_shards(db, variants)
+
+        # 이미지
+        images_by_product: Dict[int, List[ProductImage]] = {pid: [] for pid in product_ids}
+        images = db.query(ProductImage)\
+            .filter(ProductImage.product_id.in_(product_ids))\
+            .order_by(ProductImage.id)\
+            .all()
+        for image in images:
+            images_by_product[image.product_id].append(image)
+
+        # 컬렉션 (연결 테이블 조인)
+        collections_by_product: Dict[int, List[Collection]] = {pid: [] for pid in product_ids}
+        rows = db.query(product_collections.c.product_id, Collection)\
+            .join(Collection, Collection.id == product_collections.c.collection_id)\
+            .filter(product_collections.c.product_id.in_(product_ids))\
+            .order_by(Collection.id)\
+            .all()
+        for product_id, collection in rows:
+            collections_by_product[product_id].append(collection)
+
+        for product in products:
+            set_committed_value(product, 'variants', variants_by_product[product.id])
+            set_committed_value(product, 'images', images_by_product[product.id])
+            set_committed_value(product, 'collections', collections_by_product[product.id])
+
+        collection_ids = {collection.id for _, collection in rows}
+        return self.collection_counts(db, collection_ids)
+
+    def load_shards(self, db: Session, variants: List[ProductVariant]):
+        """분할 재고 변형 상품의 서브 카운터를 한 번의 IN 쿼리로 로드 (재고 합계 표시용, 없으면 쿼리 없음)"""
+        sharded = {variant.id: variant for variant in variants if variant.inventory_shard_count}
+        if not sharded:
+            return
+
+        shards_by_variant: Dict[int, List[InventoryShard]] = {variant_id: [] for variant_id in sharded}
+        shards = db.query(InventoryShard)\
+            .filter(InventoryShard.variant_id.in_(list(sharded)))\
+            .order_by(InventoryShard.variant_id, InventoryShard.shard)\
+            .all()
+        for shard in shards:
+            shards_by_variant[shard.variant_id].append(shard)
+        for variant_id, variant in sharded.items():
+            set_committed_value(variant, 'shards', shards_by_variant[variant_id])
+
+    def collection_counts(self, db: Session, collection_ids: Iterable[int]) -> Dict[int, int]:
+        """컬렉션별 제품 수를 한 번의 GROUP BY 쿼리로 집계"""
+        collection_ids = list(collection_ids)
+        if not collection_ids:
+            return {}
+
+        rows = db.query(
+            product_collections.c.collection_id,
+            func.count(product_collections.c.product_id)
+        ).filter(
+            product_collections.c.collection_id.in_(collection_ids)
+        ).group_by(product_collections.c.collection_id).all()
+
+        counts = {collection_id: 0 for collection_id in collection_ids}
+        counts.update({collection_id: count for collection_id, count in rows})
+        return counts
+
+    def serialize(self, db: Session, products: List[Product]) -> List[Dict[str, Any]]:
+        """제품 목록을 일괄 로드 후 직렬화"""
+        collection_counts = self.load(db, products)
+        return [product.to_dict(collection_counts=collection_counts) for product in products]
+
+    def serialize_one(self, db: Session, product: Product) -> Dict[str, Any]:
+        """단일 제품 직렬화"""
+        return self.serialize(db, [product])[0]
+
+    def serialize_collections(self, db: Session, collections: List[Collection]) -> List[Dict[str, Any]]:
+        """컬렉션 목록 직렬화 (제품 수 일괄 집계)"""
+        counts = self.collection_counts(db, [collection.id for collection in collections])
+        return [collection.to_dict(product_count=counts[collection.id]) for collection in collections]
+
+product_loader = ProductLoader()
@@ -1,7 +1,14 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from models.product import Product, ProductVariant, ProductImage, Collection
+from sqlalchemy import or_, and_, false
+from models.product import Product, ProductVariant, ProductImage, Collection, product_collections
 from schemas.product import ProductCreate, ProductUpdate
+from services.product_loader import product_loader
+from services.search_service import product_search_index
+from services.inventory_shards import inventory_shards
+from services.catalog_cache import invalidate_products, invalidate_collections
+from core.cache import cache, product_cache_key
+from core.pagination import paginate, encode_cursor, decode_cursor
+from core.config import settings
 from typing import List, Optional, Dict, Any
 import math
 
@@ -16,9 +23,13 @@ class ProductService:
         page: int = 1,
         per_page: int = 20,
         collection_id: Optional[int] = None,
-        available_only: bool = True
+        available_only: bool = True,
+        after: Optional[str] = None,
+        include_total: bool = True,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None
     ) -> Dict[str, Any]:
-        """제품 목록 조회"""
+        """제품 목록 조회 (after 커서가 주어지면 키셋 페이지네이션)"""
         
         # 기본 쿼리
         products_query = db.query(Product)
@@ -28,15 +39,34 @@ class ProductService:
             products_query = products_query.filter(Product.available_for_sale == True)
         
         # 검색 필터 적용
+        search_hits = None
         if query:
-            products_query = products_query.filter(
-                or_(
-                    Product.title.ilike(f'%{query}%'),
-                    Product.description.ilike(f'%{query}%'),
-                    Product.vendor.ilike(f'%{query}%'),
-                    Product.product_type.ilike(f'%{query}%')
+            if product_search_index.ready:
+                # 역색인에서 후보 제품 ID 조회 (PK 조회로 필터링)
+                # 상위 결과 제한은 관련도 정렬에만 적용 (다른 정렬은 필터 후 모든 일치 제품 대상)
+                limit = settings.SEARCH_MAX_RESULTS if sort_key == "relevance" else None
+                search_hits = product_search_index.search(query, limit=limit)
+                if search_hits:
+                    products_query = products_query.filter(
+                        Product.id.in_([product_id for product_id, _ in search_hits])
+                    )
+                else:
+                    products_query = products_query.filter(false())
+            else:
+                products_query = products_query.filter(
+                    or_(
+                        Product.title.ilike(f'%{query}%'),
+                        Product.description.ilike(f'%{query}%'),
+                        Product.vendor.ilike(f'%{query}%'),
+                        Product.product_type.ilike(f'%{query}%')
+                    )
                 )
-            )
+        
+        # 가격 필터 적용 (가격대가 범위와 겹치는 제품, 가격 범위 컬럼 인덱스 사용)
+        if min_price is not None:
+            products_query = products_query.filter(Product.max_price >= min_price)
+        if max_price is not None:
+            products_query = products_query.filter(Product.min_price <= max_price)
         
         # 컬렉션 필터 적용
         if collection_id:
@@ -44,6 +74,12 @@ class ProductService:
                 Collection.id == collection_id
             )
         
+        # 검색 관련도 정렬
+        if sort_key == "relevance" and search_hits is not None:
+            return self._get_products_by_relevance(
+                db, products_query, search_hits, reverse, page, per_page, after, include_total
+            )
+        
         # 정렬 적용
         if sort_key == "title":
             order_column = Product.title
@@ -51,41 +87,111 @@ class ProductService:
             order_column = Product.created_at
         elif sort_key == "updated_at":
             order_column = Product.updated_at
+        elif sort_key == "price":
+            order_column = Product.min_price
         else:
+            sort_key = "created_at"
             order_column = Product.created_at
-            
-        if reverse:
-            products_query = products_query.order_by(order_column.desc())
-        else:
-            products_query = products_query.order_by(order_column.asc())
         
-        # 총 개수 계산
-        total = products_query.count()
+        # 총 개수 계산 (선택)
+        total = products_query.count() if include_total else None
         
         # 페이지네이션 적용
-        offset = (page - 1) * per_page
-        products = products_query.offset(offset).limit(per_page).all()
+        products, has_next_page = paginate(
+            products_query,
+            order_column,
+            Product.id,
+            sort_key=sort_key,
+            reverse=reverse,
+            page=page,
+            per_page=per_page,
+            after=after
+        )
+        
+        next_cursor = None
+        if has_next_page:
+            last = products[-1]
+            next_cursor = encode_cursor(sort_key, getattr(last, order_column.key), last.id)
         
         # 총 페이지 수 계산
-        pages = math.ceil(total / per_page)
+        pages = math.ceil(total / per_page) if total is not None else None
         
         return {
-            "products": [product.to_dict() for product in products],
+            "products": product_loader.serialize(db, products),
             "total": total,
             "page": page,
             "per_page": per_page,
-            "pages": pages
+            "pages": pages,
+            "next_cursor": next_cursor
+        }
+    
+    def _get_products_by_relevance(
+        self,
+        db: Session,
+        products_query,
+        search_hits: List,
+        reverse: bool,
+        page: int,
+        per_page: int,
+        after: Optional[str],
+        include_total: bool
+    ) -> Dict[str, Any]:
+        """검색 점수 순 제품 목록 조회"""
+        
+        # 필터를 통과한 후보만 남기고 점수 순서 유지
+        matched_ids = {product_id for (product_id,) in products_query.with_entities(Product.id)}
+        ranked = [(product_id, score) for product_id, score in search_hits if product_id in matched_ids]
+        if reverse:
+            ranked.reverse()
+        
+        if after:
+            score, last_id = decode_cursor(after, "relevance")
+            if reverse:
+                ranked = [hit for hit in ranked if (hit[1], -hit[0]) > (score, -last_id)]
+            else:
+                ranked = [hit for hit in ranked if (-hit[1], hit[0]) > (-score, last_id)]
+            page_hits = ranked[:per_page]
+            has_next_page = len(ranked) > per_page
+        else:
+            offset = (page - 1) * per_page
+            page_hits = ranked[offset:offset + per_page]
+            has_next_page = len(ranked) > offset + per_page
+        
+        page_ids = [product_id for product_id, _ in page_hits]
+        products_by_id = {
+            product.id: product
+            for product in db.query(Product).filter(Product.id.in_(page_ids)).all()
+        } if page_ids else {}
+        products = [products_by_id[product_id] for product_id in page_ids if product_id in products_by_id]
+        
+        next_cursor = None
+        if has_next_page:
+            next_cursor = encode_cursor("relevance", page_hits[-1][1], page_hits[-1][0])
+        
+        total = len(matched_ids) if include_total else None
+        pages = math.ceil(total / per_page) if total is not None else None
+        
+        return {
+            "products": product_loader.serialize(db, products),
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "next_cursor": next_cursor
         }
     
     def get_product_by_handle(self, db: Session, handle: str) -> Optional[Dict[str, Any]]:
-        """핸들로 제품 조회"""
-        product = db.query(Product).filter(Product.handle == handle).first()
-        return product.to_dict() if product else None
+        """핸들로 제품 조회 (캐시 우선)"""
+        def load():
+            product = db.query(Product).filter(Product.handle == handle).first()
+            return product_loader.serialize_one(db, product) if product else None
+        
+        return cache.get_or_load(product_cache_key(handle), load)
     
     def get_product_by_id(self, db: Session, product_id: int) -> Optional[Dict[str, Any]]:
         """ID로 제품 조회"""
         product = db.query(Product).filter(Product.id == product_id).first()
-        return product.to_dict() if product else None
+        return product_loader.serialize_one(db, product) if product else None
     
     def create_product(self, db: Session, product_data: ProductCreate) -> Dict[str, Any]:
         """새 제품 생성"""
@@ -147,7 +253,11 @@ class ProductService:
         db.commit()
         db.refresh(product)
         
-        return product.to_dict()
+        product_search_index.add_product(product)
+        invalidate_products([product.handle])
+        invalidate_collections(db, product_data.collection_ids)
+        
+        return product_loader.serialize_one(db, product)
     
     def update_product(self, db: Session, handle: str, product_data: ProductUpdate) -> Optional[Dict[str, Any]]:
         """제품 정보 업데이트"""
@@ -164,7 +274,37 @@ class ProductService:
         db.commit()
         db.refresh(product)
         
-        return product.to_dict()
+        product_search_index.add_product(product)
+        invalidate_products([product.handle])
+        
+        return product_loader.serialize_one(db, product)
+    
+    def set_inventory_shards(
+        self, 
+        db: Session, 
+        handle: str, 
+        variant_id: int, 
+        shard_count: int
+    ) -> Optional[Dict[str, Any]]:
+        """변형 상품의 분할 재고 서브 카운터 수 변경 (0이면 분할 해제)"""
+        product = db.query(Product).filter(Product.handle == handle).first()
+        
+        if not product:
+            return None
+        
+        variant = db.query(ProductVariant.id).filter(
+            ProductVariant.id == variant_id,
+            ProductVariant.product_id == product.id
+        ).first()
+        if not variant:
+            raise ValueError(f"Product variant {variant_id} not found")
+        
+        inventory_shards.configure(db, variant_id, shard_count)
+        db.commit()
+        
+        invalidate_products([product.handle])
+        
+        return product_loader.serialize_one(db, product)
     
     def delete_product(self, db: Session, handle: str) -> bool:
         """제품 삭제"""
@@ -173,9 +313,15 @@ class ProductService:
         if not product:
             return False
         
+        product_id = product.id
+        collection_ids = [collection.id for collection in product.collections]
         db.delete(product)
         db.commit()
         
+        product_search_index.remove_product(product_id)
+        invalidate_products([handle])
+        invalidate_collections(db, collection_ids)
+        
         return True
     
     def get_product_recommendations(self, db: Session, handle: str, limit: int = 4) -> List[Dict[str, Any]]:
@@ -188,20 +334,29 @@ class ProductService:
             return []
         
         # 간단한 추천 로직: 같은 컬렉션의 다른 제품들
-        recommended_products = []
+        collection_ids = db.query(product_collections.c.collection_id)\
+            .filter(product_collections.c.product_id == current_product.id)
+        same_collection_ids = db.query(product_collections.c.product_id)\
+            .filter(product_collections.c.collection_id.in_(collection_ids))
         
-        if current_product.collections:
-            for collection in current_product.collections:
-                for product in collection.products:
-                    if product.id != current_product.id and len(recommended_products) < limit:
-                        recommended_products.append(product)
+        recommended_products = db.query(Product)\
+            .filter(
+                and_(
+                    Product.id.in_(same_collection_ids),
+                    Product.id != current_product.id
+                )
+            )\
+            .order_by(Product.id)\
+            .limit(limit)\
+            .all()
         
         # 컬렉션이 없거나 추천 제품이 부족한 경우 최신 제품으로 보완
         if len(recommended_products) < limit:
+            exclude_ids = [current_product.id] + [product.id for product in recommended_products]
             additional_products = db.query(Product)\
                 .filter(
                     and_(
-                        Product.id != current_product.id,
+                        Product.id.notin_(exclude_ids),
                         Product.available_for_sale == True
                     )
                 )\
@@ -210,4 +365,4 @@ class ProductService:
                 .all()
             recommended_products.extend(additional_products)
         
-        return [product.to_dict() for product in recommended_products[:limit]]
+        return product_loader.serialize(db, recommended_products[:limit])
@@ -0,0 +1,169 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.order import OrderStatus, PaymentStatus
+from models.product import Product, ProductVariant
+from models.reporting import DailySales, DailyVariantSales
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+import datetime
+
+# 대시보드용 매출 리포트 (services/sales_rollup.py의 집계 테이블만 읽음)
+
+_EXCLUDED_STATUSES = (OrderStatus.CANCELLED.value, OrderStatus.REFUNDED.value)
+
+class ReportService:
+
+    def daily_sales(
+        self,
+        db: Session,
+        start: datetime.date,
+        end: datetime.date,
+        currency_code: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """일별 매출 (통화별, 상태별 내역 포함)"""
+        query = db.query(
+            DailySales.day,
+            DailySales.currency_code,
+            DailySales.status,
+            DailySales.payment_status,
+            func.sum(DailySales.order_count),
+            func.sum(DailySales.total_amount)
+        )\
+            .filter(DailySales.day >= start, DailySales.day <= end)
+        if currency_code:
+            query = query.filter(DailySales.currency_code == currency_code)
+        rows = query.group_by(
+            DailySales.day, DailySales.currency_code, DailySales.status, DailySales.payment_status
+        ).all()
+
+        days: Dict[Any, Dict[str, Any]] = {}
+        for day, currency, status, payment_status, order_count, total_amount in rows:
+            order_count = int(order_count or 0)
+            total_amount = Decimal(str(total_amount or 0))
+            if order_count == 0:
+                continue
+            entry = days.setdefault((day, currency), {
+                'day': day.isoformat(),
+                'currency_code': currency,
+                'order_count': 0,
+                'gross_amount': Decimal(0),
+                'net_order_count': 0,
+                'net_amount': Decimal(0),
+                'paid_amount': Decimal(0),
+                'statuses': []
+            })
+            entry['order_count'] += order_count
+            entry['gross_amount'] += total_amount
+            if status not in _EXCLUDED_STATUSES and payment_status != PaymentStatus.REFUNDED.value:
+                entry['net_order_count'] += order_count
+                entry['net_amount'] += total_amount
+                if payment_status == PaymentStatus.PAID.value:
+                    entry['paid_amount'] += total_amount
+            entry['statuses'].append({
+                'status': status,
+                'payment_status': payment_status,
+                'order_count': order_count,
+                'total_amount': total_amount
+            })
+
+        return [days[key] for key in sorted(days)]
+
+    def top_variants(
+        self,
+        db: Session,
+        start: datetime.date,
+        end: datetime.date,
+        limit: int = 10,
+        currency_code: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """기간 내 판매 수량 상위 변형 상품"""
+        units = func.sum(DailyVariantSales.units).label('units')
+        query = db.query(
+            DailyVariantSales.variant_id,
+            func.max(DailyVariantSales.product_id),
+            units,
+            func.sum(DailyVariantSales.order_count),
+            func.sum(DailyVariantSales.revenue)
+        )\
+            .filter(DailyVariantSales.day >= start, DailyVariantSales.day <= end)
+        if currency_code:
+            query = query.filter(DailyVariantSales.currency_code == currency_code)
+        rows = query.group_by(DailyVariantSales.variant_id)\
+            .having(units > 0)\
+            .order_by(units.desc(), DailyVariantSales.variant_id)\
+            .limit(limit)\
+            .all()
+
+        titles = {}
+        if rows:
+            titles = {
+                variant_id: (variant_title, product_title, handle)
+                for variant_id, variant_title, product_title, handle in db.query(
+                    ProductVariant.id, ProductVariant.title, Product.title, Product.handle
+                )
+                .outerjoin(Product, Product.id == ProductVariant.product_id)
+                .filter(ProductVariant.id.in_([row[0] for row in rows]))
+            }
+
+        results = []
+        for variant_id, product_id, units, order_count, revenue in rows:
+            variant_title, product_title, handle = titles.get(variant_id, (None, None, None))
+            results.append({
+                'variant_id': variant_id,
+                'product_id': product_id,
+                'variant_title': variant_title,
+                'product_title': product_title,
+                'product_handle': handle,
+                'units': int(units or 0),
+                'order_count': int(order_count or 0),
+                'revenue': float(revenue or 0)
+            })
+        return results
+
+    def top_products(
+        self,
+        db: Session,
+        start: datetime.date,
+        end: datetime.date,
+        limit: int = 10,
+        currency_code: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """기간 내 판매 수량 상위 제품 (변형 상품 집계를 제품별로 합침)"""
+        units = func.sum(DailyVariantSales.units).label('units')
+        query = db.query(
+            DailyVariantSales.product_id,
+            units,
+            func.sum(DailyVariantSales.revenue)
+        )\
+            .filter(
+                DailyVariantSales.day >= start,
+                DailyVariantSales.day <= end,
+                DailyVariantSales.product_id.isnot(None)
+            )
+        if currency_code:
+            query = query.filter(DailyVariantSales.currency_code == currency_code)
+        rows = query.group_by(DailyVariantSales.product_id)\
+            .having(units > 0)\
+            .order_by(units.desc(), DailyVariantSales.product_id)\
+            .limit(limit)\
+            .all()
+
+        titles = {}
+        if rows:
+            titles = {
+                product_id: (title, handle)
+                for product_id, title, handle in db.query(Product.id, Product.title, Product.handle)
+                .filter(Product.id.in_([row[0] for row in rows]))
+            }
+
+        results = []
+        for product_id, units, revenue in rows:
+            title, handle = titles.get(product_id, (None, None))
+            results.append({
+                'product_id': product_id,
+                'title': title,
+                'handle': handle,
+                'units': int(units or 0),
+                'revenue': float(revenue or 0)
+            })
+        return results
@@ -0,0 +1,348 @@
+from sqlalchemy import and_, delete, distinct, func, insert
+from sqlalchemy.orm import Session
+from models.order import Order, OrderItem, OrderStatus, PaymentStatus
+from models.order_archive import ArchivedOrder, ArchivedOrderItem, OrderArchiveIndex
+from models.product import ProductVariant
+from models.reporting import DailySales, DailyVariantSales
+from database.upsert import upsert
+from core.config import settings
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import datetime
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+# 매출 집계 테이블 (daily_sales, daily_variant_sales)
+#
+# 리포트가 orders/order_items를 훑지 않도록 OrderService가 주문을 만들거나 상태를 바꿀 때
+# 같은 트랜잭션에서 집계 행을 증감한다 (upsert 한두 번).
+# - daily_sales: 주문일/주문 상태/결제 상태/통화별 주문 수와 금액. 상태가 바뀌면 이전 키에서 빼고 새 키에 더한다.
+# - daily_variant_sales: 취소/환불되지 않은 주문의 변형 상품별 수량/매출. 주문이 취소/환불되면 뺀다.
+# 날짜는 주문 생성일(UTC) 기준이라 언제 상태가 바뀌어도 orders를 주문일로 GROUP BY 한 결과와 같다.
+#
+# 같은 날/같은 상태의 행은 모든 결제가 갱신하므로, 증감할 때마다 bucket을 무작위로 골라 잠금을 나누고
+# 조회할 때 합친다 (감소가 다른 bucket에 들어가 한 bucket이 음수가 될 수 있음).
+#
+# 집계를 처음 만들거나 어긋난 경우 rebuild_day/backfill로 주문(보관된 주문 포함)에서 하루씩 다시 만든다:
+#   python -m services.sales_rollup [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+
+_EXCLUDED_STATUSES = (OrderStatus.CANCELLED, OrderStatus.REFUNDED)
+
+OrderState = Tuple[Optional[OrderStatus], Optional[PaymentStatus]]
+RollupItem = Tuple[int, Optional[int], int, Any]  # (변형 상품 ID, 제품 ID, 수량, 금액)
+
+def counts_toward_sales(status: Optional[OrderStatus], payment_status: Optional[PaymentStatus]) -> bool:
+    """변형 상품 판매 집계에 포함되는 주문 상태인지 (취소/환불 제외)"""
+    return status not in _EXCLUDED_STATUSES and payment_status != PaymentStatus.REFUNDED
+
+def _value(status) -> str:
+    return status.value if status is not None else ""
+
+def _decimal(amount) -> Decimal:
+    return Decimal(str(amount or 0))
+
+def _day_range(day: datetime.date) -> Tuple[datetime.datetime, datetime.datetime]:
+    start = datetime.datetime.combine(day, datetime.time.min)
+    return start, start + datetime.timedelta(days=1)
+
+class SalesRollup:
+
+    def __init__(self, enabled: bool = True, buckets: int = 8):
+        self.enabled = enabled
+        self.buckets = max(buckets, 1)
+
+    def _bucket(self) -> int:
+        return random.randrange(self.buckets)
+
+    def _add_orders(self, db: Session, order: Order, deltas: List[Tuple[OrderState, int]]):
+        """주문 집계 증감 ((주문 상태, 결제 상태), +1/-1) 목록"""
+        day = order.created_at.date()
+        currency_code = order.currency_code or ""
+        subtotal_amount = _decimal(order.subtotal_amount)
+        total_amount = _decimal(order.total_amount)
+        self._upsert_sales(db, [
+            {
+                'day': day,
+                'status': _value(status),
+                'payment_status': _value(payment_status),
+                'currency_code': currency_code,
+                'bucket': self._bucket(),
+                'order_count': sign,
+                'subtotal_amount': subtotal_amount * sign,
+                'total_amount': total_amount * sign
+            }
+            for (status, payment_status), sign in deltas
+        ])
+
+    def _upsert_sales(self, db: Session, rows: List[Dict[str, Any]]):
+        """daily_sales 행 증감 (키가 같으면 더함)"""
+        table = DailySales.__table__
+        upsert(
+            db,
+            table,
+            rows,
+            ['day', 'status', 'payment_status', 'currency_code', 'bucket'],
+            lambda inserted: {
+                'order_count': table.c.order_count + inserted.order_count,
+                'subtotal_amount': table.c.subtotal_amount + inserted.subtotal_amount,
+                'total_amount': table.c.total_amount + inserted.total_amount
+            }
+        )
+
+    def _add_items(self, db: Session, order: Order, items: Iterable[RollupItem], sign: int):
+        """변형 상품 판매 집계 증감 (같은 변형 상품은 합쳐 한 행으로)"""
+        merged: Dict[int, List[Any]] = {}
+        for variant_id, product_id, quantity, amount in items:
+            row = merged.setdefault(variant_id, [product_id, 0, Decimal(0)])
+            row[1] += quantity
+            row[2] += _decimal(amount)
+        if not merged:
+            return
+
+        table = DailyVariantSales.__table__
+        day = order.created_at.date()
+        currency_code = order.currency_code or ""
+        bucket = self._bucket()
+        upsert(
+            db,
+            table,
+            [
+                {
+                    'day': day,
+                    'variant_id': variant_id,
+                    'currency_code': currency_code,
+                    'bucket': bucket,
+                    'product_id': product_id,
+                    'units': units * sign,
+                    'order_count': sign,
+                    'revenue': revenue * sign
+                }
+                for variant_id, (product_id, units, revenue) in sorted(merged.items())
+            ],
+            ['day', 'variant_id', 'currency_code', 'bucket'],
+            lambda inserted: {
+                'units': table.c.units + inserted.units,
+                'order_count': table.c.order_count + inserted.order_count,
+                'revenue': table.c.revenue + inserted.revenue
+            }
+        )
+
+    def order_created(self, db: Session, order: Order, items: Iterable[RollupItem]):
+        """새 주문 반영 (커밋은 호출자가 한다)"""
+        if not self.enabled:
+            return
+        self._add_orders(db, order, [((order.status, order.payment_status), 1)])
+        if counts_toward_sales(order.status, order.payment_status):
+            self._add_items(db, order, items, 1)
+
+    def order_changed(self, db: Session, order: Order, previous: OrderState, current: OrderState):
+        """주문 상태/결제 상태 변경 반영 (커밋은 호출자가 한다)"""
+        if not self.enabled or previous == current:
+            return
+        self._add_orders(db, order, [(previous, -1), (current, 1)])
+
+        was_counted = counts_toward_sales(*previous)
+        if was_counted == counts_toward_sales(*current):
+            return
+        items = db.query(
+            OrderItem.variant_id,
+            ProductVariant.product_id,
+            OrderItem.quantity,
+            OrderItem.total_amount
+        )\
+            .outerjoin(ProductVariant, ProductVariant.id == OrderItem.variant_id)\
+            .filter(OrderItem.order_id == order.id)\
+            .all()
+        self._add_items(db, order, items, -1 if was_counted else 1)
+
+    def orders_moved(self, db: Session, orders: Iterable[Any], status: OrderStatus):
+        """여러 주문의 상태를 status로 바꾼 변경 반영 (커밋은 호출자가 한다)
+
+        orders는 변경 전 값(created_at, status, payment_status, currency_code, subtotal_amount, total_amount)을
+        가진 행. 주문별로 나누지 않고 키별로 합쳐 upsert 한 번으로 반영한다. 일괄 상태 변경은 취소/환불을
+        다루지 않으므로 판매 집계 포함 여부가 바뀌지 않아 daily_variant_sales는 그대로 둔다.
+        """
+        if not self.enabled:
+            return
+        merged: Dict[Tuple[datetime.date, str, str, str], List[Any]] = {}
+        for order in orders:
+            if order.status == status:
+                continue
+            subtotal_amount = _decimal(order.subtotal_amount)
+            total_amount = _decimal(order.total_amount)
+            for order_status, sign in ((order.status, -1), (status, 1)):
+                row = merged.setdefault(
+                    (order.created_at.date(), _value(order_status), _value(order.payment_status), order.currency_code or ""),
+                    [0, Decimal(0), Decimal(0)]
+                )
+                row[0] += sign
+                row[1] += subtotal_amount * sign
+                row[2] += total_amount * sign
+        if not merged:
+            return
+
+        bucket = self._bucket()
+        self._upsert_sales(db, [
+            {
+                'day': day,
+                'status': order_status,
+                'payment_status': payment_status,
+                'currency_code': currency_code,
+                'bucket': bucket,
+                'order_count': count,
+                'subtotal_amount': subtotal_amount,
+                'total_amount': total_amount
+            }
+            # 키 순서로 써서 동시에 실행되는 일괄 변경끼리 잠금 순서를 맞춤
+            for (day, order_status, payment_status, currency_code), (count, subtotal_amount, total_amount)
+            in sorted(merged.items())
+        ])
+
+    def _aggregate_day(self, db: Session, order_model, item_model, start: datetime.datetime, end: datetime.datetime):
+        """주문 테이블 하나(orders 또는 orders_archive)의 하루치 집계"""
+        in_day = and_(order_model.created_at >= start, order_model.created_at < end)
+
+        orders = db.query(
+            order_model.status,
+            order_model.payment_status,
+            order_model.currency_code,
+            func.count(order_model.id),
+            func.sum(order_model.subtotal_amount),
+            func.sum(order_model.total_amount)
+        )\
+            .filter(in_day)\
+            .group_by(order_model.status, order_model.payment_status, order_model.currency_code)\
+            .all()
+
+        items = db.query(
+            item_model.variant_id,
+            ProductVariant.product_id,
+            order_model.currency_code,
+            func.sum(item_model.quantity),
+            func.count(distinct(item_model.order_id)),
+            func.sum(item_model.total_amount)
+        )\
+            .join(order_model, order_model.id == item_model.order_id)\
+            .outerjoin(ProductVariant, ProductVariant.id == item_model.variant_id)\
+            .filter(
+                in_day,
+                order_model.status.notin_(_EXCLUDED_STATUSES),
+                order_model.payment_status != PaymentStatus.REFUNDED
+            )\
+            .group_by(item_model.variant_id, ProductVariant.product_id, order_model.currency_code)\
+            .all()
+        return orders, items
+
+    def rebuild_day(self, db: Session, day: datetime.date) -> int:
+        """하루치 집계를 주문(보관된 주문 포함)에서 다시 만들고 주문 수 반환 (커밋은 호출자가 한다)
+
+        집계 행을 지우고 다시 쓰는 사이에 들어온 주문이 빠지지 않도록 지난 날짜에 쓰거나
+        주문이 적은 시간에 실행한다.
+        """
+        start, end = _day_range(day)
+        sales: Dict[Tuple[str, str, str], List[Any]] = {}
+        variants: Dict[Tuple[int, str], List[Any]] = {}
+        for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+            orders, items = self._aggregate_day(db, order_model, item_model, start, end)
+            for status, payment_status, currency_code, count, subtotal_amount, total_amount in orders:
+                row = sales.setdefault(
+                    (_value(status), _value(payment_status), currency_code or ""), [0, Decimal(0), Decimal(0)]
+                )
+                row[0] += count
+                row[1] += _decimal(subtotal_amount)
+                row[2] += _decimal(total_amount)
+            for variant_id, product_id, currency_code, units, order_count, revenue in items:
+                row = variants.setdefault((variant_id, currency_code or ""), [product_id, 0, 0, Decimal(0)])
+                row[1] += int(units or 0)
+                row[2] += order_count
+                row[3] += _decimal(revenue)
+
+        sales_table = DailySales.__table__
+        variant_table = DailyVariantSales.__table__
+        db.execute(delete(sales_table).where(sales_table.c.day == day))
+        db.execute(delete(variant_table).where(variant_table.c.day == day))
+
+        if sales:
+            db.execute(insert(sales_table), [
+                {
+                    'day': day,
+                    'status': status,
+                    'payment_status': payment_status,
+                    'currency_code': currency_code,
+                    'bucket': 0,
+                    'order_count': count,
+                    'subtotal_amount': subtotal_amount,
+                    'total_amount': total_amount
+                }
+                for (status, payment_status, currency_code), (count, subtotal_amount, total_amount) in sales.items()
+            ])
+        if variants:
+            db.execute(insert(variant_table), [
+                {
+                    'day': day,
+                    'variant_id': variant_id,
+                    'currency_code': currency_code,
+                    'bucket': 0,
+                    'product_id': product_id,
+                    'units': units,
+                    'order_count': order_count,
+                    'revenue': revenue
+                }
+                for (variant_id, currency_code), (product_id, units, order_count, revenue) in variants.items()
+            ])
+        return sum(count for count, _, _ in sales.values())
+
+    def backfill(
+        self,
+        session_factory: Callable[[], Session],
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None
+    ) -> int:
+        """start~end(포함) 집계를 하루씩 다시 만들고 처리한 날 수 반환 (하루마다 커밋)"""
+        db = session_factory()
+        try:
+            if start is None:
+                firsts = [
+                    first for first in (
+                        db.query(func.min(Order.created_at)).scalar(),
+                        db.query(func.min(OrderArchiveIndex.created_at)).scalar()
+                    ) if first is not None
+                ]
+                if not firsts:
+                    return 0
+                start = min(firsts).date()
+            if end is None:
+                end = datetime.datetime.utcnow().date()
+
+            days = 0
+            day = start
+            while day <= end:
+                try:
+                    count = self.rebuild_day(db, day)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+                logger.info(f"Rebuilt sales rollup for {day} ({count} orders)")
+                days += 1
+                day += datetime.timedelta(days=1)
+            return days
+        finally:
+            db.close()
+
+sales_rollup = SalesRollup(settings.REPORTING_ROLLUPS_ENABLED, settings.REPORTING_ROLLUP_BUCKETS)
+
+if __name__ == "__main__":
+    # 집계 다시 만들기: python -m services.sales_rollup [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+    import argparse
+    from database.connection import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild daily sales rollup tables from orders")
+    parser.add_argument("--start", type=datetime.date.fromisoformat, help="first day (default: first order, archived included)")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="last day (default: today, UTC)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
+    print(sales_rollup.backfill(SessionLocal, args.start, args.end))
@@ -0,0 +1,355 @@
+from sqlalchemy.orm import Session
+from models.product import Product
+from core.config import settings
+from typing import Callable, List, Optional, Dict, Set, Tuple, Iterable
+from bisect import bisect_left
+import math
+import os
+import pickle
+import re
+import threading
+import time
+import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 한글 음절 / 영문·숫자 단어 토큰
+TOKEN_PATTERN = re.compile(r'[가-힣]+|[a-z0-9]+')
+
+# 필드별 가중치 (BM25F 방식으로 단어 빈도에 곱함)
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'vendor': 2.0,
+    'product_type': 2.0,
+    'description': 1.0,
+}
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+INDEX_FORMAT_VERSION = 1
+
+def _is_hangul(char: str) -> bool:
+    return '가' <= char <= '힣'
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """검색용 토큰화 - 한글은 음절 바이그램, 영문/숫자는 단어 단위"""
+    if not text:
+        return []
+
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        run = match.group()
+        if _is_hangul(run[0]):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+class ProductSearchIndex:
+    """제품 전문 검색용 인메모리 역색인
+
+    제목/설명/제조사/제품 타입을 토큰화해 BM25로 순위를 매긴다.
+    제품 생성/수정/삭제 시 증분 갱신되며, 디스크에 저장해 재시작 시 재구축을 피한다.
+    다른 워커의 변경분은 백그라운드 스레드가 주기적으로 동기화한다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._reset()
+        self.ready = False
+        self._last_sync = 0.0
+        # 동기화 중 직접 갱신된 제품 (조회해 둔 행으로 덮어쓰지 않음)
+        self._touched: Optional[Set[int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _reset(self):
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.doc_terms: Dict[int, List[str]] = {}
+        self.doc_lengths: Dict[int, float] = {}
+        self.total_length = 0.0
+        # 마지막으로 반영한 제품 updated_at (재시작/다른 워커 변경분 동기화 기준)
+        self.watermark: Optional[datetime.datetime] = None
+        self._vocabulary: Optional[List[str]] = None
+
+    # 색인
+
+    def _document_terms(self, fields: Dict[str, Optional[str]]) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(fields.get(field)):
+                terms[token] = terms.get(token, 0.0) + weight
+        return terms
+
+    def _remove_locked(self, product_id: int):
+        terms = self.doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(product_id, None)
+            if not docs:
+                del self.postings[term]
+                self._vocabulary = None
+        self.total_length -= self.doc_lengths.pop(product_id, 0.0)
+
+    def _touch_locked(self, product_id: int):
+        if self._touched is not None:
+            self._touched.add(product_id)
+
+    def _add_locked(self, product_id: int, fields: Dict[str, Optional[str]],
+                    updated_at: Optional[datetime.datetime] = None):
+        self._remove_locked(product_id)
+
+        terms = self._document_terms(fields)
+        for term, frequency in terms.items():
+            docs = self.postings.get(term)
+            if docs is None:
+                docs = self.postings[term] = {}
+                self._vocabulary = None
+            docs[product_id] = frequency
+
+        length = sum(terms.values())
+        self.doc_terms[product_id] = list(terms)
+        self.doc_lengths[product_id] = length
+        self.total_length += length
+
+        if updated_at and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def add_product(self, product: Product):
+        """제품 색인 (이미 색인된 경우 갱신)"""
+        with self._lock:
+            self._touch_locked(product.id)
+            self._add_locked(product.id, {
+                'title': product.title,
+                'description': product.description,
+                'vendor': product.vendor,
+                'product_type': product.product_type,
+            }, product.updated_at)
+
+    def remove_product(self, product_id: int):
+        """제품 색인 제거"""
+        with self._lock:
+            self._touch_locked(product_id)
+            self._remove_locked(product_id)
+
+    def _index_rows(self, rows: Iterable, skip: Set[int] = frozenset()) -> int:
+        count = 0
+        with self._lock:
+            for row in rows:
+                if row.id in skip:
+                    continue
+                self._add_locked(row.id, {
+                    'title': row.title,
+                    'description': row.description,
+                    'vendor': row.vendor,
+                    'product_type': row.product_type,
+                }, row.updated_at)
+                count += 1
+        return count
+
+    def _product_rows(self, db: Session):
+        return db.query(
+            Product.id,
+            Product.title,
+            Product.description,
+            Product.vendor,
+            Product.product_type,
+            Product.updated_at
+        )
+
+    def rebuild(self, db: Session) -> int:
+        """데이터베이스에서 전체 색인 재구축"""
+        with self._lock:
+            self._reset()
+            count = self._index_rows(self._product_rows(db).yield_per(1000))
+            self.ready = True
+            self._last_sync = time.monotonic()
+        logger.info(f"Search index rebuilt with {count} products")
+        return count
+
+    def sync(self, db: Session) -> int:
+        """워터마크 이후 변경된 제품을 반영하고 삭제된 제품을 제거
+
+        데이터베이스 조회는 색인 잠금 밖에서 하고 반영할 때만 잠가 검색을 막지 않는다.
+        """
+        with self._lock:
+            watermark = self.watermark
+            indexed_ids = set(self.doc_terms)
+            self._touched = set()
+
+        try:
+            query = self._product_rows(db)
+            if watermark is not None:
+                # 같은 초에 수정된 행을 놓치지 않도록 워터마크 시각부터 다시 반영
+                query = query.filter(Product.updated_at >= watermark)
+            rows = query.all()
+            existing_ids = {product_id for (product_id,) in db.query(Product.id).yield_per(5000)}
+
+            with self._lock:
+                count = self._index_rows(rows, skip=self._touched)
+                for product_id in indexed_ids - existing_ids - self._touched:
+                    self._remove_locked(product_id)
+                self._last_sync = time.monotonic()
+        finally:
+            with self._lock:
+                self._touched = None
+        return count
+
+    def start(self, session_factory: Callable[[], Session], interval: float):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(session_factory, interval), daemon=True, name="search-index-sync"
+        )
+        self._thread.start()
+
+    def _run(self, session_factory: Callable[[], Session], interval: float):
+        while not self._stop.wait(interval):
+            db = session_factory()
+            try:
+                self.sync(db)
+            except Exception as e:
+                logger.error(f"Search index sync failed: {e}")
+            finally:
+                db.close()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # 검색
+
+    def _expand(self, token: str) -> List[str]:
+        """질의 토큰을 색인 용어로 확장
+
+        - 한글 한 글자: 해당 글자를 포함한 바이그램
+        - 영문/숫자: 접두어가 일치하는 단어
+        """
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+
+        if _is_hangul(token[0]):
+            if len(token) > 1:
+                return [token] if token in self.postings else []
+            return [term for term in self._vocabulary if token in term and _is_hangul(term[0])]
+
+        terms = []
+        position = bisect_left(self._vocabulary, token)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(token):
+            terms.append(self._vocabulary[position])
+            position += 1
+        return terms
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """질의어와 모든 토큰이 일치하는 제품을 (제품 ID, 점수) 점수 내림차순으로 반환"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            document_count = len(self.doc_lengths)
+            if document_count == 0:
+                return []
+            average_length = self.total_length / document_count
+
+            scores: Optional[Dict[int, float]] = None
+            for token in tokens:
+                token_scores: Dict[int, float] = {}
+                for term in self._expand(token):
+                    docs = self.postings[term]
+                    idf = math.log(1 + (document_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                    # 접두어 확장 용어는 정확히 일치하는 용어보다 낮은 가중치
+                    boost = 1.0 if term == token else 0.5
+                    for product_id, frequency in docs.items():
+                        if scores is not None and product_id not in scores:
+                            continue
+                        length_norm = 1 - BM25_B + BM25_B * self.doc_lengths[product_id] / average_length
+                        score = boost * idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                        if score > token_scores.get(product_id, 0.0):
+                            token_scores[product_id] = score
+
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        product_id: scores[product_id] + score
+                        for product_id, score in token_scores.items()
+                    }
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+    # 저장/로드
+
+    def save(self, path: Optional[str] = None):
+        """색인을 디스크에 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = path or self.path
+        if not path:
+            return
+
+        with self._lock:
+            data = {
+                'version': INDEX_FORMAT_VERSION,
+                'postings': self.postings,
+                'doc_terms': self.doc_terms,
+                'doc_lengths': self.doc_lengths,
+                'total_length': self.total_length,
+                'watermark': self.watermark,
+            }
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """디스크에서 색인 로드"""
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return False
+
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load search index: {e}")
+            return False
+
+        if data.get('version') != INDEX_FORMAT_VERSION:
+            return False
+
+        with self._lock:
+            self._reset()
+            self.postings = data['postings']
+            self.doc_terms = data['doc_terms']
+            self.doc_lengths = data['doc_lengths']
+            self.total_length = data['total_length']
+            self.watermark = data['watermark']
+            self.ready = True
+        return True
+
+    def warm_up(self, db: Session):
+        """저장된 색인을 로드해 변경분만 반영하고, 없으면 전체 재구축"""
+        if self.load():
+            count = self.sync(db)
+            logger.info(f"Search index loaded from {self.path} ({count} products synced)")
+        else:
+            self.rebuild(db)
+        self.save()
+
+product_search_index = ProductSearchIndex(settings.SEARCH_INDEX_PATH)
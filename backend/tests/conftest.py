@@ -0,0 +1,79 @@
+from decimal import Decimal
+import os
+import sys
+import tempfile
+
+import pytest
+
+# 테스트 설정 (앱 모듈을 import 하기 전에 환경 변수로 지정)
+# 기본은 임시 SQLite 파일 - 스레드풀/여러 세션이 같은 DB를 보도록 메모리 DB는 쓰지 않음
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix="commerce-tests-")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TEST_DIR}/test.db")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("SEARCH_INDEX_PATH", f"{TEST_DIR}/search_index.pkl")
+os.environ.setdefault("QUERY_BUDGET_MODE", "strict")
+sys.path.insert(0, BACKEND_DIR)
+
+from database.connection import Base, SessionLocal, engine  # noqa: E402
+import models  # noqa: E402,F401
+
+@pytest.fixture
+def tables():
+    """테스트마다 빈 테이블"""
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def db(tables):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client(tables):
+    from fastapi.testclient import TestClient
+    from core.cache import cache
+    import main
+
+    # 이전 테스트의 제품 문서가 남지 않도록 캐시 비움
+    if cache.l1 is not None:
+        cache.l1.clear()
+    if cache.l2 is not None and hasattr(cache.l2, "_data"):
+        cache.l2._data.clear()
+    return TestClient(main.app)
+
+def create_variant(db, inventory_quantity: int, handle: str = "test-product", price: str = "10.00"):
+    """제품 하나와 변형 상품 하나를 만들고 변형 상품 반환"""
+    from models.product import Product, ProductVariant
+
+    product = Product(handle=handle, title=handle)
+    db.add(product)
+    db.flush()
+    variant = ProductVariant(
+        product_id=product.id,
+        title="Default",
+        price=Decimal(price),
+        sku=f"{handle}-sku",
+        inventory_quantity=inventory_quantity
+    )
+    db.add(variant)
+    db.commit()
+    return variant
+
+def create_order(db, variant, quantity: int = 1) -> str:
+    """변형 상품 하나를 담은 장바구니로 주문을 만들고 주문 ID 반환"""
+    from models.cart import Cart, CartItem
+    from services.order_service import OrderService
+
+    cart = Cart(session_id=f"session-{variant.id}-{db.query(Cart).count()}")
+    db.add(cart)
+    db.flush()
+    db.add(CartItem(cart_id=cart.id, variant_id=variant.id, quantity=quantity))
+    db.commit()
+    return OrderService().create_order_from_cart(db, cart.id, "buyer@example.com", "Seoul")['id']
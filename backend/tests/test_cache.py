@@ -0,0 +1,96 @@
+from core.cache import LRUCache, MemoryStore, TwoTierCache
+
+def _worker(store, stale_window: float = 0) -> TwoTierCache:
+    """같은 L2(인메모리 대체 구현)를 공유하는 워커 하나의 캐시"""
+    return TwoTierCache(LRUCache(max_entries=100, ttl=30), store, ttl=3600, stale_window=stale_window)
+
+def test_lru_evicts_least_recently_used_and_counts_stats():
+    l1 = LRUCache(max_entries=2, ttl=30)
+    l1.set("a", 1)
+    l1.set("b", 2)
+    assert l1.get("a") == (True, 1)
+    l1.set("c", 3)
+
+    assert l1.get("b") == (False, None)
+    assert l1.get("a") == (True, 1)
+    assert l1.stats.evictions == 1
+    assert l1.stats.hits == 2
+    assert l1.stats.misses == 1
+
+def test_get_or_load_fills_shared_l2_for_other_workers():
+    store = MemoryStore()
+    worker_a, worker_b = _worker(store), _worker(store)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return {"handle": "shirt", "price": "10.00"}
+
+    assert worker_a.get_or_load("product:shirt", load) == {"handle": "shirt", "price": "10.00"}
+    assert worker_a.get_or_load("product:shirt", load) == {"handle": "shirt", "price": "10.00"}
+    assert worker_b.get_or_load("product:shirt", load) == {"handle": "shirt", "price": "10.00"}
+
+    assert len(loads) == 1
+    assert worker_a.l1.stats.hits == 1
+    assert worker_b.l2_stats.hits == 1
+
+def test_invalidate_on_one_worker_hides_l2_value_from_others():
+    store = MemoryStore()
+    worker_a, worker_b = _worker(store), _worker(store)
+    worker_a.get_or_load("product:shirt", lambda: {"price": "10.00"})
+
+    worker_b.invalidate(["product:shirt"])
+
+    assert worker_b.get("product:shirt") == (False, None)
+    assert worker_b.get_or_load("product:shirt", lambda: {"price": "12.00"}) == {"price": "12.00"}
+
+def test_load_racing_with_invalidation_on_another_worker_is_not_served():
+    store = MemoryStore()
+    worker_a, worker_b, worker_c = _worker(store), _worker(store), _worker(store)
+
+    def stale_load():
+        # A가 DB에서 읽은 뒤, 저장하기 전에 B가 변경을 커밋하고 무효화
+        value = {"price": "10.00"}
+        worker_b.invalidate(["product:shirt"])
+        return value
+
+    assert worker_a.get_or_load("product:shirt", stale_load) == {"price": "10.00"}
+
+    # A가 쓴 값은 이전 세대 키에 있어 다른 워커는 새로 읽음
+    assert worker_c.get_or_load("product:shirt", lambda: {"price": "12.00"}) == {"price": "12.00"}
+    assert worker_b.get_or_load("product:shirt", lambda: {"price": "99.00"}) == {"price": "12.00"}
+
+def test_recent_invalidation_on_another_worker_is_not_cached_within_replica_lag():
+    store = MemoryStore()
+    worker_a, worker_b = _worker(store, stale_window=5), _worker(store, stale_window=5)
+    worker_b.invalidate(["product:shirt"])
+
+    # 복제본이 아직 따라오지 못했을 수 있으므로 읽은 값을 저장하지 않음
+    worker_a.get_or_load("product:shirt", lambda: {"price": "10.00"})
+
+    assert worker_a.get("product:shirt") == (False, None)
+    assert worker_b.get("product:shirt") == (False, None)
+
+def test_none_is_not_cached_and_disabled_cache_always_loads():
+    store = MemoryStore()
+    worker = _worker(store)
+    assert worker.get_or_load("product:missing", lambda: None) is None
+    assert worker.get("product:missing") == (False, None)
+
+    disabled = TwoTierCache(None, None)
+    loads = []
+    disabled.get_or_load("product:shirt", lambda: loads.append(1) or {"price": "10.00"})
+    disabled.get_or_load("product:shirt", lambda: loads.append(1) or {"price": "10.00"})
+    assert len(loads) == 2
+
+def test_product_update_invalidates_cached_document(client):
+    client.post("/api/v1/products/", json={
+        "handle": "shirt",
+        "title": "Shirt",
+        "variants": [{"title": "M", "price": "10.00", "sku": "shirt-m", "inventory_quantity": 5}]
+    })
+    assert client.get("/api/v1/products/shirt").json()["title"] == "Shirt"
+
+    client.put("/api/v1/products/shirt", json={"title": "Linen Shirt"})
+
+    assert client.get("/api/v1/products/shirt").json()["title"] == "Linen Shirt"
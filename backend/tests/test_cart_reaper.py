@@ -0,0 +1,49 @@
+import datetime
+
+from conftest import create_variant
+from database.connection import SessionLocal
+from models.cart import Cart, CartItem
+from models.inventory import InventoryReservation
+from models.product import ProductVariant
+from services.cart_reaper import CartReaper
+from services.inventory_service import inventory_service
+
+def _cart_with_hold(db, variant_id: int, quantity: int, idle: datetime.timedelta) -> str:
+    updated_at = datetime.datetime.utcnow() - idle
+    cart = Cart(session_id=f"session-{idle.total_seconds()}", created_at=updated_at, updated_at=updated_at)
+    db.add(cart)
+    db.flush()
+    db.add(CartItem(cart_id=cart.id, variant_id=variant_id, quantity=quantity))
+    inventory_service.reserve(db, cart.id, {variant_id: quantity})
+    db.commit()
+    # 아이템 추가로 바뀐 수정 시각을 다시 과거로
+    db.query(Cart).filter(Cart.id == cart.id).update({'updated_at': updated_at})
+    db.commit()
+    return cart.id
+
+def test_reaper_releases_inventory_holds_of_deleted_carts(db):
+    variant = create_variant(db, inventory_quantity=10)
+    idle = _cart_with_hold(db, variant.id, 3, datetime.timedelta(days=2))
+    active = _cart_with_hold(db, variant.id, 2, datetime.timedelta(minutes=1))
+    db.refresh(variant)
+    assert variant.reserved_quantity == 5
+
+    totals = CartReaper(idle_ttl=24 * 3600, pause=0).run_once(SessionLocal)
+    assert totals == {'carts': 1, 'cart_items': 1, 'inventory_reservations': 1}
+
+    db.expire_all()
+    assert db.get(Cart, idle) is None
+    assert db.get(Cart, active) is not None
+    assert [r.cart_id for r in db.query(InventoryReservation).all()] == [active]
+    assert db.get(ProductVariant, variant.id).reserved_quantity == 2
+
+def test_dry_run_counts_holds_without_releasing(db):
+    variant = create_variant(db, inventory_quantity=10)
+    _cart_with_hold(db, variant.id, 3, datetime.timedelta(days=2))
+
+    totals = CartReaper(idle_ttl=24 * 3600, pause=0, dry_run=True).run_once(SessionLocal)
+    assert totals == {'carts': 1, 'cart_items': 1, 'inventory_reservations': 1}
+
+    db.expire_all()
+    assert db.query(InventoryReservation).count() == 1
+    assert db.get(ProductVariant, variant.id).reserved_quantity == 3
@@ -0,0 +1,26 @@
+import pytest
+
+from conftest import create_variant
+from models.cart import Cart, CartItem
+from schemas.cart import CartItemUpdate
+from services.cart_service import CartService
+
+def test_changing_item_to_variant_already_in_cart_is_rejected(db):
+    first = create_variant(db, inventory_quantity=10, handle="first")
+    second = create_variant(db, inventory_quantity=10, handle="second")
+    cart = Cart(session_id="session-duplicate")
+    db.add(cart)
+    db.flush()
+    item = CartItem(cart_id=cart.id, variant_id=first.id, quantity=1)
+    db.add_all([item, CartItem(cart_id=cart.id, variant_id=second.id, quantity=2)])
+    db.commit()
+
+    with pytest.raises(ValueError, match="already in cart"):
+        CartService().update_cart_items(db, cart.id, [CartItemUpdate(id=item.id, variant_id=second.id, quantity=3)])
+    db.rollback()
+
+    db.expire_all()
+    assert sorted(
+        (cart_item.variant_id, cart_item.quantity)
+        for cart_item in db.query(CartItem).filter(CartItem.cart_id == cart.id)
+    ) == [(first.id, 1), (second.id, 2)]
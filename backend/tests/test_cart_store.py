@@ -0,0 +1,99 @@
+import pytest
+
+from conftest import create_variant
+from database.connection import SessionLocal
+from models.cart import Cart, CartItem
+from services.cart_store import HotCartStore, MemoryCartBackend, utc_timestamp
+
+@pytest.fixture
+def store(tables):
+    """프로세스 내 저장소를 쓰는 핫 스토어 (플러셔 스레드 없이 flush 직접 호출)"""
+    return HotCartStore(MemoryCartBackend(ttl=3600), flush_interval=1.0, batch_size=2)
+
+def _add_item(store: HotCartStore, cart_id: str, variant_id: int, quantity: int):
+    item_id = store.reserve_item_ids(1)[0]
+
+    def apply(state):
+        now = utc_timestamp()
+        state['items'].append({
+            'id': item_id,
+            'variant_id': variant_id,
+            'quantity': quantity,
+            'created_at': now,
+            'updated_at': now,
+            'variant': None
+        })
+
+    store.mutate(cart_id, apply)
+    return item_id
+
+def _items(db, cart_id: str):
+    return {item.id: (item.variant_id, item.quantity) for item in db.query(CartItem).filter(CartItem.cart_id == cart_id)}
+
+def test_flush_writes_mutated_carts_to_database(store, db):
+    variant = create_variant(db, inventory_quantity=10)
+    carts = [store.create(user_id=f"user-{index}")['id'] for index in range(3)]
+    item_ids = {cart_id: _add_item(store, cart_id, variant.id, 2) for cart_id in carts}
+
+    # 저장소에만 있고 DB에는 아직 없음
+    assert db.query(Cart).count() == 0
+    assert store.backend.dirty_count() == 3
+
+    # 배치 크기(2)보다 많아도 한 번에 모두 반영
+    assert store.flush(SessionLocal) == 3
+    assert store.backend.dirty_count() == 0
+    for cart_id in carts:
+        assert db.get(Cart, cart_id).user_id is not None
+        assert _items(db, cart_id) == {item_ids[cart_id]: (variant.id, 2)}
+
+    # 수량 변경은 아이템 행을 교체해 반영
+    first = carts[0]
+
+    def set_quantity(state):
+        state['items'][0]['quantity'] = 5
+
+    store.mutate(first, set_quantity)
+    assert store.flush(SessionLocal) == 1
+    db.expire_all()
+    assert _items(db, first) == {item_ids[first]: (variant.id, 5)}
+
+def test_flush_deletes_carts_removed_from_store(store, db):
+    variant = create_variant(db, inventory_quantity=10)
+    cart_id = store.create(user_id=None)['id']
+    _add_item(store, cart_id, variant.id, 1)
+    store.flush(SessionLocal)
+    assert db.get(Cart, cart_id) is not None
+
+    store.delete(cart_id)
+    assert store.get(db, cart_id) is None
+    assert store.flush(SessionLocal) == 1
+
+    db.expire_all()
+    assert db.get(Cart, cart_id) is None
+    assert _items(db, cart_id) == {}
+    # 삭제가 반영되면 저장소에서도 제거
+    assert store.backend.get(cart_id) is None
+
+def test_failed_flush_marks_carts_dirty_again(store, db):
+    variant = create_variant(db, inventory_quantity=10)
+    cart_id = store.create(user_id=None)['id']
+    _add_item(store, cart_id, variant.id, 1)
+
+    def broken_session():
+        session = SessionLocal()
+
+        def fail():
+            raise RuntimeError("database unavailable")
+
+        session.commit = fail
+        return session
+
+    with pytest.raises(RuntimeError):
+        store.flush(broken_session)
+
+    assert store.backend.dirty_count() == 1
+    assert db.query(Cart).count() == 0
+
+    # 다음 플러시에서 다시 반영
+    assert store.flush(SessionLocal) == 1
+    assert _items(db, cart_id) != {}
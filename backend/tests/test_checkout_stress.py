@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+
+from conftest import create_variant
+from database.connection import SessionLocal
+from models.cart import Cart, CartItem
+from models.order import OrderItem
+from models.product import ProductVariant
+from services.inventory_service import inventory_service
+from services.order_service import OrderService
+
+CHECKOUTS = 40
+STOCK = 15
+WORKERS = 8
+
+def _carts(db, variant_id: int, count: int):
+    carts = []
+    for index in range(count):
+        cart = Cart(session_id=f"stress-{index}")
+        db.add(cart)
+        db.flush()
+        db.add(CartItem(cart_id=cart.id, variant_id=variant_id, quantity=1))
+        carts.append(cart.id)
+    db.commit()
+    return carts
+
+def _checkout(cart_id: str) -> str:
+    """주문 하나 생성 (SQLite 쓰기 잠금 충돌은 클라이언트 재시도처럼 다시 시도)"""
+    service = OrderService()
+    for _ in range(50):
+        db = SessionLocal()
+        try:
+            service.create_order_from_cart(db, cart_id, "buyer@example.com", "Seoul")
+            return "ordered"
+        except OperationalError:
+            db.rollback()
+            time.sleep(0.01)
+        except ValueError:
+            db.rollback()
+            return "sold_out"
+        finally:
+            db.close()
+    return "gave_up"
+
+def test_concurrent_checkouts_never_oversell(db, monkeypatch):
+    # 보류 없이 주문 시점의 조건부 차감만으로 막는지 확인
+    monkeypatch.setattr(inventory_service, "hold_ttl", 0)
+    variant = create_variant(db, inventory_quantity=STOCK)
+    carts = _carts(db, variant.id, CHECKOUTS)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        results = list(executor.map(_checkout, carts))
+    elapsed = time.perf_counter() - started_at
+
+    db.expire_all()
+    remaining = db.get(ProductVariant, variant.id).inventory_quantity
+    sold = db.query(func.coalesce(func.sum(OrderItem.quantity), 0))\
+        .filter(OrderItem.variant_id == variant.id).scalar()
+    oversold = max(sold - STOCK, 0)
+
+    print(
+        f"\n{CHECKOUTS} checkouts x {WORKERS} workers against stock {STOCK}: "
+        f"{CHECKOUTS / elapsed:.1f} checkouts/s, {results.count('ordered')} ordered, "
+        f"{results.count('sold_out')} sold out"
+    )
+    assert "gave_up" not in results
+    assert remaining >= 0
+    assert oversold == 0
+    assert results.count("ordered") == sold == STOCK
+    assert remaining == 0
@@ -0,0 +1,32 @@
+from sqlalchemy.util.concurrency import greenlet_spawn
+from core.concurrency import blocking_call
+import asyncio
+import threading
+import time
+
+def test_blocking_call_runs_directly_outside_event_loop():
+    assert blocking_call(threading.get_ident) == threading.get_ident()
+
+def test_blocking_call_yields_event_loop_inside_run_sync():
+    # AsyncSession.run_sync와 같은 방식(greenlet_spawn)으로 동기 서비스 코드를 실행
+    ticks = []
+
+    def service():
+        blocking_call(time.sleep, 0.2)
+        return blocking_call(threading.get_ident), len(ticks)
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        (worker_thread, ticks_during_call), _ = await asyncio.gather(greenlet_spawn(service), ticker())
+        return loop_thread, worker_thread, ticks_during_call
+
+    loop_thread, worker_thread, ticks_during_call = asyncio.run(run())
+
+    assert worker_thread != loop_thread
+    # 블로킹 호출 동안에도 다른 코루틴이 실행됨
+    assert ticks_during_call == 10
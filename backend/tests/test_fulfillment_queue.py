@@ -0,0 +1,134 @@
+import datetime
+
+import pytest
+
+from conftest import create_order, create_variant
+from models.fulfillment import FulfillmentLease
+from models.order import Order, OrderStatus, PaymentStatus
+from services.fulfillment_queue import FulfillmentQueue
+from services.order_service import OrderService
+
+@pytest.fixture
+def queue(tables):
+    return FulfillmentQueue(lease=300, max_claim=10)
+
+def _confirmed_orders(db, count: int):
+    """생성 순서대로 확정(결제 완료) 주문 ID"""
+    variant = create_variant(db, inventory_quantity=count)
+    service = OrderService()
+    order_ids = []
+    for index in range(count):
+        order_id = create_order(db, variant)
+        service.update_payment_status(db, order_id, PaymentStatus.PAID)
+        db.query(Order).filter(Order.id == order_id)\
+            .update({Order.created_at: datetime.datetime(2026, 1, 1) + datetime.timedelta(minutes=index)})
+        order_ids.append(order_id)
+    db.commit()
+    return order_ids
+
+def _claimed_ids(claim):
+    return [order['id'] for order in claim['orders']]
+
+def _expire(db, lease_id: str):
+    db.query(FulfillmentLease).filter(FulfillmentLease.lease_token == lease_id)\
+        .update({FulfillmentLease.expires_at: datetime.datetime.utcnow() - datetime.timedelta(seconds=1)})
+    db.commit()
+
+def _order(db, order_id: str) -> Order:
+    db.expire_all()
+    return db.get(Order, order_id)
+
+def test_pickers_never_receive_the_same_order(db, queue):
+    order_ids = _confirmed_orders(db, 5)
+
+    first = queue.claim(db, "picker-1", limit=2)
+    second = queue.claim(db, "picker-2", limit=2)
+    third = queue.claim(db, "picker-3", limit=2)
+    empty = queue.claim(db, "picker-4", limit=2)
+
+    # 오래된 주문부터 겹치지 않게 나눠 가짐
+    assert _claimed_ids(first) == order_ids[:2]
+    assert _claimed_ids(second) == order_ids[2:4]
+    assert _claimed_ids(third) == order_ids[4:]
+    assert empty == {'lease_id': None, 'picker_id': "picker-4", 'expires_at': None, 'orders': []}
+    assert all(_order(db, order_id).fulfillment_claimed for order_id in order_ids)
+
+def test_extend_renews_only_live_leases(db, queue):
+    _confirmed_orders(db, 2)
+    live = queue.claim(db, "picker-1", limit=1)
+    expired = queue.claim(db, "picker-2", limit=1)
+    _expire(db, expired['lease_id'])
+
+    extended = queue.extend(db, live['lease_id'])
+    assert extended['order_ids'] == _claimed_ids(live)
+    assert extended['expires_at'] >= live['expires_at']
+    assert queue.extend(db, expired['lease_id']) is None
+
+def test_ack_ships_leased_orders_and_clears_lease(db, queue):
+    order_ids = _confirmed_orders(db, 3)
+    claim = queue.claim(db, "picker-1", limit=2)
+
+    result = queue.ack(db, claim['lease_id'], OrderStatus.SHIPPED, [order_ids[0], order_ids[2]])
+
+    assert (result['updated'], result['rejected']) == (1, 1)
+    assert [(item['order_id'], item['result']) for item in result['results']] == [
+        (order_ids[0], 'updated'),
+        (order_ids[2], 'not_leased'),
+    ]
+    shipped = _order(db, order_ids[0])
+    assert (shipped.status, shipped.fulfillment_claimed) == (OrderStatus.SHIPPED, False)
+    assert _order(db, order_ids[2]).status == OrderStatus.CONFIRMED
+    assert db.query(FulfillmentLease.order_id).all() == [(order_ids[1],)]
+
+    with pytest.raises(ValueError):
+        queue.ack(db, claim['lease_id'], OrderStatus.CANCELLED)
+
+def test_failed_ack_keeps_lease(db, queue, monkeypatch):
+    (order_id,) = _confirmed_orders(db, 1)
+    claim = queue.claim(db, "picker-1")
+    bulk_update_status = queue.orders.bulk_update_status
+
+    def update_then_fail(*args, **kwargs):
+        bulk_update_status(*args, **kwargs)
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(queue.orders, "bulk_update_status", update_then_fail)
+    with pytest.raises(RuntimeError):
+        queue.ack(db, claim['lease_id'], OrderStatus.SHIPPED)
+
+    # 상태 변경과 임대 삭제가 함께 롤백됨
+    order = _order(db, order_id)
+    assert (order.status, order.fulfillment_claimed) == (OrderStatus.CONFIRMED, True)
+    assert db.query(FulfillmentLease).count() == 1
+
+def test_release_puts_orders_back_in_queue(db, queue):
+    order_ids = _confirmed_orders(db, 2)
+    claim = queue.claim(db, "picker-1", limit=2)
+
+    assert queue.release(db, claim['lease_id'], [order_ids[1]]) == 1
+    assert not _order(db, order_ids[1]).fulfillment_claimed
+    assert _claimed_ids(queue.claim(db, "picker-2")) == [order_ids[1]]
+
+def test_expired_lease_is_requeued_and_stale_picker_cannot_ship(db, queue):
+    (order_id,) = _confirmed_orders(db, 1)
+    stale = queue.claim(db, "picker-1")
+    _expire(db, stale['lease_id'])
+
+    fresh = queue.claim(db, "picker-2")
+    assert _claimed_ids(fresh) == [order_id]
+
+    result = queue.ack(db, stale['lease_id'], OrderStatus.SHIPPED, [order_id])
+    assert [item['result'] for item in result['results']] == ['not_leased']
+    assert _order(db, order_id).status == OrderStatus.CONFIRMED
+
+    assert queue.ack(db, fresh['lease_id'], OrderStatus.SHIPPED)['updated'] == 1
+    assert _order(db, order_id).status == OrderStatus.SHIPPED
+
+def test_ack_after_lease_expiry_is_rejected(db, queue):
+    (order_id,) = _confirmed_orders(db, 1)
+    claim = queue.claim(db, "picker-1")
+    _expire(db, claim['lease_id'])
+
+    result = queue.ack(db, claim['lease_id'], OrderStatus.SHIPPED)
+    assert [item['result'] for item in result['results']] == ['lease_expired']
+    assert _order(db, order_id).status == OrderStatus.CONFIRMED
@@ -0,0 +1,181 @@
+import asyncio
+import datetime
+
+import pytest
+from fastapi import HTTPException
+from starlette.responses import Response
+
+from conftest import create_variant
+from database.connection import SessionLocal
+from models.cart import Cart, CartItem
+from models.idempotency import IdempotencyKey, IdempotencyStatus
+from models.order import Order
+from services import idempotency as idempotency_module
+from services.idempotency import REPLAYED_HEADER, IdempotencyStore, LeaseLost, record_resource, _current_claim
+
+SCOPE = "orders.create"
+KEY = "checkout-1"
+
+class _AnyToken:
+    def __eq__(self, other):
+        return isinstance(other, str)
+
+ANY_TOKEN = _AnyToken()
+
+@pytest.fixture
+def store(tables):
+    return IdempotencyStore(session_factory=SessionLocal, wait_timeout=0.5, lease=30, poll_interval=0.05)
+
+def _record(db) -> IdempotencyKey:
+    db.expire_all()
+    return db.query(IdempotencyKey).filter(IdempotencyKey.idempotency_key == KEY).one()
+
+def _expire_lease(db):
+    """키를 선점한 워커가 complete/release 없이 죽은 뒤 임대가 지난 상태"""
+    record = _record(db)
+    record.locked_until = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    db.commit()
+
+def _call(calls, delay: float = 0.0):
+    async def call():
+        calls.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        return Response(content=b'{"id":"order-1"}', status_code=201, media_type="application/json")
+    return call
+
+def test_retry_takes_over_key_after_lease_expires(store, db):
+    assert store.claim(SCOPE, KEY, "fingerprint") == (ANY_TOKEN, None)
+    _expire_lease(db)
+
+    calls = []
+    response = asyncio.run(store.run(SCOPE, KEY, "fingerprint", _call(calls)))
+    assert response.status_code == 201
+    assert calls == [1]
+
+    record = _record(db)
+    assert record.status == IdempotencyStatus.COMPLETED
+    assert record.locked_until is None
+
+    # 이후 재시도는 저장된 응답 재사용
+    replayed = asyncio.run(store.run(SCOPE, KEY, "fingerprint", _call(calls)))
+    assert replayed.headers[REPLAYED_HEADER] == "true"
+    assert replayed.body == b'{"id":"order-1"}'
+    assert calls == [1]
+
+def test_retry_waits_while_lease_is_held(store, db):
+    assert store.claim(SCOPE, KEY, "fingerprint") == (ANY_TOKEN, None)
+
+    calls = []
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(store.run(SCOPE, KEY, "fingerprint", _call(calls)))
+    assert error.value.status_code == 409
+    assert calls == []
+    assert _record(db).status == IdempotencyStatus.IN_PROGRESS
+
+def test_expired_lease_is_not_taken_over_by_different_request(store, db):
+    assert store.claim(SCOPE, KEY, "fingerprint") == (ANY_TOKEN, None)
+    _expire_lease(db)
+
+    calls = []
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(store.run(SCOPE, KEY, "other-fingerprint", _call(calls)))
+    assert error.value.status_code == 422
+    assert calls == []
+
+def test_running_request_keeps_extending_its_lease(tables, db):
+    store = IdempotencyStore(session_factory=SessionLocal, lease=1, poll_interval=0.05)
+    seen = []
+
+    async def call():
+        claimed_until = _record(db).locked_until
+        await asyncio.sleep(1.5)
+        seen.append((claimed_until, _record(db).locked_until))
+        return Response(content=b"{}", status_code=201, media_type="application/json")
+
+    asyncio.run(store.run(SCOPE, KEY, "fingerprint", call))
+    claimed_until, extended_until = seen[0]
+    assert extended_until > claimed_until
+
+def test_stale_attempt_cannot_touch_key_after_takeover(store, db):
+    stale_token, _ = store.claim(SCOPE, KEY, "fingerprint")
+    _expire_lease(db)
+    token, _ = store.claim(SCOPE, KEY, "fingerprint")
+    assert token not in (None, stale_token)
+
+    # 멈췄던 원래 시도의 연장/응답 저장/해제는 새 시도의 키에 영향을 주지 않음
+    assert not store.extend(SCOPE, KEY, stale_token)
+    store.complete(SCOPE, KEY, stale_token, 201, b'{"id":"stale"}', "application/json")
+    store.release(SCOPE, KEY, stale_token)
+    record = _record(db)
+    assert record.status == IdempotencyStatus.IN_PROGRESS
+    assert record.lease_token == token
+
+    # 원래 시도의 업무 트랜잭션은 커밋되지 않음
+    claim = _current_claim.set((SCOPE, KEY, stale_token))
+    try:
+        with pytest.raises(LeaseLost):
+            record_resource(db, "order-stale")
+    finally:
+        _current_claim.reset(claim)
+        db.rollback()
+
+    assert store.extend(SCOPE, KEY, token)
+
+def _replay(replays):
+    async def replay(resource_id):
+        replays.append(resource_id)
+        return Response(content=f'{{"id":"{resource_id}"}}'.encode(), status_code=201, media_type="application/json")
+    return replay
+
+def test_takeover_replays_committed_result_instead_of_rerunning(store, db):
+    token, _ = store.claim(SCOPE, KEY, "fingerprint")
+    # 주문을 커밋한 뒤 응답을 저장하기 전에 워커가 죽음
+    claim = _current_claim.set((SCOPE, KEY, token))
+    try:
+        record_resource(db, "order-1")
+        db.commit()
+    finally:
+        _current_claim.reset(claim)
+    _expire_lease(db)
+
+    calls, replays = [], []
+    response = asyncio.run(store.run(SCOPE, KEY, "fingerprint", _call(calls), _replay(replays)))
+    assert response.status_code == 201
+    assert calls == []
+    assert replays == ["order-1"]
+    assert _record(db).status == IdempotencyStatus.COMPLETED
+
+def _checkout_cart(db) -> str:
+    variant = create_variant(db, inventory_quantity=5)
+    cart = Cart(session_id="idempotent-checkout")
+    db.add(cart)
+    db.flush()
+    db.add(CartItem(cart_id=cart.id, variant_id=variant.id, quantity=1))
+    db.commit()
+    return cart.id
+
+def test_checkout_retry_replays_order_when_storing_response_failed(client, db, monkeypatch):
+    cart_id = _checkout_cart(db)
+    store = idempotency_module.idempotency_store
+    complete = store.complete
+    failures = []
+
+    def fail_once(*args):
+        if not failures:
+            failures.append(1)
+            raise RuntimeError("connection lost")
+        return complete(*args)
+
+    monkeypatch.setattr(store, "complete", fail_once)
+    body = {"cart_id": cart_id, "email": "buyer@example.com", "shipping_address": "Seoul"}
+    headers = {"Idempotency-Key": "checkout-retry"}
+
+    with pytest.raises(RuntimeError):
+        client.post("/api/v1/orders/", json=body, headers=headers)
+
+    # 주문은 커밋됐고 장바구니는 비었지만 재시도는 "Cart is empty" 대신 그 주문을 돌려받음
+    response = client.post("/api/v1/orders/", json=body, headers=headers)
+    assert response.status_code == 201
+    assert db.query(Order).count() == 1
+    assert response.json()["id"] == db.query(Order.id).scalar()
@@ -0,0 +1,75 @@
+import pytest
+
+from conftest import create_variant
+from models.inventory import InventoryShard
+from services import inventory_shards as shards_module
+from services.inventory_service import InsufficientInventory, inventory_service
+from services.inventory_shards import fallback_decrements, inventory_shards
+
+def _sharded_variant(db, total: int, shard_count: int):
+    variant = create_variant(db, inventory_quantity=total)
+    inventory_shards.configure(db, variant.id, shard_count)
+    db.commit()
+    return variant
+
+def _quantities(db, variant_id: int):
+    db.expire_all()
+    return [
+        shard.quantity for shard in
+        db.query(InventoryShard).filter(InventoryShard.variant_id == variant_id).order_by(InventoryShard.shard)
+    ]
+
+def test_configure_splits_stock_evenly(db):
+    variant = _sharded_variant(db, 10, 4)
+    assert _quantities(db, variant.id) == [3, 3, 2, 2]
+    assert variant.total_inventory == 10
+
+def test_decrement_locks_all_shards_when_no_single_shard_is_enough(db):
+    variant = _sharded_variant(db, 10, 4)
+    fallbacks = fallback_decrements.value()
+
+    inventory_service.decrement(db, {variant.id: 7})
+    db.commit()
+
+    assert fallback_decrements.value() == fallbacks + 1
+    quantities = _quantities(db, variant.id)
+    assert sum(quantities) == 3
+    assert min(quantities) >= 0
+
+def test_decrement_falls_back_when_chosen_shard_ran_short(db, monkeypatch):
+    variant = _sharded_variant(db, 12, 4)
+    fallbacks = fallback_decrements.value()
+
+    def choose_then_drain(candidates):
+        # 읽은 뒤 UPDATE 전에 다른 주문이 고른 서브 카운터를 비운 상황
+        chosen = candidates[0]
+        db.query(InventoryShard)\
+            .filter(InventoryShard.variant_id == variant.id, InventoryShard.shard == chosen)\
+            .update({InventoryShard.quantity: 0}, synchronize_session=False)
+        return chosen
+
+    monkeypatch.setattr(shards_module.random, "choice", choose_then_drain)
+    inventory_service.decrement(db, {variant.id: 2})
+    db.commit()
+
+    assert fallback_decrements.value() == fallbacks + 1
+    quantities = _quantities(db, variant.id)
+    # 비워진 3개를 뺀 9개에서 2개 차감
+    assert sum(quantities) == 7
+    assert min(quantities) >= 0
+
+def test_decrement_never_oversells_sharded_stock(db):
+    variant = _sharded_variant(db, 5, 4)
+
+    with pytest.raises(InsufficientInventory):
+        inventory_service.decrement(db, {variant.id: 6})
+
+    assert _quantities(db, variant.id) == [2, 1, 1, 1]
+
+    inventory_service.decrement(db, {variant.id: 5})
+    db.commit()
+    assert _quantities(db, variant.id) == [0, 0, 0, 0]
+
+    with pytest.raises(InsufficientInventory):
+        inventory_service.decrement(db, {variant.id: 1})
+    assert _quantities(db, variant.id) == [0, 0, 0, 0]
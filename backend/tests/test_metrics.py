@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+
+from core.metrics import AGGREGATE_FILENAME, MetricsRegistry
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+def _registry() -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.counter("requests", "Requests", ["path"])
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    registry.gauge("in_flight", "In-flight requests")
+    return registry
+
+def _write_worker(directory: str, pid: int, requests: int):
+    data = {
+        "requests": [[["/orders"], requests]],
+        "latency_seconds": [[[], [requests, 0, 0], 0.05 * requests]],
+        "in_flight": [[[], 3]],
+    }
+    with open(os.path.join(directory, f"metrics_{pid}.json"), "w") as f:
+        json.dump(data, f)
+
+def _sample(text: str, name: str) -> str:
+    return next(line.split()[-1] for line in text.splitlines() if line.startswith(name))
+
+def test_restarted_workers_keep_dead_worker_counters(tmp_path):
+    directory = str(tmp_path)
+    for requests in (5, 7):
+        # 워커가 종료되고 새 워커가 시작될 때마다 이전 워커의 누적 값이 남아야 함
+        _write_worker(directory, _dead_pid(), requests)
+        registry = _registry()
+        registry.enable_multiprocess(directory, interval=60)
+        registry.disable_multiprocess()
+
+    assert sorted(os.listdir(directory)) == sorted([AGGREGATE_FILENAME, "aggregate.lock", f"metrics_{os.getpid()}.json"])
+
+    text = registry.render()
+    assert _sample(text, 'requests_total{path="/orders"}') == "12"
+    assert _sample(text, "latency_seconds_count") == "12"
+    # 종료된 워커의 게이지 값은 합치지 않음
+    assert not any(line.startswith("in_flight ") for line in text.splitlines())
+
+def test_reused_pid_does_not_overwrite_previous_worker_state(tmp_path):
+    directory = str(tmp_path)
+    _write_worker(directory, os.getpid(), 4)
+
+    registry = _registry()
+    registry.enable_multiprocess(directory, interval=60)
+    registry.disable_multiprocess()
+
+    assert _sample(registry.render(), 'requests_total{path="/orders"}') == "4"
@@ -0,0 +1,42 @@
+import datetime
+
+from conftest import create_order, create_variant
+from database.connection import SessionLocal
+from models.order import Order, OrderStatus
+from models.order_archive import ArchivedOrder
+from services.order_archive import OrderArchiver
+from services.order_service import OrderService
+
+def _user_order(db, variant, user_id: str, status: OrderStatus, created_at: datetime.datetime) -> str:
+    order_id = create_order(db, variant)
+    db.query(Order).filter(Order.id == order_id).update({
+        Order.user_id: user_id,
+        Order.status: status,
+        Order.created_at: created_at
+    })
+    db.commit()
+    return order_id
+
+def test_archived_order_is_still_found_by_order_lookups(db):
+    variant = create_variant(db, inventory_quantity=10)
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+    archived_id = _user_order(db, variant, "user-1", OrderStatus.DELIVERED, now - datetime.timedelta(days=400))
+    live_id = _user_order(db, variant, "user-1", OrderStatus.PENDING, now)
+    archived_number = db.get(Order, archived_id).order_number
+
+    assert OrderArchiver(after_months=3).run_once(SessionLocal) == {'orders': 1, 'order_items': 1}
+    db.expire_all()
+    assert db.get(Order, archived_id) is None
+    assert db.query(ArchivedOrder.id).scalar() == archived_id
+
+    service = OrderService()
+    order = service.get_order(db, archived_id)
+    assert order['status'] == OrderStatus.DELIVERED.value
+    assert len(order['items']) == 1
+    assert service.get_order_by_number(db, archived_number)['id'] == archived_id
+
+    history = service.get_user_orders(db, "user-1")
+    assert history['total'] == 2
+    assert [order['id'] for order in history['orders']] == [live_id, archived_id]
+    summary = service.get_user_orders(db, "user-1", summary=True)
+    assert [order['id'] for order in summary['orders']] == [live_id, archived_id]
@@ -0,0 +1,167 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import func
+
+from conftest import create_order, create_variant
+from core.config import settings
+from database.connection import SessionLocal
+from models.order import Order, OrderStatus, PaymentStatus
+from models.order_archive import OrderArchiveIndex
+from models.outbox import OutboxEvent
+from models.product import ProductVariant
+from models.reporting import DailySales
+from services import order_service as order_service_module
+from services.order_service import OrderService
+from services.outbox import subscribers
+
+def _sales_counts(db):
+    """(주문 상태, 결제 상태)별 집계 주문 수 (0인 키 제외)"""
+    rows = db.query(DailySales.status, DailySales.payment_status, func.sum(DailySales.order_count))\
+        .group_by(DailySales.status, DailySales.payment_status)\
+        .all()
+    return {(status, payment_status): count for status, payment_status, count in rows if count}
+
+def test_cancel_uses_locked_status_for_rollup(db):
+    variant = create_variant(db, inventory_quantity=5)
+    order_id = create_order(db, variant, 2)
+    service = OrderService()
+
+    # 이 세션은 대기 중(pending) 상태를 읽어 둔 상태
+    order = db.get(Order, order_id)
+    assert order.status == OrderStatus.PENDING
+
+    # 그사이 다른 요청이 결제를 완료해 확정(confirmed)으로 바꿈
+    other = SessionLocal()
+    try:
+        service.update_payment_status(other, order_id, PaymentStatus.PAID)
+    finally:
+        other.close()
+
+    cancelled = service.cancel_order(db, order_id)
+    assert cancelled['status'] == OrderStatus.CANCELLED.value
+
+    # 확정 버킷에서 빼야 집계가 어긋나지 않음
+    assert _sales_counts(db) == {("cancelled", "paid"): 1}
+    assert db.get(ProductVariant, variant.id).inventory_quantity == 5
+
+def test_order_number_date_matches_created_at_and_rollup_day(db, monkeypatch):
+    # 한국 시간으로는 다음 날인 UTC 자정 직전에 만든 주문 ID
+    created = datetime.datetime(2026, 1, 1, 23, 59, 59, 500000, tzinfo=datetime.timezone.utc)
+    milliseconds = int(created.timestamp() * 1000)
+    order_id = uuid.UUID(int=(milliseconds << 80) | (0x7 << 76) | (0b10 << 62) | 1)
+    monkeypatch.setattr(order_service_module, "uuid7", lambda: order_id)
+
+    variant = create_variant(db, inventory_quantity=5)
+    order = db.get(Order, create_order(db, variant))
+
+    assert order.id == str(order_id)
+    assert order.order_number.startswith("ORD-20260101-")
+    assert order.created_at == datetime.datetime(2026, 1, 1, 23, 59, 59)
+    assert [day for (day,) in db.query(DailySales.day).distinct()] == [datetime.date(2026, 1, 1)]
+
+def test_repeated_payment_status_publishes_event_once(db):
+    variant = create_variant(db, inventory_quantity=5)
+    order_id = create_order(db, variant)
+    service = OrderService()
+
+    for _ in range(3):
+        order = service.update_payment_status(db, order_id, PaymentStatus.PAID)
+        assert order['payment_status'] == PaymentStatus.PAID.value
+
+    def events(event_type):
+        """발행 횟수 (핸들러마다 아웃박스 행이 하나씩)"""
+        rows = db.query(OutboxEvent).filter(OutboxEvent.event_type == event_type).count()
+        return rows / len(subscribers(event_type))
+
+    assert events("order.paid") == 1
+    assert _sales_counts(db) == {("confirmed", "paid"): 1}
+
+    service.update_payment_status(db, order_id, PaymentStatus.REFUNDED)
+    service.update_payment_status(db, order_id, PaymentStatus.REFUNDED)
+    assert events("order.refunded") == 1
+
+def test_order_items_include_variant_only_when_requested(client, db):
+    variant = create_variant(db, inventory_quantity=5)
+    order_id = create_order(db, variant)
+    db.query(Order).filter(Order.id == order_id).update({Order.user_id: "user-1"})
+    db.commit()
+
+    for path in (f"/api/v1/orders/{order_id}", "/api/v1/orders/user/user-1"):
+        response = client.get(path).json()
+        items = response["items"] if "items" in response else response["orders"][0]["items"]
+        assert "variant" not in items[0]
+
+        response = client.get(path, params={"include_variants": "true"}).json()
+        items = response["items"] if "items" in response else response["orders"][0]["items"]
+        assert items[0]["variant"]["id"] == variant.id
+        assert items[0]["variant_title"] == "Default"
+
+def _paid_orders(db, count: int):
+    variant = create_variant(db, inventory_quantity=count)
+    service = OrderService()
+    order_ids = [create_order(db, variant) for _ in range(count)]
+    for order_id in order_ids:
+        service.update_payment_status(db, order_id, PaymentStatus.PAID)
+    return order_ids
+
+def test_bulk_update_status_reports_result_per_order(db, monkeypatch):
+    monkeypatch.setattr(settings, "ORDER_BULK_STATUS_CHUNK_SIZE", 2)
+    by_id, by_number, shipped = _paid_orders(db, 3)
+    pending = create_order(db, create_variant(db, inventory_quantity=1, handle="pending-product"))
+    db.query(Order).filter(Order.id == shipped).update({Order.status: OrderStatus.SHIPPED})
+    db.add(OrderArchiveIndex(
+        order_id=str(uuid.uuid4()), order_number="ORD-ARCHIVED", user_id=None,
+        created_at=datetime.datetime(2020, 1, 1)
+    ))
+    db.commit()
+    number = db.get(Order, by_number).order_number
+
+    service = OrderService()
+    chunks = []
+    update_chunk = service._bulk_update_chunk
+    monkeypatch.setattr(service, "_bulk_update_chunk", lambda *args: chunks.append(args[2]) or update_chunk(*args))
+
+    result = service.bulk_update_status(db, [
+        (OrderStatus.SHIPPED, [by_id, shipped, pending, "missing-order"], [number, "ORD-ARCHIVED"]),
+    ])
+
+    assert {key: result[key] for key in ('updated', 'unchanged', 'rejected', 'not_found')} == \
+        {'updated': 2, 'unchanged': 1, 'rejected': 2, 'not_found': 1}
+    assert [(item['order_id'], item['order_number'], item['result'], item['status']) for item in result['results']] == [
+        (by_id, db.get(Order, by_id).order_number, 'updated', 'shipped'),
+        (shipped, db.get(Order, shipped).order_number, 'unchanged', 'shipped'),
+        (pending, db.get(Order, pending).order_number, 'invalid_transition', 'pending'),
+        ("missing-order", None, 'not_found', None),
+        (by_number, number, 'updated', 'shipped'),
+        (None, "ORD-ARCHIVED", 'archived', None),
+    ]
+    # 여섯 건을 두 건씩 세 트랜잭션으로 처리
+    assert [len(chunk) for chunk in chunks] == [2, 2, 2]
+
+    db.expire_all()
+    assert db.get(Order, by_id).shipped_at is not None
+    assert db.get(Order, pending).status == OrderStatus.PENDING
+    # 옮겨진 주문만 집계에서 확정 -> 배송 버킷으로 이동 (직접 바꾼 배송 주문은 확정 버킷에 남음)
+    assert _sales_counts(db) == {("shipped", "paid"): 2, ("confirmed", "paid"): 1, ("pending", "pending"): 1}
+
+def test_bulk_update_status_is_repeatable(db):
+    order_ids = _paid_orders(db, 2)
+    service = OrderService()
+
+    first = service.bulk_update_status(db, [(OrderStatus.SHIPPED, order_ids, [])])
+    again = service.bulk_update_status(db, [(OrderStatus.SHIPPED, order_ids, [])])
+
+    assert (first['updated'], first['unchanged']) == (2, 0)
+    assert (again['updated'], again['unchanged']) == (0, 2)
+    assert _sales_counts(db) == {("shipped", "paid"): 2}
+
+def test_bulk_update_status_validates_request(db, monkeypatch):
+    service = OrderService()
+    with pytest.raises(ValueError, match="not supported"):
+        service.bulk_update_status(db, [(OrderStatus.CANCELLED, ["order-1"], [])])
+
+    monkeypatch.setattr(settings, "ORDER_BULK_STATUS_MAX_ORDERS", 2)
+    with pytest.raises(ValueError, match="Too many orders"):
+        service.bulk_update_status(db, [(OrderStatus.SHIPPED, ["order-1", "order-2"], ["ORD-1"])])
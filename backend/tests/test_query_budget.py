@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from core.config import settings
+from models.product import Collection, Product, ProductImage, ProductVariant
+from routers import products
+
+def _create_products(db, count: int, start: int = 0):
+    """컬렉션/이미지/변형 상품 두 개를 가진 제품 생성"""
+    collection = db.query(Collection).filter(Collection.handle == "all").first()
+    if collection is None:
+        collection = Collection(handle="all", title="All")
+        db.add(collection)
+    for index in range(start, start + count):
+        product = Product(handle=f"product-{index}", title=f"Product {index}")
+        product.collections.append(collection)
+        product.images.append(ProductImage(url=f"https://example.com/{index}.jpg"))
+        for size in ("S", "M"):
+            product.variants.append(ProductVariant(
+                title=size,
+                price=Decimal("10.00"),
+                sku=f"product-{index}-{size}",
+                inventory_quantity=5
+            ))
+        db.add(product)
+    db.commit()
+
+def _query_count(response) -> int:
+    return int(response.headers["x-db-query-count"])
+
+def test_product_list_stays_within_budget_as_page_grows(client, db):
+    assert settings.QUERY_BUDGET_MODE == "strict"
+
+    _create_products(db, 1)
+    one = client.get("/api/v1/products/")
+    assert one.status_code == 200
+
+    _create_products(db, 14, start=1)
+    many = client.get("/api/v1/products/")
+    assert many.status_code == 200
+    assert len(many.json()["products"]) == 15
+
+    # 제품 수와 관계없이 쿼리 수가 같아야 함 (연관 데이터 일괄 로딩)
+    assert _query_count(many) == _query_count(one)
+    assert _query_count(many) <= products.get_products.__query_budget__
+
+def test_cart_read_stays_within_budget(client, db):
+    _create_products(db, 2)
+    variant_ids = [variant.id for variant in db.query(ProductVariant).all()]
+
+    cart = client.post("/api/v1/cart/", json={})
+    assert cart.status_code == 201
+    cart_id = cart.json()["id"]
+    added = client.post(
+        f"/api/v1/cart/{cart_id}/items",
+        json={"items": [{"variant_id": variant_id, "quantity": 1} for variant_id in variant_ids]}
+    )
+    assert added.status_code == 200
+
+    response = client.get(f"/api/v1/cart/{cart_id}")
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == len(variant_ids)
+
+def test_exceeding_budget_fails_request_in_strict_mode(client, db, monkeypatch):
+    _create_products(db, 3)
+    monkeypatch.setattr(products.get_products, "__query_budget__", 1)
+
+    response = client.get("/api/v1/products/")
+    assert response.status_code == 500
+    assert "Query budget exceeded" in response.json()["detail"]
+    assert "(budget 1)" in response.json()["detail"]
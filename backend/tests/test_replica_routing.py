@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from conftest import TEST_DIR
+from database import connection
+from database.connection import Base, PRIMARY_STICKY_COOKIE, ReplicaRouter
+from models.product import Collection
+
+def _handles(client):
+    response = client.get("/api/v1/collections/")
+    assert response.status_code == 200
+    return [collection["handle"] for collection in response.json()]
+
+@pytest.fixture
+def replica(tables, monkeypatch):
+    """주 DB와 다른 SQLite 파일을 복제본 대역으로 쓰는 라우터"""
+    import main
+
+    router = ReplicaRouter([f"sqlite:///{TEST_DIR}/replica.db"])
+    replica = router.replicas[0]
+    Base.metadata.create_all(replica.engine)
+    session = replica.session_factory()
+    session.add(Collection(handle="replica-only", title="Replica only"))
+    session.commit()
+    session.close()
+
+    monkeypatch.setattr(connection, "replica_router", router)
+    monkeypatch.setattr(main, "replica_router", router)
+    yield replica
+    Base.metadata.drop_all(replica.engine)
+    replica.engine.dispose()
+
+def test_reads_go_to_replica_and_writes_stick_to_primary(client, db, replica):
+    assert _handles(client) == ["replica-only"]
+
+    response = client.post("/api/v1/collections/", json={"handle": "summer", "title": "Summer"})
+    assert response.status_code == 201
+    assert PRIMARY_STICKY_COOKIE in response.cookies
+
+    # 쓰기는 주 DB에만 반영
+    assert [c.handle for c in db.query(Collection).all()] == ["summer"]
+    # 쿠키가 있는 동안의 읽기는 주 DB
+    assert _handles(client) == ["summer"]
+
+    # 쿠키가 없거나 만료되면 다시 복제본
+    client.cookies.set(PRIMARY_STICKY_COOKIE, str(int(time.time()) - 1))
+    assert _handles(client) == ["replica-only"]
+
+def test_lagging_replica_falls_back_to_primary(client, db, replica):
+    db.add(Collection(handle="summer", title="Summer"))
+    db.commit()
+
+    replica.lag = None
+    replica.checked_at = time.monotonic()
+    assert _handles(client) == ["summer"]
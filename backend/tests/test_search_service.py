@@ -0,0 +1,60 @@
+from conftest import create_variant
+from core.config import settings
+from models.product import Product
+from services.product_service import ProductService
+from services.search_service import ProductSearchIndex, product_search_index
+
+def _shirts(db, count: int, start: int = 0):
+    return [
+        create_variant(db, inventory_quantity=1, handle=f"shirt-{index}").product_id
+        for index in range(start, start + count)
+    ]
+
+def test_result_cap_applies_only_to_relevance_sort(db, monkeypatch):
+    _shirts(db, 5)
+    monkeypatch.setattr(settings, "SEARCH_MAX_RESULTS", 2)
+    product_search_index.rebuild(db)
+    service = ProductService()
+
+    by_title = service.get_products(db, query="shirt", sort_key="title", available_only=False)
+    assert by_title["total"] == 5
+    assert len(by_title["products"]) == 5
+
+    by_relevance = service.get_products(db, query="shirt", sort_key="relevance", available_only=False)
+    assert by_relevance["total"] == 2
+
+def test_search_request_does_not_sync_index(db, monkeypatch):
+    _shirts(db, 1)
+    product_search_index.rebuild(db)
+
+    def fail(_db):
+        raise AssertionError("search request must not sync the index")
+
+    monkeypatch.setattr(product_search_index, "sync", fail)
+    result = ProductService().get_products(db, query="shirt", available_only=False)
+    assert result["total"] == 1
+
+def test_sync_applies_changes_without_overwriting_direct_updates(db):
+    first, second = _shirts(db, 2)
+    index = ProductSearchIndex()
+    index.rebuild(db)
+
+    db.query(Product).filter(Product.id == second).delete()
+    db.commit()
+    (added,) = _shirts(db, 1, start=2)
+
+    index_rows = index._index_rows
+
+    def rename_then_index(rows, skip):
+        # 동기화가 행을 읽은 뒤 요청 처리 워커가 같은 제품을 직접 갱신한 상황
+        product = db.get(Product, first)
+        product.title = "jacket"
+        db.commit()
+        index.add_product(product)
+        return index_rows(rows, skip)
+
+    index._index_rows = rename_then_index
+    index.sync(db)
+
+    assert [product_id for product_id, _ in index.search("jacket")] == [first]
+    assert [product_id for product_id, _ in index.search("shirt")] == [added]
@@ -60,6 +60,8 @@ CREATE TABLE IF NOT EXISTS products (
     vendor VARCHAR(255),
     product_type VARCHAR(255),
     available_for_sale BOOLEAN DEFAULT TRUE,
+    min_price DECIMAL(10,2),
+    max_price DECIMAL(10,2),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_handle (handle),
@@ -67,7 +69,10 @@ CREATE TABLE IF NOT EXISTS products (
     INDEX idx_vendor (vendor),
     INDEX idx_product_type (product_type),
     INDEX idx_available_for_sale (available_for_sale),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    INDEX idx_products_updated_at (updated_at),
+    INDEX idx_products_min_price (min_price),
+    INDEX idx_products_max_price (max_price)
 );
 
 -- 제품 변형 테이블
@@ -80,6 +85,8 @@ CREATE TABLE IF NOT EXISTS product_variants (
     sku VARCHAR(255) UNIQUE,
     barcode VARCHAR(255),
     inventory_quantity INT DEFAULT 0,
+    reserved_quantity INT NOT NULL DEFAULT 0,
+    inventory_shard_count INT NOT NULL DEFAULT 0,
     weight DECIMAL(8,2),
     weight_unit VARCHAR(10) DEFAULT 'kg',
     available_for_sale BOOLEAN DEFAULT TRUE,
@@ -113,19 +120,21 @@ CREATE TABLE IF NOT EXISTS product_collections (
     collection_id INT,
     PRIMARY KEY (product_id, collection_id),
     FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
-    FOREIGN KEY (collection_id) REFERENCES collections(id) ON DELETE CASCADE
+    FOREIGN KEY (collection_id) REFERENCES collections(id) ON DELETE CASCADE,
+    INDEX idx_product_collections_collection (collection_id, product_id)
 );
 
 -- 장바구니 테이블
 CREATE TABLE IF NOT EXISTS carts (
-    id VARCHAR(36) PRIMARY KEY,
+    id VARCHAR(36) PRIMARY KEY,  -- UUIDv7 (시간 순서, backend/core/ids.py)
     user_id VARCHAR(36),
     session_id VARCHAR(255),
     currency_code VARCHAR(3) DEFAULT 'USD',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_user_id (user_id),
-    INDEX idx_session_id (session_id)
+    INDEX idx_session_id (session_id),
+    INDEX idx_carts_updated_at (updated_at)
 );
 
 -- 장바구니 아이템 테이블
@@ -143,9 +152,32 @@ CREATE TABLE IF NOT EXISTS cart_items (
     UNIQUE KEY unique_cart_variant (cart_id, variant_id)
 );
 
+-- 재고 보류 테이블 (장바구니에 담은 수량을 만료 시각까지 확보)
+CREATE TABLE IF NOT EXISTS inventory_reservations (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    cart_id VARCHAR(36) NOT NULL,
+    variant_id INT NOT NULL,
+    quantity INT NOT NULL,
+    expires_at DATETIME NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (variant_id) REFERENCES product_variants(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_reservation_cart_variant (cart_id, variant_id),
+    INDEX idx_reservations_variant_expires (variant_id, expires_at),
+    INDEX idx_reservations_expires (expires_at)
+);
+
+-- 분할 재고 서브 카운터 (주문이 몰리는 변형 상품의 재고를 여러 행에 나눠 보관)
+CREATE TABLE IF NOT EXISTS inventory_shards (
+    variant_id INT NOT NULL,
+    shard INT NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (variant_id, shard),
+    FOREIGN KEY (variant_id) REFERENCES product_variants(id) ON DELETE CASCADE
+);
+
 -- 주문 테이블
 CREATE TABLE IF NOT EXISTS orders (
-    id VARCHAR(36) PRIMARY KEY,
+    id VARCHAR(36) PRIMARY KEY,  -- UUIDv7 (시간 순서, backend/core/ids.py)
     order_number VARCHAR(50) UNIQUE NOT NULL,
     user_id VARCHAR(36),
     email VARCHAR(255) NOT NULL,
@@ -165,12 +197,14 @@ CREATE TABLE IF NOT EXISTS orders (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     shipped_at DATETIME,
     delivered_at DATETIME,
+    fulfillment_claimed BOOLEAN NOT NULL DEFAULT FALSE,
     INDEX idx_order_number (order_number),
     INDEX idx_user_id (user_id),
     INDEX idx_email (email),
-    INDEX idx_status (status),
+    INDEX idx_orders_fulfillment_queue (status, fulfillment_claimed, created_at),
     INDEX idx_payment_status (payment_status),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    INDEX idx_orders_user_created (user_id, created_at)
 );
 
 -- 주문 아이템 테이블
@@ -191,6 +225,138 @@ CREATE TABLE IF NOT EXISTS order_items (
     INDEX idx_variant_id (variant_id)
 );
 
+-- 트랜잭션 아웃박스 (주문 이후 메일/결제/웹훅, 워커가 처리)
+CREATE TABLE IF NOT EXISTS outbox_events (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    event_type VARCHAR(100) NOT NULL,
+    handler VARCHAR(100) NOT NULL,
+    aggregate_id VARCHAR(36),
+    payload TEXT NOT NULL,
+    status ENUM('pending', 'processing', 'done', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    available_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    processed_at DATETIME,
+    INDEX idx_outbox_status_available (status, available_at),
+    INDEX idx_outbox_aggregate (aggregate_id)
+);
+
+-- Idempotency-Key 기록 (주문 생성/결제 재시도 시 첫 응답 재사용)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    scope VARCHAR(50) NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL,
+    status ENUM('in_progress', 'completed') NOT NULL DEFAULT 'in_progress',
+    response_status INT,
+    response_body TEXT,
+    response_media_type VARCHAR(100),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL,
+    locked_until DATETIME,
+    lease_token VARCHAR(36),
+    resource_id VARCHAR(36),
+    UNIQUE KEY unique_idempotency_scope_key (scope, idempotency_key),
+    INDEX idx_idempotency_expires (expires_at)
+);
+
+-- 매출 집계 (주문 변경 시 증감, 다시 만들기: python -m services.sales_rollup)
+CREATE TABLE IF NOT EXISTS daily_sales (
+    day DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    payment_status VARCHAR(20) NOT NULL,
+    currency_code VARCHAR(3) NOT NULL,
+    bucket INT NOT NULL DEFAULT 0,
+    order_count INT NOT NULL DEFAULT 0,
+    subtotal_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, status, payment_status, currency_code, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS daily_variant_sales (
+    day DATE NOT NULL,
+    variant_id INT NOT NULL,
+    currency_code VARCHAR(3) NOT NULL,
+    bucket INT NOT NULL DEFAULT 0,
+    product_id INT,
+    units INT NOT NULL DEFAULT 0,
+    order_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, variant_id, currency_code, bucket),
+    INDEX idx_daily_variant_sales_product (product_id, day)
+);
+
+-- 보관된 종료 주문 (주문일 기준 월별 파티션, python -m services.order_archive 가 옮기고 파티션 추가)
+CREATE TABLE IF NOT EXISTS orders_archive (
+    id VARCHAR(36) NOT NULL,
+    order_number VARCHAR(50) NOT NULL,
+    user_id VARCHAR(36),
+    email VARCHAR(255) NOT NULL,
+    status ENUM('pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled', 'refunded') DEFAULT 'pending',
+    payment_status ENUM('pending', 'paid', 'failed', 'refunded') DEFAULT 'pending',
+    subtotal_amount DECIMAL(10,2) NOT NULL,
+    tax_amount DECIMAL(10,2) DEFAULT 0,
+    shipping_amount DECIMAL(10,2) DEFAULT 0,
+    total_amount DECIMAL(10,2) NOT NULL,
+    currency_code VARCHAR(3) DEFAULT 'USD',
+    payment_id VARCHAR(255),
+    payment_method VARCHAR(50),
+    shipping_address TEXT,
+    billing_address TEXT,
+    notes TEXT,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME,
+    shipped_at DATETIME,
+    delivered_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+)
+PARTITION BY RANGE COLUMNS(created_at) (
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS order_items_archive (
+    id INT NOT NULL,
+    order_id VARCHAR(36) NOT NULL,
+    variant_id INT NOT NULL,
+    quantity INT NOT NULL,
+    price DECIMAL(10,2) NOT NULL,
+    total_amount DECIMAL(10,2) NOT NULL,
+    product_title VARCHAR(500),
+    variant_title VARCHAR(255),
+    product_handle VARCHAR(255),
+    created_at DATETIME,
+    order_created_at DATETIME NOT NULL,
+    PRIMARY KEY (id, order_created_at),
+    INDEX idx_order_items_archive_order (order_id, order_created_at)
+)
+PARTITION BY RANGE COLUMNS(order_created_at) (
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS order_archive_index (
+    order_id VARCHAR(36) PRIMARY KEY,
+    order_number VARCHAR(50) NOT NULL UNIQUE,
+    user_id VARCHAR(36),
+    created_at DATETIME NOT NULL,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_order_archive_user_created (user_id, created_at)
+);
+
+-- 피킹 작업 임대 (확정된 주문을 가져간 피커가 만료 시각까지 독점)
+CREATE TABLE IF NOT EXISTS fulfillment_leases (
+    order_id VARCHAR(36) PRIMARY KEY,
+    lease_token VARCHAR(36) NOT NULL,
+    picker_id VARCHAR(100) NOT NULL,
+    claimed_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    INDEX idx_fulfillment_lease_token (lease_token),
+    INDEX idx_fulfillment_lease_expires (expires_at)
+);
+
 -- 샘플 데이터 삽입
 
 -- 컬렉션 샘플 데이터
@@ -222,6 +388,12 @@ INSERT INTO product_variants (product_id, title, price, sku, inventory_quantity,
 (4, '러닝화 - 270mm', 79.99, 'RS-001-270', 35, TRUE),
 (5, '노트북 가방 - 블랙', 49.99, 'LB-001-BLK', 25, TRUE);
 
+-- 제품 가격 범위 계산
+UPDATE products p SET
+    min_price = (SELECT MIN(v.price) FROM product_variants v WHERE v.product_id = p.id),
+    max_price = (SELECT MAX(v.price) FROM product_variants v WHERE v.product_id = p.id),
+    updated_at = p.updated_at;
+
 -- 제품 이미지 샘플 데이터
 INSERT INTO product_images (product_id, url, alt_text, position) VALUES
 (1, 'https://via.placeholder.com/400x400/000000/FFFFFF?text=Headphones', '무선 헤드폰', 0),
@@ -0,0 +1,13 @@
+-- 키셋(커서) 페이지네이션용 인덱스
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+
+USE commerce_db;
+
+-- 제품 목록: updated_at 정렬 (InnoDB 보조 인덱스에는 PK(id)가 포함되어 (updated_at, id) 순서로 탐색)
+ALTER TABLE products ADD INDEX idx_products_updated_at (updated_at);
+
+-- 컬렉션 제품 목록: collection_id 로 연결 테이블 탐색
+ALTER TABLE product_collections ADD INDEX idx_product_collections_collection (collection_id, product_id);
+
+-- 사용자 주문 목록: user_id 필터 + created_at 정렬
+ALTER TABLE orders ADD INDEX idx_orders_user_created (user_id, created_at);
@@ -0,0 +1,16 @@
+-- 제품 가격 범위 비정규화 컬럼
+-- 변형 상품 변경 시 애플리케이션(models/product.py)이 자동으로 갱신한다.
+
+USE commerce_db;
+
+ALTER TABLE products
+    ADD COLUMN min_price DECIMAL(10,2) AFTER available_for_sale,
+    ADD COLUMN max_price DECIMAL(10,2) AFTER min_price,
+    ADD INDEX idx_products_min_price (min_price),
+    ADD INDEX idx_products_max_price (max_price);
+
+-- 기존 데이터 채우기 (수정 시각은 유지)
+UPDATE products p SET
+    min_price = (SELECT MIN(v.price) FROM product_variants v WHERE v.product_id = p.id),
+    max_price = (SELECT MAX(v.price) FROM product_variants v WHERE v.product_id = p.id),
+    updated_at = p.updated_at;
@@ -0,0 +1,7 @@
+-- 방치된 장바구니 정리용 인덱스
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+
+USE commerce_db;
+
+-- 정리 대상 탐색: updated_at 범위 (InnoDB 보조 인덱스에는 PK(id)가 포함되어 (updated_at, id) 순서로 탐색)
+ALTER TABLE carts ADD INDEX idx_carts_updated_at (updated_at);
@@ -0,0 +1,21 @@
+-- 장바구니 재고 보류
+-- reserved_quantity는 활성 보류 수량 합계로, 보류 테이블을 집계하지 않고 판매 가능 수량을 계산하는 데 쓴다.
+--   판매 가능 수량 = inventory_quantity - reserved_quantity
+
+USE commerce_db;
+
+ALTER TABLE product_variants
+    ADD COLUMN reserved_quantity INT NOT NULL DEFAULT 0 AFTER inventory_quantity;
+
+CREATE TABLE IF NOT EXISTS inventory_reservations (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    cart_id VARCHAR(36) NOT NULL,
+    variant_id INT NOT NULL,
+    quantity INT NOT NULL,
+    expires_at DATETIME NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (variant_id) REFERENCES product_variants(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_reservation_cart_variant (cart_id, variant_id),
+    INDEX idx_reservations_variant_expires (variant_id, expires_at),
+    INDEX idx_reservations_expires (expires_at)
+);
@@ -0,0 +1,15 @@
+-- 분할 재고 (핫 SKU의 재고를 여러 서브 카운터 행에 나눠 동시 주문의 행 잠금 경합을 줄임)
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+
+USE commerce_db;
+
+-- 서브 카운터 수 (0이면 product_variants.inventory_quantity를 그대로 사용)
+ALTER TABLE product_variants ADD COLUMN inventory_shard_count INT NOT NULL DEFAULT 0 AFTER reserved_quantity;
+
+CREATE TABLE IF NOT EXISTS inventory_shards (
+    variant_id INT NOT NULL,
+    shard INT NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (variant_id, shard),
+    FOREIGN KEY (variant_id) REFERENCES product_variants(id) ON DELETE CASCADE
+);
@@ -0,0 +1,37 @@
+-- 시간 순서 ID (UUIDv7, backend/core/ids.py)
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 1단계는 불필요)
+
+USE commerce_db;
+
+-- 1) VARCHAR(36) 유지 (기본)
+-- 새 장바구니/주문 ID는 표준 36자 UUID 문자열이라 스키마 변경 없이 배포만으로 적용된다.
+-- 기존 uuid4 행은 그대로 두며, 새 행부터 PK 끝에 순서대로 추가된다.
+
+-- 2) (선택) BINARY(16) 저장 - 점검 시간에 실행 (테이블 재작성), 완료 후 DATABASE_ID_BINARY=true 로 배포
+-- 문자열 → 바이트 변환 중에는 길이가 맞지 않으므로 VARBINARY(36)을 거쳐 변환하고,
+-- 참조 컬럼(cart_items.cart_id, order_items.order_id, inventory_reservations.cart_id)도 함께 바꾼다.
+-- 인덱스와 외래 키는 그대로 유지된다. updated_at = updated_at 으로 수정 시각을 보존한다.
+
+SET FOREIGN_KEY_CHECKS = 0;
+
+ALTER TABLE carts MODIFY id VARBINARY(36) NOT NULL;
+UPDATE carts SET id = UNHEX(REPLACE(id, '-', '')), updated_at = updated_at;
+ALTER TABLE carts MODIFY id BINARY(16) NOT NULL;
+
+ALTER TABLE cart_items MODIFY cart_id VARBINARY(36) NOT NULL;
+UPDATE cart_items SET cart_id = UNHEX(REPLACE(cart_id, '-', '')), updated_at = updated_at;
+ALTER TABLE cart_items MODIFY cart_id BINARY(16) NOT NULL;
+
+ALTER TABLE inventory_reservations MODIFY cart_id VARBINARY(36) NOT NULL;
+UPDATE inventory_reservations SET cart_id = UNHEX(REPLACE(cart_id, '-', ''));
+ALTER TABLE inventory_reservations MODIFY cart_id BINARY(16) NOT NULL;
+
+ALTER TABLE orders MODIFY id VARBINARY(36) NOT NULL;
+UPDATE orders SET id = UNHEX(REPLACE(id, '-', '')), updated_at = updated_at;
+ALTER TABLE orders MODIFY id BINARY(16) NOT NULL;
+
+ALTER TABLE order_items MODIFY order_id VARBINARY(36) NOT NULL;
+UPDATE order_items SET order_id = UNHEX(REPLACE(order_id, '-', ''));
+ALTER TABLE order_items MODIFY order_id BINARY(16) NOT NULL;
+
+SET FOREIGN_KEY_CHECKS = 1;
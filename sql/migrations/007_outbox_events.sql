@@ -0,0 +1,20 @@
+-- 트랜잭션 아웃박스 (주문 이후 메일/결제/웹훅을 요청 밖에서 처리)
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+
+USE commerce_db;
+
+CREATE TABLE IF NOT EXISTS outbox_events (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    event_type VARCHAR(100) NOT NULL,
+    handler VARCHAR(100) NOT NULL,
+    aggregate_id VARCHAR(36),
+    payload TEXT NOT NULL,
+    status ENUM('pending', 'processing', 'done', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    available_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    processed_at DATETIME,
+    INDEX idx_outbox_status_available (status, available_at),
+    INDEX idx_outbox_aggregate (aggregate_id)
+);
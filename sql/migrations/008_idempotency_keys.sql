@@ -0,0 +1,19 @@
+-- Idempotency-Key 기록 (주문 생성/결제 재시도 시 첫 응답 재사용)
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+
+USE commerce_db;
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    scope VARCHAR(50) NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL,
+    status ENUM('in_progress', 'completed') NOT NULL DEFAULT 'in_progress',
+    response_status INT,
+    response_body TEXT,
+    response_media_type VARCHAR(100),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL,
+    UNIQUE KEY unique_idempotency_scope_key (scope, idempotency_key),
+    INDEX idx_idempotency_expires (expires_at)
+);
@@ -0,0 +1,32 @@
+-- 매출 집계 테이블 (리포트가 orders/order_items를 훑지 않도록 주문 변경 시 증감)
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+-- 적용 후 기존 주문으로 집계를 채운다: python -m services.sales_rollup
+
+USE commerce_db;
+
+CREATE TABLE IF NOT EXISTS daily_sales (
+    day DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    payment_status VARCHAR(20) NOT NULL,
+    currency_code VARCHAR(3) NOT NULL,
+    bucket INT NOT NULL DEFAULT 0,
+    order_count INT NOT NULL DEFAULT 0,
+    subtotal_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, status, payment_status, currency_code, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS daily_variant_sales (
+    day DATE NOT NULL,
+    variant_id INT NOT NULL,
+    currency_code VARCHAR(3) NOT NULL,
+    bucket INT NOT NULL DEFAULT 0,
+    product_id INT,
+    units INT NOT NULL DEFAULT 0,
+    order_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, variant_id, currency_code, bucket),
+    INDEX idx_daily_variant_sales_product (product_id, day)
+);
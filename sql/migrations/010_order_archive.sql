@@ -0,0 +1,65 @@
+-- 종료 주문 보관 테이블 (월별 파티션) 과 라우팅 색인
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+--
+-- 파티션 테이블은 외래 키를 쓸 수 없고 모든 유니크 키에 파티션 키(created_at)가 들어가야 하므로
+-- orders/order_items 자체를 파티션하지 않고, 오래된 종료 주문만 이 테이블로 옮긴다
+-- (python -m services.order_archive). 월별 파티션은 보관 작업이 pmax를 나눠 필요한 만큼 추가한다.
+-- 006 으로 주문 ID를 BINARY(16)으로 바꾼 경우 id/order_id 컬럼도 같은 타입으로 만든다.
+
+USE commerce_db;
+
+CREATE TABLE IF NOT EXISTS orders_archive (
+    id VARCHAR(36) NOT NULL,
+    order_number VARCHAR(50) NOT NULL,
+    user_id VARCHAR(36),
+    email VARCHAR(255) NOT NULL,
+    status ENUM('pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled', 'refunded') DEFAULT 'pending',
+    payment_status ENUM('pending', 'paid', 'failed', 'refunded') DEFAULT 'pending',
+    subtotal_amount DECIMAL(10,2) NOT NULL,
+    tax_amount DECIMAL(10,2) DEFAULT 0,
+    shipping_amount DECIMAL(10,2) DEFAULT 0,
+    total_amount DECIMAL(10,2) NOT NULL,
+    currency_code VARCHAR(3) DEFAULT 'USD',
+    payment_id VARCHAR(255),
+    payment_method VARCHAR(50),
+    shipping_address TEXT,
+    billing_address TEXT,
+    notes TEXT,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME,
+    shipped_at DATETIME,
+    delivered_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+)
+PARTITION BY RANGE COLUMNS(created_at) (
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS order_items_archive (
+    id INT NOT NULL,
+    order_id VARCHAR(36) NOT NULL,
+    variant_id INT NOT NULL,
+    quantity INT NOT NULL,
+    price DECIMAL(10,2) NOT NULL,
+    total_amount DECIMAL(10,2) NOT NULL,
+    product_title VARCHAR(500),
+    variant_title VARCHAR(255),
+    product_handle VARCHAR(255),
+    created_at DATETIME,
+    order_created_at DATETIME NOT NULL,
+    PRIMARY KEY (id, order_created_at),
+    INDEX idx_order_items_archive_order (order_id, order_created_at)
+)
+PARTITION BY RANGE COLUMNS(order_created_at) (
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS order_archive_index (
+    order_id VARCHAR(36) PRIMARY KEY,
+    order_number VARCHAR(50) NOT NULL UNIQUE,
+    user_id VARCHAR(36),
+    created_at DATETIME NOT NULL,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_order_archive_user_created (user_id, created_at)
+);
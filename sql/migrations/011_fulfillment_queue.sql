@@ -0,0 +1,20 @@
+-- 피킹 작업 큐 (확정된 주문을 SKIP LOCKED로 가져가고 임대로 독점)
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+-- 006 으로 주문 ID를 BINARY(16)으로 바꾼 경우 order_id 컬럼도 같은 타입으로 만든다.
+
+USE commerce_db;
+
+-- 상태별 오래된 주문 순 탐색. idx_status는 이 인덱스의 앞부분이라 삭제한다.
+ALTER TABLE orders
+    ADD INDEX idx_orders_status_created (status, created_at),
+    DROP INDEX idx_status;
+
+CREATE TABLE IF NOT EXISTS fulfillment_leases (
+    order_id VARCHAR(36) PRIMARY KEY,
+    lease_token VARCHAR(36) NOT NULL,
+    picker_id VARCHAR(100) NOT NULL,
+    claimed_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    INDEX idx_fulfillment_lease_token (lease_token),
+    INDEX idx_fulfillment_lease_expires (expires_at)
+);
@@ -0,0 +1,8 @@
+-- 진행 중인 Idempotency-Key 임대 (요청을 처리하던 워커가 죽으면 재시도가 키를 이어받음)
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+-- 임대 값이 없는 진행 중 키는 만료된 임대로 보고 다음 재시도가 이어받는다.
+
+USE commerce_db;
+
+ALTER TABLE idempotency_keys
+    ADD COLUMN locked_until DATETIME AFTER expires_at;
@@ -0,0 +1,10 @@
+-- Idempotency-Key 임대 토큰과 처리 결과 리소스 ID
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+-- lease_token: 키를 선점/이어받을 때마다 새로 발급 (이전 시도는 연장/저장/해제할 수 없음)
+-- resource_id: 주문 생성/결제 변경 트랜잭션 안에서 기록 (커밋 뒤 응답 저장 전에 실패해도 재시도가 다시 실행하지 않고 재생)
+
+USE commerce_db;
+
+ALTER TABLE idempotency_keys
+    ADD COLUMN lease_token VARCHAR(36) AFTER locked_until,
+    ADD COLUMN resource_id VARCHAR(36) AFTER lease_token;
@@ -0,0 +1,17 @@
+-- 피킹 작업 큐에서 가져간 주문 표시
+-- 기존 데이터베이스에 적용 (init_database.sql 로 새로 생성한 경우 불필요)
+-- 가져간 주문을 큐 탐색 인덱스에서 제외해, 가져가기가 임대 중인 주문 수와 관계없이 큐 앞부분만 읽게 한다.
+-- idx_orders_status_created는 새 인덱스로 대체한다 (status 조건만 쓰는 조회는 앞부분을 그대로 사용).
+
+USE commerce_db;
+
+ALTER TABLE orders
+    ADD COLUMN fulfillment_claimed BOOLEAN NOT NULL DEFAULT FALSE AFTER delivered_at,
+    ADD INDEX idx_orders_fulfillment_queue (status, fulfillment_claimed, created_at),
+    DROP INDEX idx_orders_status_created;
+
+-- 유효한 임대가 있는 주문 표시 (만료된 임대는 다음 가져가기에서 큐로 되돌림)
+UPDATE orders o
+JOIN fulfillment_leases l ON l.order_id = o.id
+SET o.fulfillment_claimed = TRUE
+WHERE l.expires_at > UTC_TIMESTAMP();
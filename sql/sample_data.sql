@@ -86,6 +86,12 @@ INSERT INTO product_variants (product_id, title, price, compare_at_price, sku, i
 (10, '16GB RAM / 512GB SSD', 1299.99, 1499.99, 'LP-001-16-512', 15, 2.0, 'kg', true, NOW(), NOW()),
 (10, '32GB RAM / 1TB SSD', 1599.99, 1799.99, 'LP-001-32-1TB', 10, 2.0, 'kg', true, NOW(), NOW());
 
+-- 제품 가격 범위 계산
+UPDATE products p SET
+    min_price = (SELECT MIN(v.price) FROM product_variants v WHERE v.product_id = p.id),
+    max_price = (SELECT MAX(v.price) FROM product_variants v WHERE v.product_id = p.id),
+    updated_at = p.updated_at;
+
 -- 제품 이미지 데이터 삽입
 INSERT INTO product_images (product_id, url, alt_text, width, height, position, created_at) VALUES
 -- Wireless Headphones